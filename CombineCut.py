@@ -1,13 +1,26 @@
 # Assuming you have not changed the general structure of the template no modification is needed in this file.
+import time
+_import_start = time.perf_counter()
+
 from . import commands
 from .lib import fusionAddInUtils as futil
 
+_import_time = time.perf_counter() - _import_start
+
 
 def run(context):
     try:
+        run_start = time.perf_counter()
+
         # This will run the start function in each of your commands as defined in commands/__init__.py
         commands.start()
 
+        # Time added to Fusion's startup, see the startup spans of commands/__init__.py for each command
+        futil.record_span('startup.import', _import_time)
+        futil.record_span('startup.commands', time.perf_counter() - run_start)
+        futil.log(lambda: f'Add-in started in {(_import_time + time.perf_counter() - run_start) * 1000:.1f} ms '
+                          f'(import {_import_time * 1000:.1f} ms)')
+
     except:
         futil.handle_error('run')
 
@@ -17,8 +30,18 @@ def stop(context):
         # Remove all of the event handlers your app has created
         futil.clear_handlers()
 
+        # Stop sending messages to the palettes
+        futil.stop_rpc()
+        futil.close_palette_channels()
+
+        # Keep the timings of this session so they can be compared with earlier ones
+        futil.log(f'Metrics written to {futil.export_metrics()}')
+
         # This will run the start function in each of your commands as defined in commands/__init__.py
         commands.stop()
 
+        # Write the queued log messages before the add-in is unloaded
+        futil.stop_logging()
+
     except:
         futil.handle_error('stop')
\ No newline at end of file
@@ -0,0 +1,78 @@
+# Benchmark for the Combine Cut dialog events as the number of pairs grows.
+# Runs outside of Fusion:
+#
+#   python benchmarks/bench_events.py
+#   python benchmarks/bench_events.py --sizes 1 100 2000 --events 5000
+#
+# Each event is one selection change followed by a validate, the work Fusion asks
+# for on every click in the dialog. The pair model keeps a count of complete pairs
+# so its cost stays flat; it is timed against the per-event scan of every pair row
+# it replaces, with the dialog inputs stood in for by a dictionary.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'commands', 'combineCut'))
+import pair_model  # noqa: E402
+
+
+class SelectionInput:
+    def __init__(self, entity=None):
+        self.entity = entity
+
+    @property
+    def selectionCount(self):
+        return 0 if self.entity is None else 1
+
+
+def scan_event(inputs: dict, pair_count: int, idx: int, occurrence) -> bool:
+    inputs[f'plate_{idx}'].entity = occurrence
+    for row in range(pair_count):
+        plate_input = inputs.get(f'plate_{row}')
+        text_input = inputs.get(f'text_{row}')
+        if not plate_input or not text_input:
+            return False
+        if plate_input.selectionCount == 0 or text_input.selectionCount == 0:
+            return False
+    return True
+
+
+def model_event(model: pair_model.PairModel, pair_count: int, idx: int, occurrence) -> bool:
+    model.select(idx, 'plate', () if occurrence is None else (occurrence,))
+    return model.is_complete
+
+
+def time_events(event, state, size: int, events: int) -> float:
+    start = time.perf_counter()
+    for number in range(events):
+        # Alternate between clearing and reselecting the last pair so the result changes
+        occurrence = None if number % 2 else f'Plate_{size - 1}'
+        event(state, size, size - 1, occurrence)
+    return (time.perf_counter() - start) / events
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Combine Cut dialog events.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 500, 1000, 2000],
+                        help='Number of pairs in the dialog.')
+    parser.add_argument('--events', type=int, default=2000, help='Number of events timed for each size.')
+    args = parser.parse_args()
+
+    print(f'{"pairs":>8} {"model us":>10} {"scan us":>10}')
+    for size in args.sizes:
+        model = pair_model.PairModel()
+        model.reset([pair_model.PairRow((f'Plate_{idx}',), (f'Text_{idx}',)) for idx in range(size)])
+        inputs = {}
+        for idx in range(size):
+            inputs[f'plate_{idx}'] = SelectionInput(f'Plate_{idx}')
+            inputs[f'text_{idx}'] = SelectionInput(f'Text_{idx}')
+        model_seconds = time_events(model_event, model, size, args.events)
+        scan_seconds = time_events(scan_event, inputs, size, args.events)
+        for occurrence in (None, f'Plate_{size - 1}'):
+            assert model_event(model, size, size - 1, occurrence) == scan_event(inputs, size, size - 1, occurrence)
+        print(f'{size:>8} {model_seconds * 1e6:10.2f} {scan_seconds * 1e6:10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Benchmark of the offline pair planner on synthetic design snapshots, run outside of Fusion:
+#
+#   python benchmarks/bench_offline.py
+#   python benchmarks/bench_offline.py --bodies 100000 --processes 1 4 8
+#
+# The snapshot has Plate_<n> targets laid out on a grid, each with a Text_<n> tool inside it,
+# half of the bodies being targets and half tools. It is written and read back, then planned by
+# name and by overlap with each number of processes. Every plan must hold each plate with its
+# own text only, and plans made with different numbers of processes must be equal.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'commands'))
+from combineCut import offline, snapshot  # noqa: E402
+
+IDENTITY = (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+
+
+def make_snapshot(pair_count: int) -> snapshot.Snapshot:
+    builder = snapshot.SnapshotBuilder()
+    columns = max(1, int(pair_count ** 0.5))
+    for index in range(pair_count):
+        x = (index % columns) * 20.0
+        y = (index // columns) * 20.0
+        plate_box = (x, y, 0.0, x + 10.0, y + 10.0, 1.0)
+        text_box = (x + 1.0, y + 1.0, 0.5, x + 2.0, y + 2.0, 1.5)
+        plate = builder.add_occurrence(f'Plate_{index}', f'plate{index}', IDENTITY, plate_box)
+        builder.add_body(plate, f'Plate_{index}', plate_box)
+        text = builder.add_occurrence(f'Text_{index}', f'text{index}', IDENTITY, text_box)
+        builder.add_body(text, 'Body1', text_box)
+    return builder.snapshot
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the offline pair planner on synthetic snapshots.')
+    parser.add_argument('--bodies', type=int, default=100000, help='Number of bodies in the snapshot.')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help='Numbers of worker processes to time.')
+    args = parser.parse_args()
+
+    pair_count = args.bodies // 2
+    design, build_seconds = timed(lambda: make_snapshot(pair_count))
+    path = os.path.join(tempfile.mkdtemp(prefix='combine_cut_bench_'), 'design.ccsnap')
+    _, write_seconds = timed(lambda: snapshot.write_snapshot(path, design))
+    design, read_seconds = timed(lambda: snapshot.read_snapshot(path))
+    print(f'{design.body_count} bodies: build {build_seconds:.2f}s, write {write_seconds:.2f}s '
+          f'({os.path.getsize(path) / 1e6:.1f} MB), read {read_seconds:.2f}s')
+
+    expected = [(index * 2, [index * 2 + 1]) for index in range(pair_count)]
+    print(f'{"mode":>8} {"processes":>10} {"plan s":>10}')
+    for by_overlap in (False, True):
+        for processes in dict.fromkeys(args.processes):
+            plan, seconds = timed(lambda: offline.plan_pairs(design, 'Plate_*', 'Text_*', by_overlap, processes))
+            assert plan == expected, 'plan does not pair each plate with its own text'
+            print(f'{"overlap" if by_overlap else "name":>8} {processes:>10} {seconds:10.2f}')
+    records, seconds = timed(lambda: offline.plan_records(design, expected))
+    print(f'{len(records)} plan records in {seconds:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
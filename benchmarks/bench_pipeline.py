@@ -0,0 +1,125 @@
+# Benchmark of the Combine Cut command from dialog to cuts, run outside of Fusion on the
+# stand-in adsk package:
+#
+#   python benchmarks/bench_pipeline.py
+#   python benchmarks/bench_pipeline.py --sizes 100 1000 --cost combine=0.002 --cost combineTool=0.0005
+#   python benchmarks/bench_pipeline.py --save results/main.json
+#   python benchmarks/bench_pipeline.py --compare results/main.json
+#
+# For each size a design with that many target/tool pairs is created and the dialog is
+# driven the way a user would: Auto Pair, a selection change with its validate event,
+# Save Pairs, Load Pairs and OK. The stand-in API calls are free unless given a cost with
+# --cost, in seconds per call; see the _cost calls in fake_adsk for the call names.
+# Results can be saved to a JSON file and compared with an earlier run to find regressions.
+import argparse
+import json
+import platform
+import sys
+import time
+
+import harness
+
+STEPS = ('auto_pair', 'validate', 'save', 'load', 'execute')
+
+# Number of selection changes timed for the validate step.
+VALIDATE_EVENTS = 50
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run_size(entry, pair_count: int, tools_per_pair: int) -> dict:
+    _, pairs = harness.make_design(pair_count, tools_per_pair)
+    command = harness.start_command(entry)
+    inputs = command.commandInputs
+    results = {}
+    results['auto_pair'] = timed(lambda: harness.click(command, 'auto_pair'))
+
+    plate_input = inputs.itemById('plate_0')
+
+    def change_selection():
+        for _ in range(VALIDATE_EVENTS):
+            plate_input.clearSelection()
+            plate_input.addSelection(pairs[0][0])
+            harness.change(command, plate_input)
+    results['validate'] = timed(change_selection) / VALIDATE_EVENTS
+
+    results['save'] = timed(lambda: harness.click(command, 'save_pairs'))
+    results['load'] = timed(lambda: harness.click(command, 'load_pairs'))
+
+    calls_before = sum(harness.app.calls.values())
+
+    def execute():
+        harness.fire(command, 'execute')
+        harness.app.pump()
+    results['execute'] = timed(execute)
+    results['execute_calls'] = sum(harness.app.calls.values()) - calls_before
+
+    harness.fire(command, 'destroy')
+    return results
+
+
+def parse_costs(values: list) -> dict:
+    costs = {}
+    for value in values:
+        name, _, seconds = value.partition('=')
+        costs[name] = float(seconds)
+    return costs
+
+
+def print_results(results: dict, baseline: dict = None):
+    header = f'{"pairs":>8}' + ''.join(f' {step + " s":>12}' for step in STEPS)
+    if baseline:
+        header += '   (ratio to baseline)'
+    print(header)
+    for size, steps in results['sizes'].items():
+        line = f'{size:>8}' + ''.join(f' {steps[step]:12.5f}' for step in STEPS)
+        base_steps = (baseline or {}).get('sizes', {}).get(size)
+        if base_steps:
+            line += '  ' + ' '.join(f'{steps[step] / base_steps[step]:5.2f}x' if base_steps.get(step) else '    -'
+                                    for step in STEPS)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Combine Cut command on the stand-in adsk package.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000],
+                        help='Number of pairs to test.')
+    parser.add_argument('--tools-per-pair', type=int, default=1)
+    parser.add_argument('--cost', action='append', default=[], metavar='CALL=SECONDS',
+                        help='Simulated cost of a stand-in API call, can be repeated.')
+    parser.add_argument('--label', default='', help='Name stored with the results, such as a branch or version.')
+    parser.add_argument('--save', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Show the ratio of each time to the results in this JSON file.')
+    args = parser.parse_args()
+
+    harness.app.costs.update(parse_costs(args.cost))
+    entry = harness.load()
+    results = {
+        'label': args.label,
+        'time': time.time(),
+        'python': platform.python_version(),
+        'costs': harness.app.costs,
+        'tools_per_pair': args.tools_per_pair,
+        'sizes': {},
+    }
+    for size in args.sizes:
+        results['sizes'][str(size)] = run_size(entry, size, args.tools_per_pair)
+        print(f'{size} pairs done', file=sys.stderr)
+    entry.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Benchmark for the spatial index used by the Bounding Box Overlap auto-pair mode.
+# Runs outside of Fusion on synthetic box data:
+#
+#   python benchmarks/bench_spatial.py
+#   python benchmarks/bench_spatial.py --sizes 1000 10000 --tools-per-target 3
+#
+# Targets are laid out as plates on a grid and every plate gets a few tool boxes
+# inside it, like engraved text. The grid index is timed against the brute force
+# O(n^2) loop it replaces, which is skipped for the larger sizes.
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'commands', 'combineCut'))
+import spatial  # noqa: E402
+
+BRUTE_FORCE_LIMIT = 2000
+
+
+def synthetic_boxes(target_count: int, tools_per_target: int, seed: int = 0):
+    rng = random.Random(seed)
+    columns = max(1, int(target_count ** 0.5))
+    targets = []
+    tools = []
+    for index in range(target_count):
+        x = (index % columns) * 12.0
+        y = (index // columns) * 7.0
+        targets.append((x, y, 0.0, x + 10.0, y + 5.0, 0.5))
+        for _ in range(tools_per_target):
+            tx = x + rng.uniform(0.5, 8.0)
+            ty = y + rng.uniform(0.5, 3.5)
+            tools.append((tx, ty, 0.3, tx + 1.5, ty + 1.0, 0.6))
+    return tools, targets
+
+
+def brute_force(tool_boxes, target_boxes):
+    return [(i, j) for i, tool in enumerate(tool_boxes)
+            for j, target in enumerate(target_boxes) if spatial.boxes_overlap(tool, target)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Combine Cut spatial index.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000, 20000],
+                        help='Number of target boxes to test.')
+    parser.add_argument('--tools-per-target', type=int, default=2)
+    parser.add_argument('--no-numpy', action='store_true', help='Run the pure Python code path.')
+    args = parser.parse_args()
+
+    uses_numpy = spatial.use_numpy(not args.no_numpy)
+    print(f'numpy: {"yes" if uses_numpy else "no"}')
+    print(f'{"targets":>8} {"tools":>8} {"pairs":>8} {"grid s":>9} {"brute s":>9}')
+    for size in args.sizes:
+        tool_boxes, target_boxes = synthetic_boxes(size, args.tools_per_target)
+        start = time.perf_counter()
+        pairs = spatial.overlapping_pairs(tool_boxes, target_boxes)
+        grid_seconds = time.perf_counter() - start
+        brute_seconds = ''
+        if size <= BRUTE_FORCE_LIMIT:
+            start = time.perf_counter()
+            expected = brute_force(tool_boxes, target_boxes)
+            brute_seconds = f'{time.perf_counter() - start:9.3f}'
+            assert sorted(expected) == sorted(pairs), 'grid and brute force results differ'
+        print(f'{size:>8} {len(tool_boxes):>8} {len(pairs):>8} {grid_seconds:9.3f} {brute_seconds:>9}')
+
+
+if __name__ == '__main__':
+    main()
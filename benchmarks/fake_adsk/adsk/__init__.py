@@ -0,0 +1,12 @@
+# Stand-in for the adsk package so the add-in can run outside of Fusion for the benchmarks.
+# Only the classes and members the add-in uses are provided. See core.py for how the cost
+# of the API calls is simulated.
+from . import core, fusion
+
+
+def doEvents():
+    return True
+
+
+def terminate():
+    return True
@@ -0,0 +1,851 @@
+# Stand-in for the parts of adsk.core used by the add-in.
+# Objects keep just enough state for the commands to run. API calls that are slow in
+# Fusion call Application._cost, which counts the call and, when a cost has been set in
+# Application.costs, spins for that many seconds so the benchmarks can simulate Fusion.
+import time
+
+
+class LogLevels:
+    InfoLogLevel = 0
+    WarningLogLevel = 1
+    ErrorLogLevel = 2
+
+
+class LogTypes:
+    ConsoleLogType = 0
+    FileLogType = 1
+
+
+class PaletteDockingStates:
+    PaletteDockStateFloating = 0
+    PaletteDockStateRight = 1
+
+
+class DialogResults:
+    DialogOK = 0
+    DialogCancel = 1
+    DialogError = 2
+    DialogYes = 3
+    DialogNo = 4
+
+
+class DropDownStyles:
+    TextListDropDownStyle = 0
+    LabeledIconDropDownStyle = 1
+    CheckBoxDropDownStyle = 2
+
+
+class Base:
+    @property
+    def isValid(self):
+        return True
+
+    @property
+    def objectType(self):
+        return type(self).__name__
+
+
+# ---- Events ----
+# add_handler finds the handler class of an event from the annotation of its add method,
+# so each event type is created with an annotated add and a matching handler class.
+
+class Event:
+    def __init__(self, sender=None, name=''):
+        self.sender = sender
+        self.name = name
+        self.handlers = []
+
+    def add(self, handler) -> bool:
+        self.handlers.append(handler)
+        return True
+
+    def remove(self, handler) -> bool:
+        if handler in self.handlers:
+            self.handlers.remove(handler)
+            return True
+        return False
+
+    def fire(self, args):
+        args.firingEvent = self
+        for handler in list(self.handlers):
+            handler.notify(args)
+
+
+class EventHandler:
+    def __init__(self):
+        pass
+
+    def notify(self, args):
+        pass
+
+
+def _event_types(name: str):
+    handler_name = f'{name}EventHandler'
+
+    def add(self, handler) -> bool:
+        return Event.add(self, handler)
+    add.__annotations__ = {'handler': handler_name, 'return': 'bool'}
+
+    event_type = type(f'{name}Event', (Event,), {'add': add})
+    handler_type = type(handler_name, (EventHandler,), {})
+    return event_type, handler_type
+
+
+CommandCreatedEvent, CommandCreatedEventHandler = _event_types('CommandCreated')
+CommandEvent, CommandEventHandler = _event_types('Command')
+InputChangedEvent, InputChangedEventHandler = _event_types('InputChanged')
+ValidateInputsEvent, ValidateInputsEventHandler = _event_types('ValidateInputs')
+CustomEvent, CustomEventHandler = _event_types('Custom')
+HTMLEvent, HTMLEventHandler = _event_types('HTML')
+UserInterfaceGeneralEvent, UserInterfaceGeneralEventHandler = _event_types('UserInterfaceGeneral')
+NavigationEvent, NavigationEventHandler = _event_types('Navigation')
+
+
+class EventArgs(Base):
+    firingEvent = None
+
+
+class CommandCreatedEventArgs(EventArgs):
+    def __init__(self, command):
+        self.command = command
+
+
+class CommandEventArgs(EventArgs):
+    def __init__(self, command):
+        self.command = command
+        self.isValidResult = False
+        self.executeFailed = False
+        self.executeFailedMessage = ''
+
+
+class InputChangedEventArgs(EventArgs):
+    def __init__(self, command, changed_input):
+        self.command = command
+        self.input = changed_input
+        self.inputs = changed_input._owner
+
+
+class ValidateInputsEventArgs(EventArgs):
+    def __init__(self, command):
+        self.command = command
+        self.inputs = command.commandInputs
+        self.areInputsValid = True
+
+
+class CustomEventArgs(EventArgs):
+    def __init__(self, data=''):
+        self.additionalInfo = data
+
+
+class HTMLEventArgs(EventArgs):
+    def __init__(self, action, data):
+        self.action = action
+        self.data = data
+        self.returnData = ''
+
+
+class UserInterfaceGeneralEventArgs(EventArgs):
+    pass
+
+
+class NavigationEventArgs(EventArgs):
+    def __init__(self, url=''):
+        self.navigationURL = url
+        self.launchExternally = False
+
+
+# ---- Geometry and values ----
+
+class ObjectCollection(Base):
+    def __init__(self):
+        self._items = []
+
+    @staticmethod
+    def create():
+        return ObjectCollection()
+
+    @staticmethod
+    def createWithArray(items):
+        collection = ObjectCollection()
+        collection._items = list(items)
+        return collection
+
+    def add(self, item):
+        self._items.append(item)
+        return True
+
+    def item(self, index):
+        return self._items[index]
+
+    def removeByIndex(self, index):
+        del self._items[index]
+        return True
+
+    def removeByItem(self, item):
+        self._items.remove(item)
+        return True
+
+    def clear(self):
+        self._items.clear()
+        return True
+
+    def find(self, item, startIndex=0):
+        try:
+            return self._items.index(item, startIndex)
+        except ValueError:
+            return -1
+
+    def contains(self, item):
+        return item in self._items
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+
+class Point3D(Base):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        return Point3D(x, y, z)
+
+    def asArray(self):
+        return (self.x, self.y, self.z)
+
+    def copy(self):
+        return Point3D(self.x, self.y, self.z)
+
+
+class Vector3D(Point3D):
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        return Vector3D(x, y, z)
+
+
+class BoundingBox3D(Base):
+    def __init__(self, minPoint, maxPoint):
+        self.minPoint = minPoint
+        self.maxPoint = maxPoint
+
+    @staticmethod
+    def create(minPoint, maxPoint):
+        return BoundingBox3D(minPoint, maxPoint)
+
+    def intersects(self, other):
+        a, b, c, d = self.minPoint, self.maxPoint, other.minPoint, other.maxPoint
+        return a.x <= d.x and c.x <= b.x and a.y <= d.y and c.y <= b.y and a.z <= d.z and c.z <= b.z
+
+
+class OrientedBoundingBox3D(Base):
+    def __init__(self, centerPoint, lengthDirection, widthDirection, length, width, height):
+        self.centerPoint = centerPoint
+        self.lengthDirection = lengthDirection
+        self.widthDirection = widthDirection
+        l, w = lengthDirection, widthDirection
+        self.heightDirection = Vector3D(l.y * w.z - l.z * w.y, l.z * w.x - l.x * w.z, l.x * w.y - l.y * w.x)
+        self.length = length
+        self.width = width
+        self.height = height
+
+
+class Matrix3D(Base):
+    """An identity transform; occurrences are only ever translated by the fake."""
+
+    @staticmethod
+    def create():
+        return Matrix3D()
+
+    def asArray(self):
+        return (1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+
+    def copy(self):
+        return Matrix3D()
+
+    def invert(self):
+        return True
+
+    def transformBy(self, matrix):
+        return True
+
+
+class ValueInput(Base):
+    def __init__(self, stringValue):
+        self.stringValue = stringValue
+
+    @staticmethod
+    def createByString(stringValue):
+        return ValueInput(stringValue)
+
+    @staticmethod
+    def createByReal(realValue):
+        return ValueInput(str(realValue))
+
+
+class Selection(Base):
+    def __init__(self, entity):
+        self.entity = entity
+
+
+# ---- Command inputs ----
+# Every input of a command is indexed by id in the top level collection so itemById is
+# a dictionary lookup there, the same as in Fusion.
+
+class CommandInput(Base):
+    def __init__(self, owner, id, name=''):
+        self.id = id
+        self.name = name
+        self._owner = owner
+        self.isVisible = True
+        self.isEnabled = True
+        self.tooltip = ''
+
+    @property
+    def parentCommand(self):
+        return self._owner._command
+
+    @property
+    def parentCommandInput(self):
+        return self._owner._parent_input
+
+    def deleteMe(self):
+        _app._cost('deleteInput')
+        self._owner._remove(self)
+        return True
+
+
+class CommandInputs(Base):
+    def __init__(self, command, root=None, parent_input=None):
+        self._command = command
+        self._items = []
+        self._root = self if root is None else root
+        self._index = {} if root is None else root._index
+        self._parent_input = parent_input
+
+    def _add(self, command_input):
+        _app._cost('addInput')
+        self._items.append(command_input)
+        self._index[command_input.id] = command_input
+        return command_input
+
+    def _remove(self, command_input):
+        self._items.remove(command_input)
+        self._index.pop(command_input.id, None)
+        for child in command_input._all_children():
+            self._index.pop(child.id, None)
+
+    def _all(self):
+        for command_input in self._items:
+            yield command_input
+            yield from command_input._all_children()
+
+    def itemById(self, id):
+        if self is self._root:
+            return self._index.get(id)
+        return next((command_input for command_input in self._all() if command_input.id == id), None)
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @property
+    def command(self):
+        return self._command
+
+    def addGroupCommandInput(self, id, name):
+        return self._add(GroupCommandInput(self, id, name))
+
+    def addTableCommandInput(self, id, name, numberOfColumns, columnRatio):
+        return self._add(TableCommandInput(self, id, name))
+
+    def addSelectionInput(self, id, name, commandPrompt):
+        return self._add(SelectionCommandInput(self, id, name, commandPrompt))
+
+    def addBoolValueInput(self, id, name, isCheckBox, resourceFolder='', initialValue=False):
+        command_input = BoolValueCommandInput(self, id, name)
+        command_input.value = initialValue
+        command_input.isCheckBox = isCheckBox
+        return self._add(command_input)
+
+    def addTextBoxCommandInput(self, id, name, formattedText, numRows, isReadOnly):
+        command_input = TextBoxCommandInput(self, id, name)
+        command_input.text = formattedText
+        command_input.formattedText = formattedText
+        command_input.isReadOnly = isReadOnly
+        return self._add(command_input)
+
+    def addStringValueInput(self, id, name, initialValue=''):
+        command_input = StringValueCommandInput(self, id, name)
+        command_input.value = initialValue
+        return self._add(command_input)
+
+    def addIntegerSpinnerCommandInput(self, id, name, min, max, spinStep, initialValue):
+        command_input = IntegerSpinnerCommandInput(self, id, name)
+        command_input.value = initialValue
+        command_input.minimumValue = min
+        command_input.maximumValue = max
+        return self._add(command_input)
+
+    def addDropDownCommandInput(self, id, name, dropDownStyle):
+        return self._add(DropDownCommandInput(self, id, name))
+
+    def addValueInput(self, id, name, unitType, initialValue):
+        command_input = ValueCommandInput(self, id, name)
+        command_input.expression = initialValue.stringValue
+        command_input.value = 1.0
+        return self._add(command_input)
+
+
+class _LeafCommandInput(CommandInput):
+    def _all_children(self):
+        return []
+
+
+class GroupCommandInput(CommandInput):
+    def __init__(self, owner, id, name):
+        super().__init__(owner, id, name)
+        self.children = CommandInputs(owner._command, owner._root, self)
+        self.isExpanded = True
+
+    def _all_children(self):
+        return list(self.children._all())
+
+
+class TableCommandInput(CommandInput):
+    def __init__(self, owner, id, name):
+        super().__init__(owner, id, name)
+        self.commandInputs = CommandInputs(owner._command, owner._root, self)
+        self._cells = {}
+        self.maximumVisibleRows = 4
+        self.minimumVisibleRows = 1
+        self.tablePresentationStyle = 0
+
+    def _all_children(self):
+        return list(self.commandInputs._all())
+
+    def addCommandInput(self, input, row, column, rowSpan=0, columnSpan=0):
+        self._cells[(row, column)] = input
+        return True
+
+    def getInputAtPosition(self, row, column):
+        return self._cells.get((row, column))
+
+    @property
+    def rowCount(self):
+        return max(row for row, _ in self._cells) + 1 if self._cells else 0
+
+    def deleteRow(self, row):
+        for cell in [cell for cell in self._cells if cell[0] == row]:
+            self._cells.pop(cell).deleteMe()
+        self._cells = {(r - 1 if r > row else r, c): command_input for (r, c), command_input in self._cells.items()}
+        return True
+
+    def clear(self):
+        for cell in list(self._cells):
+            self._cells.pop(cell).deleteMe()
+        return True
+
+    def addToolbarCommandInput(self, input):
+        return True
+
+
+class SelectionCommandInput(_LeafCommandInput):
+    def __init__(self, owner, id, name, commandPrompt):
+        super().__init__(owner, id, name)
+        self.commandPrompt = commandPrompt
+        self._selections = []
+        self._filters = []
+        self._limits = (1, 1)
+
+    def addSelectionFilter(self, filter):
+        self._filters.append(filter)
+        return True
+
+    def setSelectionLimits(self, minimum, maximum=0):
+        self._limits = (minimum, maximum)
+        return True
+
+    def selection(self, index):
+        return self._selections[index]
+
+    @property
+    def selectionCount(self):
+        return len(self._selections)
+
+    def addSelection(self, selection):
+        _app._cost('addSelection')
+        self._selections.append(Selection(selection))
+        return True
+
+    def clearSelection(self):
+        self._selections.clear()
+        return True
+
+
+class BoolValueCommandInput(_LeafCommandInput):
+    pass
+
+
+class TextBoxCommandInput(_LeafCommandInput):
+    pass
+
+
+class StringValueCommandInput(_LeafCommandInput):
+    pass
+
+
+class IntegerSpinnerCommandInput(_LeafCommandInput):
+    pass
+
+
+class ValueCommandInput(_LeafCommandInput):
+    pass
+
+
+class ListItem(Base):
+    def __init__(self, name, isSelected, index):
+        self.name = name
+        self.isSelected = isSelected
+        self.index = index
+
+
+class ListItems(Base):
+    def __init__(self):
+        self._items = []
+
+    def add(self, name, isSelected, icon='', beforeIndex=-1):
+        list_item = ListItem(name, isSelected, len(self._items))
+        if isSelected:
+            for other in self._items:
+                other.isSelected = False
+        self._items.append(list_item)
+        return list_item
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class DropDownCommandInput(_LeafCommandInput):
+    def __init__(self, owner, id, name):
+        super().__init__(owner, id, name)
+        self.listItems = ListItems()
+
+    @property
+    def selectedItem(self):
+        return next((list_item for list_item in self.listItems if list_item.isSelected), None)
+
+
+# ---- Commands ----
+
+class Command(Base):
+    def __init__(self, definition):
+        self.parentCommandDefinition = definition
+        self.commandInputs = CommandInputs(self)
+        self.execute = CommandEvent(self, 'execute')
+        self.executePreview = CommandEvent(self, 'executePreview')
+        self.inputChanged = InputChangedEvent(self, 'inputChanged')
+        self.validateInputs = ValidateInputsEvent(self, 'validateInputs')
+        self.destroy = CommandEvent(self, 'destroy')
+        self.isOKButtonVisible = True
+        self.okButtonText = 'OK'
+
+    def doExecutePreview(self):
+        self.executePreview.fire(CommandEventArgs(self))
+        return True
+
+
+class CommandDefinition(Base):
+    def __init__(self, id, name, tooltip, resourceFolder):
+        self.id = id
+        self.name = name
+        self.tooltip = tooltip
+        self.resourceFolder = resourceFolder
+        self.commandCreated = CommandCreatedEvent(self, 'commandCreated')
+
+    def execute(self, input=None):
+        """Creates a command and fires commandCreated. Returns the command, unlike Fusion,
+        so the caller can fire the command's other events."""
+        command = Command(self)
+        self.commandCreated.fire(CommandCreatedEventArgs(command))
+        return command
+
+    def deleteMe(self):
+        _app.userInterface.commandDefinitions._items.pop(self.id, None)
+        return True
+
+
+class CommandDefinitions(Base):
+    def __init__(self):
+        self._items = {}
+
+    def addButtonDefinition(self, id, name, tooltip, resourceFolder=''):
+        definition = CommandDefinition(id, name, tooltip, resourceFolder)
+        self._items[id] = definition
+        return definition
+
+    def itemById(self, id):
+        return self._items.get(id)
+
+
+class CommandControl(Base):
+    def __init__(self, owner, definition):
+        self.commandDefinition = definition
+        self.id = definition.id
+        self.isPromoted = False
+        self._owner = owner
+
+    def deleteMe(self):
+        self._owner._items.pop(self.id, None)
+        return True
+
+
+class ToolbarControls(Base):
+    def __init__(self):
+        self._items = {}
+
+    def addCommand(self, commandDefinition, positionID='', isBefore=True):
+        control = CommandControl(self, commandDefinition)
+        self._items[commandDefinition.id] = control
+        return control
+
+    def itemById(self, id):
+        return self._items.get(id)
+
+
+class ToolbarPanel(Base):
+    def __init__(self, id):
+        self.id = id
+        self.controls = ToolbarControls()
+
+
+class _ItemsById(Base):
+    """A collection that creates its items on first use, for workspaces and panels."""
+
+    def __init__(self, factory):
+        self._items = {}
+        self._factory = factory
+
+    def itemById(self, id):
+        if id not in self._items:
+            self._items[id] = self._factory(id)
+        return self._items[id]
+
+
+class Workspace(Base):
+    def __init__(self, id):
+        self.id = id
+        self.toolbarPanels = _ItemsById(ToolbarPanel)
+
+
+# ---- Palettes and dialogs ----
+
+class Palette(Base):
+    def __init__(self, owner, id, name, htmlFileURL):
+        self.id = id
+        self.name = name
+        self.htmlFileURL = htmlFileURL
+        self.isVisible = True
+        self.dockingState = PaletteDockingStates.PaletteDockStateFloating
+        self.closed = UserInterfaceGeneralEvent(self)
+        self.navigatingURL = NavigationEvent(self)
+        self.incomingFromHTML = HTMLEvent(self)
+        self.sent = []
+        self._owner = owner
+
+    def sendInfoToHTML(self, action, data):
+        _app._cost('sendInfoToHTML')
+        self.sent.append((action, data))
+        return 'OK'
+
+    def deleteMe(self):
+        self._owner._items.pop(self.id, None)
+        return True
+
+
+class Palettes(Base):
+    def __init__(self):
+        self._items = {}
+
+    def add(self, id, name, htmlFileURL, isVisible=True, showCloseButton=True, isResizable=True,
+            width=0, height=0, useNewWebBrowser=False):
+        palette = Palette(self, id, name, htmlFileURL)
+        self._items[id] = palette
+        return palette
+
+    def itemById(self, id):
+        return self._items.get(id)
+
+
+class ProgressDialog(Base):
+    def __init__(self):
+        self.isShowing = False
+        self.progressValue = 0
+        self.message = ''
+        self.title = ''
+        self.wasCancelled = False
+        self.isBackgroundTranslucent = False
+        self.isCancelButtonShown = True
+        self.minimumValue = 0
+        self.maximumValue = 100
+
+    def show(self, title, message, minimumValue, maximumValue, delay=0):
+        self.title = title
+        self.message = message
+        self.minimumValue = minimumValue
+        self.maximumValue = maximumValue
+        self.isShowing = True
+        return True
+
+    def hide(self):
+        self.isShowing = False
+        return True
+
+
+class FileDialog(Base):
+    """Returns UserInterface.next_file, or cancels when it is empty."""
+
+    def __init__(self, filename=''):
+        self.filename = filename
+        self.title = ''
+        self.filter = ''
+        self.isMultiSelectEnabled = False
+        self.initialDirectory = ''
+
+    def showOpen(self):
+        return DialogResults.DialogOK if self.filename else DialogResults.DialogCancel
+
+    def showSave(self):
+        return self.showOpen()
+
+
+class FolderDialog(Base):
+    """Returns UserInterface.next_folder, or cancels when it is empty."""
+
+    def __init__(self, folder=''):
+        self.folder = folder
+        self.title = ''
+        self.initialDirectory = ''
+
+    def showDialog(self):
+        return DialogResults.DialogOK if self.folder else DialogResults.DialogCancel
+
+
+class UserInterface(Base):
+    def __init__(self):
+        self.commandDefinitions = CommandDefinitions()
+        self.workspaces = _ItemsById(Workspace)
+        self.palettes = Palettes()
+        self.activeCommand = ''
+        # Message box texts, in the order they were shown
+        self.messages = []
+        # Results of the next file and folder dialogs
+        self.next_file = ''
+        self.next_folder = ''
+
+    def messageBox(self, text, title='', buttons=0, icon=0):
+        _app._cost('messageBox')
+        self.messages.append(text)
+        return DialogResults.DialogOK
+
+    def createProgressDialog(self):
+        return ProgressDialog()
+
+    def createFileDialog(self):
+        return FileDialog(self.next_file)
+
+    def createFolderDialog(self):
+        return FolderDialog(self.next_folder)
+
+
+class Application(Base):
+    def __init__(self):
+        self.userInterface = UserInterface()
+        self.activeDocument = None
+        # Simulated cost in seconds of the API calls, by call name, and the number of calls made
+        self.costs = {}
+        self.calls = {}
+        self.logs = []
+        self._custom_events = {}
+        self._pending_events = []
+
+    @staticmethod
+    def get():
+        return _app
+
+    @property
+    def activeProduct(self):
+        return self.activeDocument.design if self.activeDocument else None
+
+    def _cost(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        cost = self.costs.get(name)
+        if cost:
+            # Busy wait, sleeping is far too coarse for costs of a few microseconds
+            end = time.perf_counter() + cost
+            while time.perf_counter() < end:
+                pass
+
+    def log(self, message, level=LogLevels.InfoLogLevel, type=LogTypes.ConsoleLogType):
+        self._cost('log')
+        self.logs.append((message, level, type))
+        return True
+
+    def registerCustomEvent(self, eventId):
+        event = CustomEvent(self, eventId)
+        self._custom_events[eventId] = event
+        return event
+
+    def unregisterCustomEvent(self, eventId):
+        return self._custom_events.pop(eventId, None) is not None
+
+    def fireCustomEvent(self, eventId, additionalInfo=''):
+        """Queues the event. Custom events are fired when pump is called, in place of the
+        Fusion message loop."""
+        if eventId not in self._custom_events:
+            return False
+        self._pending_events.append((eventId, additionalInfo))
+        return True
+
+    def pump(self, limit: int = 1000000) -> int:
+        """Fires the queued custom events, including the ones their handlers queue.
+
+        :returns:
+            The number of events fired.
+        """
+        fired = 0
+        while self._pending_events and fired < limit:
+            event_id, additional_info = self._pending_events.pop(0)
+            event = self._custom_events.get(event_id)
+            if event:
+                event.fire(CustomEventArgs(additional_info))
+            fired += 1
+        return fired
+
+
+_app = Application()
@@ -0,0 +1,704 @@
+# Stand-in for the parts of adsk.fusion used by the add-in.
+# Bodies are axis aligned boxes and occurrences are translations, which is enough for the
+# bounding box code. Booleans don't change any geometry, they count the cuts made to each
+# body and call Application._cost so their time can be simulated.
+import itertools
+
+from . import core
+from .core import Base, BoundingBox3D, Point3D, _app
+
+_tokens = itertools.count(1)
+
+
+class FeatureOperations:
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+
+
+class BooleanTypes:
+    DifferenceBooleanType = 0
+    IntersectionBooleanType = 1
+    UnionBooleanType = 2
+
+
+class DesignTypes:
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+
+def _design():
+    return _app.activeDocument.design
+
+
+# ---- Attributes and entities ----
+
+class Attribute(Base):
+    def __init__(self, parent, groupName, name, value):
+        self.parent = parent
+        self.groupName = groupName
+        self.name = name
+        self.value = value
+
+    def deleteMe(self):
+        self.parent.attributes._items.pop((self.groupName, self.name), None)
+        return True
+
+
+class Attributes(Base):
+    def __init__(self, parent):
+        self._parent = parent
+        self._items = {}
+
+    def add(self, groupName, name, value):
+        _app._cost('addAttribute')
+        attribute = Attribute(self._parent, groupName, name, value)
+        self._items[(groupName, name)] = attribute
+        return attribute
+
+    def itemByName(self, groupName, name):
+        return self._items.get((groupName, name))
+
+    def itemsByGroup(self, groupName):
+        return [attribute for (group, _), attribute in self._items.items() if group == groupName]
+
+    @property
+    def groupNames(self):
+        return sorted({group for group, _ in self._items})
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+
+class Entity(Base):
+    """Base of the objects that have an entity token and attributes."""
+
+    def __init__(self):
+        self.entityToken = f'token{next(_tokens)}'
+        self.attributes = Attributes(self)
+        self._deleted = False
+        _design()._entities[self.entityToken] = self
+
+    @property
+    def isValid(self):
+        return not self._deleted
+
+
+# ---- Bodies ----
+
+class BRepBody(Entity):
+    def __init__(self, name, box, component=None):
+        super().__init__()
+        self.name = name
+        self._box = box
+        self.parentComponent = component
+        self.assemblyContext = None
+        self.nativeObject = None
+        self.isLightBulbOn = True
+        self.isVisible = True
+        self.isTemporary = False
+        # Number of combine features that used this body as the target
+        self.cut_count = 0
+
+    @property
+    def boundingBox(self):
+        _app._cost('boundingBox')
+        offset = self.assemblyContext._offset if self.assemblyContext else (0, 0, 0)
+        low, high = self._box
+        return BoundingBox3D(Point3D(*(low[i] + offset[i] for i in range(3))),
+                             Point3D(*(high[i] + offset[i] for i in range(3))))
+
+    @property
+    def orientedMinimumBoundingBox(self):
+        box = self.boundingBox
+        low, high = box.minPoint, box.maxPoint
+        center = Point3D((low.x + high.x) / 2, (low.y + high.y) / 2, (low.z + high.z) / 2)
+        return core.OrientedBoundingBox3D(center, core.Vector3D(1, 0, 0), core.Vector3D(0, 1, 0),
+                                          high.x - low.x, high.y - low.y, high.z - low.z)
+
+    @property
+    def volume(self):
+        low, high = self._box
+        return (high[0] - low[0]) * (high[1] - low[1]) * (high[2] - low[2])
+
+    def createForAssemblyContext(self, occurrence):
+        proxy = BRepBody.__new__(BRepBody)
+        proxy.__dict__.update(self.__dict__)
+        proxy.assemblyContext = occurrence
+        proxy.nativeObject = self
+        return proxy
+
+    def deleteMe(self):
+        self._deleted = True
+        self.parentComponent.bRepBodies._items.remove(self)
+        return True
+
+    def __eq__(self, other):
+        return (isinstance(other, BRepBody) and other.entityToken == self.entityToken
+                and other.assemblyContext is self.assemblyContext)
+
+    def __hash__(self):
+        return hash(self.entityToken)
+
+
+class BRepBodies(Base):
+    def __init__(self, component):
+        self._items = []
+        self._component = component
+
+    def itemByName(self, name):
+        _app._cost('itemByName')
+        return next((body for body in self._items if body.name == name), None)
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def add(self, body, baseFeature=None):
+        added = BRepBody(body.name or self._component.name, body._box, self._component)
+        self._items.append(added)
+        return added
+
+
+class TempBody(Base):
+    def __init__(self, name, box):
+        self.name = name
+        self._box = box
+        self.isTemporary = True
+        # Number of booleans made with this body as the target
+        self.cuts = 0
+
+    @property
+    def boundingBox(self):
+        low, high = self._box
+        return BoundingBox3D(Point3D(*low), Point3D(*high))
+
+
+class TemporaryBRepManager(Base):
+    _instance = None
+
+    @staticmethod
+    def get():
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    def copy(self, body):
+        _app._cost('temporaryCopy')
+        box = body.boundingBox
+        return TempBody(getattr(body, 'name', ''), (box.minPoint.asArray(), box.maxPoint.asArray()))
+
+    def booleanOperation(self, targetBody, toolBody, booleanType):
+        _app._cost('temporaryBoolean')
+        targetBody.cuts += 1
+        return True
+
+    def transform(self, body, transform):
+        return True
+
+
+# ---- Parameters and sketches ----
+
+class Parameter(Entity):
+    def __init__(self, name, expression):
+        super().__init__()
+        self.name = name
+        self.expression = expression
+        self.unit = ''
+        self.comment = ''
+        try:
+            self.value = float(expression)
+        except ValueError:
+            self.value = 0.0
+
+
+class _NamedItems(Base):
+    def __init__(self):
+        self._items = []
+
+    def itemByName(self, name):
+        return next((item for item in self._items if item.name == name), None)
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+
+class Parameters(_NamedItems):
+    def add(self, name, value, units='', comment=''):
+        parameter = Parameter(name, value.stringValue)
+        self._items.append(parameter)
+        return parameter
+
+
+class SketchText(Entity):
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+
+
+class SketchTexts(_NamedItems):
+    pass
+
+
+class Sketch(Entity):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.sketchTexts = SketchTexts()
+
+
+class Sketches(_NamedItems):
+    pass
+
+
+# ---- Timeline ----
+
+class TimelineObject(Base):
+    def __init__(self, timeline, entity):
+        self._timeline = timeline
+        self.entity = entity
+        self.isGroup = False
+        self.name = getattr(entity, 'name', '')
+        self.parentGroup = None
+
+    @property
+    def index(self):
+        return self._timeline._items.index(self)
+
+    def rollTo(self, rollBefore):
+        return True
+
+
+class TimelineGroup(TimelineObject):
+    def __init__(self, timeline, startIndex, endIndex):
+        super().__init__(timeline, None)
+        self.isGroup = True
+        self.isCollapsed = True
+        self._members = timeline._items[startIndex:endIndex + 1]
+        for member in self._members:
+            member.parentGroup = self
+
+    def deleteMe(self, deleteGroupAndContents=False):
+        for member in self._members:
+            member.parentGroup = None
+            if deleteGroupAndContents:
+                member.entity.deleteMe()
+        self._timeline.timelineGroups._items.remove(self)
+        return True
+
+    def item(self, index):
+        return list(self)[index]
+
+    @property
+    def count(self):
+        return len(list(self))
+
+    def __iter__(self):
+        return iter([member for member in self._members if member in self._timeline._items])
+
+
+class TimelineGroups(Base):
+    def __init__(self, timeline):
+        self._timeline = timeline
+        self._items = []
+
+    def add(self, startIndex, endIndex):
+        group = TimelineGroup(self._timeline, startIndex, endIndex)
+        self._items.append(group)
+        return group
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+
+class Timeline(Base):
+    def __init__(self):
+        self._items = []
+        self.markerPosition = 0
+        self.timelineGroups = TimelineGroups(self)
+
+    def _append(self, entity):
+        timeline_object = TimelineObject(self, entity)
+        self._items.append(timeline_object)
+        self.markerPosition = len(self._items)
+        return timeline_object
+
+    def _remove(self, timeline_object):
+        if timeline_object in self._items:
+            self._items.remove(timeline_object)
+            self.markerPosition = len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+
+# ---- Features ----
+
+class CombineFeatureInput(Base):
+    def __init__(self, targetBody, toolBodies):
+        self.targetBody = targetBody
+        self.toolBodies = toolBodies
+        self.operation = FeatureOperations.JoinFeatureOperation
+        self.isKeepToolBodies = False
+        self.isNewComponent = False
+
+
+class CombineFeature(Entity):
+    def __init__(self, component, combine_input):
+        super().__init__()
+        self.parentComponent = component
+        self.targetBody = combine_input.targetBody
+        self.toolBodies = combine_input.toolBodies
+        self.operation = combine_input.operation
+        self.isKeepToolBodies = combine_input.isKeepToolBodies
+        self.name = f'Combine{len(component.features.combineFeatures._items) + 1}'
+        self.healthState = 0
+        self.timelineObject = _design().timeline._append(self)
+
+    def deleteMe(self):
+        _app._cost('deleteFeature')
+        self._deleted = True
+        _design().timeline._remove(self.timelineObject)
+        self.parentComponent.features.combineFeatures._items.remove(self)
+        return True
+
+
+class CombineFeatures(Base):
+    def __init__(self, component):
+        self._component = component
+        self._items = []
+
+    def createInput(self, targetBody, toolBodies):
+        return CombineFeatureInput(targetBody, toolBodies)
+
+    def add(self, input):
+        # A combine costs a fixed amount plus an amount for each tool body
+        _app._cost('combine')
+        for _ in range(input.toolBodies.count):
+            _app._cost('combineTool')
+        feature = CombineFeature(self._component, input)
+        self._items.append(feature)
+        target = input.targetBody.nativeObject or input.targetBody
+        target.cut_count += 1
+        return feature
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+
+class BaseFeature(Entity):
+    def __init__(self):
+        super().__init__()
+        self.name = 'Base Feature'
+        self.timelineObject = _design().timeline._append(self)
+
+    def startEdit(self):
+        return True
+
+    def finishEdit(self):
+        _app._cost('finishEdit')
+        return True
+
+    def deleteMe(self):
+        self._deleted = True
+        _design().timeline._remove(self.timelineObject)
+        return True
+
+
+class BaseFeatures(Base):
+    def __init__(self):
+        self._items = []
+
+    def add(self):
+        feature = BaseFeature()
+        self._items.append(feature)
+        return feature
+
+
+class RemoveFeature(Entity):
+    def __init__(self, itemToRemove):
+        super().__init__()
+        self.itemToRemove = itemToRemove
+        self.timelineObject = _design().timeline._append(self)
+
+    def deleteMe(self):
+        self._deleted = True
+        _design().timeline._remove(self.timelineObject)
+        return True
+
+
+class RemoveFeatures(Base):
+    def __init__(self):
+        self._items = []
+
+    def add(self, itemToRemove):
+        feature = RemoveFeature(itemToRemove)
+        self._items.append(feature)
+        body = itemToRemove.nativeObject or itemToRemove
+        if body in body.parentComponent.bRepBodies._items:
+            body.parentComponent.bRepBodies._items.remove(body)
+        return feature
+
+
+class Features(Base):
+    def __init__(self, component):
+        self.combineFeatures = CombineFeatures(component)
+        self.baseFeatures = BaseFeatures()
+        self.removeFeatures = RemoveFeatures()
+
+
+# ---- Components and occurrences ----
+
+class CustomGraphicsGroup(Base):
+    def __init__(self):
+        self.bodies = []
+
+    def addBRepBody(self, body):
+        self.bodies.append(body)
+        return object()
+
+    def deleteMe(self):
+        return True
+
+
+class CustomGraphicsGroups(Base):
+    def __init__(self):
+        self._items = []
+
+    def add(self):
+        group = CustomGraphicsGroup()
+        self._items.append(group)
+        return group
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+
+class Component(Entity):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.bRepBodies = BRepBodies(self)
+        self.features = Features(self)
+        self.sketches = Sketches()
+        self.modelParameters = Parameters()
+        self.occurrences = Occurrences(self)
+        self.customGraphicsGroups = CustomGraphicsGroups()
+
+    def add_body(self, box, name: str = None) -> BRepBody:
+        """Adds a box body given as ((min x, y, z), (max x, y, z)). Not part of the Fusion API."""
+        body = BRepBody(name or self.name, box, self)
+        self.bRepBodies._items.append(body)
+        return body
+
+    @property
+    def allOccurrences(self):
+        return OccurrenceList(self._walk())
+
+    def _walk(self):
+        for occurrence in self.occurrences._items:
+            yield occurrence
+            yield from occurrence.component._walk()
+
+
+class Occurrence(Entity):
+    def __init__(self, component, offset=(0, 0, 0)):
+        super().__init__()
+        self.component = component
+        self._offset = offset
+        self.name = f'{component.name}:1'
+        self.isLightBulbOn = True
+        self.isVisible = True
+
+    @property
+    def boundingBox(self):
+        _app._cost('boundingBox')
+        boxes = [body.createForAssemblyContext(self).boundingBox for body in self.component.bRepBodies]
+        if not boxes:
+            return None
+        return BoundingBox3D(
+            Point3D(min(b.minPoint.x for b in boxes), min(b.minPoint.y for b in boxes), min(b.minPoint.z for b in boxes)),
+            Point3D(max(b.maxPoint.x for b in boxes), max(b.maxPoint.y for b in boxes), max(b.maxPoint.z for b in boxes)))
+
+    @property
+    def bRepBodies(self):
+        return [body.createForAssemblyContext(self) for body in self.component.bRepBodies]
+
+    @property
+    def transform2(self):
+        return core.Matrix3D()
+
+    def __eq__(self, other):
+        return isinstance(other, Occurrence) and other.entityToken == self.entityToken
+
+    def __hash__(self):
+        return hash(self.entityToken)
+
+
+class OccurrenceList(Base):
+    def __init__(self, occurrences):
+        self._items = list(occurrences)
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class Occurrences(OccurrenceList):
+    def __init__(self, component):
+        super().__init__([])
+        self._component = component
+
+    def add_component(self, component, offset=(0, 0, 0)) -> Occurrence:
+        """Adds an occurrence of the component moved by offset. Not part of the Fusion API."""
+        occurrence = Occurrence(component, offset)
+        self._items.append(occurrence)
+        return occurrence
+
+
+# ---- Design and export ----
+
+class ExportOptions(Base):
+    def __init__(self, filename, geometry):
+        self.filename = filename
+        self.geometry = geometry
+
+
+class ExportManager(Base):
+    def __init__(self):
+        self.exported = []
+
+    def createSTEPExportOptions(self, filename, geometry=None):
+        return ExportOptions(filename, geometry)
+
+    def createSTLExportOptions(self, geometry, filename=''):
+        return ExportOptions(filename, geometry)
+
+    def createFusionArchiveExportOptions(self, filename, geometry=None):
+        return ExportOptions(filename, geometry)
+
+    def execute(self, exportOptions):
+        _app._cost('export')
+        self.exported.append(exportOptions.filename)
+        return True
+
+
+class UnitsManager(Base):
+    defaultLengthUnits = 'mm'
+
+
+class Design(Base):
+    def __init__(self):
+        self._entities = {}
+        self.timeline = Timeline()
+        self.designType = DesignTypes.ParametricDesignType
+        self.exportManager = ExportManager()
+        self.unitsManager = UnitsManager()
+        self.attributes = None
+        self.rootComponent = None
+        self.userParameters = None
+
+    def _create_contents(self):
+        self.attributes = Attributes(self)
+        self.rootComponent = Component('root')
+        self.userParameters = Parameters()
+
+    def findEntityByToken(self, entityToken):
+        _app._cost('findEntityByToken')
+        entity = self._entities.get(entityToken)
+        return [entity] if entity is not None and entity.isValid else []
+
+    def findAttributes(self, groupName, attributeName):
+        _app._cost('findAttributes')
+        found = []
+        for parent in [self] + list(self._entities.values()):
+            if not parent.isValid:
+                continue
+            for attribute in parent.attributes:
+                if groupName and attribute.groupName != groupName:
+                    continue
+                if attributeName and attribute.name != attributeName:
+                    continue
+                found.append(attribute)
+        return found
+
+    def computeAll(self):
+        _app._cost('computeAll')
+        return True
+
+    @property
+    def allComponents(self):
+        return [self.rootComponent] + [occurrence.component for occurrence in self.rootComponent.allOccurrences]
+
+
+class FusionDocument(Base):
+    def __init__(self, name='Untitled'):
+        self.name = name
+        self.design = Design()
+
+    @staticmethod
+    def cast(object):
+        return object
+
+
+def new_document(name: str = 'Untitled') -> FusionDocument:
+    """Creates an empty design and makes it the active document. Not part of the Fusion API."""
+    document = FusionDocument(name)
+    _app.activeDocument = document
+    document.design._create_contents()
+    return document
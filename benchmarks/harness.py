@@ -0,0 +1,99 @@
+# Runs the add-in outside of Fusion on the stand-in adsk package in benchmarks/fake_adsk.
+# Importing this module puts the stand-in on the path, points the per-user data folder at
+# a temporary folder and makes the add-in folder importable as the CombineCut package.
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+BENCHMARKS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+ADDIN_FOLDER = os.path.dirname(BENCHMARKS_FOLDER)
+ADDIN_PACKAGE = 'CombineCut'
+
+sys.path.insert(0, os.path.join(BENCHMARKS_FOLDER, 'fake_adsk'))
+import adsk.core  # noqa: E402
+import adsk.fusion  # noqa: E402
+
+# Keep the pair library, log and metrics written by the add-in out of the user's data folder
+DATA_FOLDER = tempfile.mkdtemp(prefix='combine_cut_bench_')
+for variable in ('APPDATA', 'XDG_DATA_HOME'):
+    os.environ[variable] = DATA_FOLDER
+os.environ['HOME'] = DATA_FOLDER
+
+if ADDIN_PACKAGE not in sys.modules:
+    package = types.ModuleType(ADDIN_PACKAGE)
+    package.__path__ = [ADDIN_FOLDER]
+    sys.modules[ADDIN_PACKAGE] = package
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+
+def load(module_name: str = 'commands.combineCut.entry'):
+    """Imports a module of the add-in, such as the entry module of a command."""
+    return importlib.import_module(f'{ADDIN_PACKAGE}.{module_name}')
+
+
+def make_design(pair_count: int, tools_per_pair: int = 1):
+    """Creates a design with pair_count Plate_<n> target components, each with a Text_<n>
+    tool component whose bodies lie inside the plate.
+
+    :returns:
+        The design and the (plate occurrence, text occurrence) of every pair.
+    """
+    document = adsk.fusion.new_document()
+    root = document.design.rootComponent
+    columns = max(1, int(pair_count ** 0.5))
+    pairs = []
+    for index in range(pair_count):
+        offset = ((index % columns) * 20.0, (index // columns) * 20.0, 0.0)
+        plate = adsk.fusion.Component(f'Plate_{index}')
+        plate.add_body(((0, 0, 0), (10, 10, 1)))
+        text = adsk.fusion.Component(f'Text_{index}')
+        for tool in range(tools_per_pair):
+            text.add_body(((1 + tool, 1, 0.5), (2 + tool, 2, 1.5)), name=f'Body{tool + 1}')
+        pairs.append((root.occurrences.add_component(plate, offset), root.occurrences.add_component(text, offset)))
+    return document.design, pairs
+
+
+def start_command(entry):
+    """Starts the command of an entry module, adding its button the first time, and returns the
+    command the dialog would show."""
+    definition = ui.commandDefinitions.itemById(entry.CMD_ID)
+    if definition is None:
+        entry.start()
+        definition = ui.commandDefinitions.itemById(entry.CMD_ID)
+    return definition.execute()
+
+
+def change(command, command_input) -> bool:
+    """Fires the input changed and validate events Fusion fires after a change in the dialog.
+
+    :returns:
+        True if the dialog inputs are valid.
+    """
+    command.inputChanged.fire(adsk.core.InputChangedEventArgs(command, command_input))
+    args = adsk.core.ValidateInputsEventArgs(command)
+    command.validateInputs.fire(args)
+    return args.areInputsValid
+
+
+def click(command, input_id: str) -> bool:
+    """Clicks a button input of the dialog, see change."""
+    command_input = command.commandInputs.itemById(input_id)
+    command_input.value = True
+    return change(command, command_input)
+
+
+def fire(command, event_name: str):
+    """Fires one of the command events without inputs, such as execute or executePreview."""
+    args = adsk.core.CommandEventArgs(command)
+    getattr(command, event_name).fire(args)
+    return args
+
+
+def stop_command(entry, command):
+    """Closes the dialog and removes the command button."""
+    fire(command, 'destroy')
+    entry.stop()
@@ -1,29 +1,64 @@
 # Here you define the commands that will be added to your add-in.
 
-# TODO Import the modules corresponding to the commands you created.
-# If you want to add an additional command, duplicate one of the existing directories and import it here.
-# You need to use aliases (import "entry" as "my_module") assuming you have the default module named "entry".
-from .commandDialog import entry as commandDialog
-from .paletteShow import entry as paletteShow
-from .paletteSend import entry as paletteSend
-from .combineCut import entry as combineCut
+# If you want to add an additional command, duplicate one of the existing directories and add its name here.
+# The "entry" module of a command is only imported when the command is enabled, or when another
+# module asks for it with get_command, so disabled commands add nothing to the add-in's startup.
+import importlib
+import time
 
-# TODO add your imported modules to this list.
-# Fusion will automatically call the start() and stop() functions.
-commands = [
-    combineCut
-]
+from ..lib import fusionAddInUtils as futil
+
+# TODO set the commands you want to add to the add-in to True.
+# Fusion will automatically call the start() and stop() functions of the enabled commands.
+# The palette commands are off in the released add-in. Set paletteShow to True to get the palette
+# that calls Combine Cut through the RPC layer (combineCut.pairStatus, combineCut.runPairs),
+# receives batched messages and shows the recorded timings; paletteSend sends it test messages.
+COMMANDS = {
+    'combineCut': True,
+    'variantGenerate': True,
+    'commandDialog': False,
+    'paletteShow': False,
+    'paletteSend': False,
+}
+
+# Entry modules imported so far, by command name.
+_loaded = {}
+
+
+def get_command(name: str):
+    """Returns the entry module of a command, importing it the first time.
+
+    Arguments:
+    name -- The name of the command's directory, as listed in COMMANDS.
+    """
+    module = _loaded.get(name)
+    if module is None:
+        if name not in COMMANDS:
+            raise KeyError(f'Unknown command: {name}')
+        module = _loaded[name] = importlib.import_module(f'.{name}.entry', __name__)
+    return module
 
 
 # Assumes you defined a "start" function in each of your modules.
 # The start function will be run when the add-in is started.
+# Every enabled entry module is imported here because its start function creates the command's
+# button. The time taken to import and to start each command is recorded as the
+# startup.<name>.import and startup.<name>.start spans.
 def start():
-    for command in commands:
+    for name, enabled in COMMANDS.items():
+        if not enabled:
+            continue
+        phase_start = time.perf_counter()
+        command = get_command(name)
+        loaded = time.perf_counter()
         command.start()
+        futil.record_span(f'startup.{name}.import', loaded - phase_start)
+        futil.record_span(f'startup.{name}.start', time.perf_counter() - loaded)
 
 
 # Assumes you defined a "stop" function in each of your modules.
 # The stop function will be run when the add-in is stopped.
+# Only the commands that were imported are stopped.
 def stop():
-    for command in commands:
-        command.stop()
\ No newline at end of file
+    for command in _loaded.values():
+        command.stop()
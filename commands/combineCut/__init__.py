@@ -0,0 +1,4 @@
+# The Combine Cut command.
+# entry.py runs the dialog and cutter.py makes the features; they are the only modules of the
+# package that import the Fusion API. The other modules work on the objects they are given, so
+# plan_offline.py and the benchmarks run them outside of Fusion with plain Python.
@@ -0,0 +1,79 @@
+# Chunked execution of long running batches.
+# A BatchJob runs a fixed list of steps a chunk at a time. The caller schedules each chunk,
+# typically from a custom event, so Fusion can process UI events between chunks, and checks
+# for cancellation between steps. The job only tracks progress.
+import time
+
+
+class BatchJob:
+    """Runs steps in chunks and keeps track of progress, rate and remaining time.
+
+    Arguments:
+    steps -- The list of items to process.
+    run_step -- Function called with each item.
+    chunk_size -- Number of steps run by each call to run_chunk.
+    on_finished -- Optional function called with the job once it is finished or cancelled.
+    """
+
+    def __init__(self, steps: list, run_step, chunk_size: int = 25, on_finished=None):
+        self.steps = steps
+        self.run_step = run_step
+        self.chunk_size = max(1, chunk_size)
+        self.on_finished = on_finished
+        self.done = 0
+        self.cancelled = False
+        self.start_time = None
+        self.end_time = None
+
+    @property
+    def total(self) -> int:
+        return len(self.steps)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.cancelled or self.done >= self.total
+
+    @property
+    def elapsed(self) -> float:
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.perf_counter()) - self.start_time
+
+    @property
+    def rate(self) -> float:
+        """Steps completed per second."""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float:
+        """Estimated seconds until the remaining steps are done."""
+        rate = self.rate
+        return (self.total - self.done) / rate if rate > 0 else 0.0
+
+    def status(self) -> str:
+        return f'{self.done} of {self.total} done, {self.rate:.1f}/s, about {self.eta:.0f}s left'
+
+    def run_chunk(self):
+        """Runs up to chunk_size steps. Calls on_finished when the last step is done."""
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        end = min(self.done + self.chunk_size, self.total)
+        while self.done < end and not self.cancelled:
+            self.run_step(self.steps[self.done])
+            self.done += 1
+        if self.is_finished:
+            self.finish()
+
+    def cancel(self):
+        """Stops the job before its next step."""
+        if not self.is_finished:
+            self.cancelled = True
+            self.finish()
+
+    def finish(self):
+        if self.end_time is not None:
+            return
+        self.end_time = time.perf_counter()
+        if self.on_finished:
+            self.on_finished(self)
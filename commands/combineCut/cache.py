@@ -0,0 +1,43 @@
+# Small least recently used cache used to keep preview results between preview events.
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A mapping that holds at most capacity items, evicting the least recently used.
+
+    Arguments:
+    capacity -- Maximum number of items kept.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Returns the cached value and marks it as recently used."""
+        if key in self.items:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return self.items[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """Adds or replaces a value, evicting the oldest item when the cache is full."""
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
@@ -0,0 +1,102 @@
+import adsk.core
+import adsk.fusion
+
+# Name of the timeline group every Combine Cut run is collected in, followed by its number of cuts.
+TIMELINE_GROUP_NAME = 'Combine Cut'
+
+
+# Cuts the tool bodies from the target body with a single CombineFeature.
+def combine_cut(root: adsk.fusion.Component, target_body: adsk.fusion.BRepBody, tools: list):
+    tool_bodies = adsk.core.ObjectCollection.create()
+    for body in tools:
+        tool_bodies.add(body)
+    combine_features = root.features.combineFeatures
+    combine_input = combine_features.createInput(target_body, tool_bodies)
+    combine_input.operation = adsk.fusion.FeatureOperations.CutFeatureOperation
+    combine_input.isKeepToolBodies = True
+    return combine_features.add(combine_input)
+
+
+# Returns the matrix that takes geometry from the tool occurrence space into the target occurrence space.
+def relative_transform(target_occurrence: adsk.fusion.Occurrence, tool_occurrence: adsk.fusion.Occurrence):
+    matrix = tool_occurrence.transform2.copy()
+    target_inverse = target_occurrence.transform2.copy()
+    target_inverse.invert()
+    matrix.transformBy(target_inverse)
+    return matrix
+
+
+# Computes the cut result for one target body in memory with the temporary B-Rep manager.
+# Nothing is added to the design and nothing is recomputed. Each tool is moved by its matrix in
+# transforms, if one is given, see relative_transform. The returned body is in the space of the
+# target component.
+def temporary_cut(target_body: adsk.fusion.BRepBody, tools: list, transforms: list = None):
+    brep = adsk.fusion.TemporaryBRepManager.get()
+    result = brep.copy(target_body)
+    for index, tool in enumerate(tools):
+        tool_copy = brep.copy(tool)
+        transform = transforms[index] if transforms else None
+        if transform:
+            brep.transform(tool_copy, transform)
+        brep.booleanOperation(result, tool_copy, adsk.fusion.BooleanTypes.DifferenceBooleanType)
+    return result
+
+
+# Replaces target bodies with precomputed temporary bodies inside one base feature per component.
+# The original bodies are removed with a RemoveFeature so the timeline gets a fixed number of entries
+# per component regardless of how many cuts were made. Returns the features that were added.
+def commit_base_features(results: list) -> list:
+    by_component = {}
+    for target_body, result in results:
+        by_component.setdefault(target_body.parentComponent.entityToken, []).append((target_body, result))
+    features = []
+    for component_results in by_component.values():
+        component = component_results[0][0].parentComponent
+        base_feature = component.features.baseFeatures.add()
+        features.append(base_feature)
+        base_feature.startEdit()
+        added = []
+        try:
+            for target_body, result in component_results:
+                added.append((target_body.name, component.bRepBodies.add(result, base_feature)))
+        finally:
+            base_feature.finishEdit()
+        for target_body, _ in component_results:
+            features.append(component.features.removeFeatures.add(target_body))
+        for name, new_body in added:
+            new_body.name = name
+    return features
+
+
+# Collects the timeline entries of the features a run made into one collapsed group named after the
+# number of cuts, so a run takes one entry in the timeline however many cuts it made. Nothing is
+# grouped in direct modeling designs, which have no timeline, when the features have fewer than
+# two entries, or when other entries lie between them, such as features added while a batch was
+# running. Returns the group, or None.
+def group_timeline(design: adsk.fusion.Design, features: list, cut_count: int):
+    if design.designType != adsk.fusion.DesignTypes.ParametricDesignType:
+        return None
+    indices = sorted(feature.timelineObject.index for feature in features)
+    if len(indices) < 2 or indices[-1] - indices[0] != len(indices) - 1:
+        return None
+    group = design.timeline.timelineGroups.add(indices[0], indices[-1])
+    group.name = f'{TIMELINE_GROUP_NAME}: {cut_count} cuts'
+    group.isCollapsed = True
+    return group
+
+
+# Deletes features made by Combine Cut. The Combine Cut timeline groups that only hold these
+# features are removed first so no empty groups are left behind. Returns the number of groups removed.
+def delete_features(design: adsk.fusion.Design, features: list) -> int:
+    tokens = {feature.entityToken for feature in features}
+    removed = 0
+    if design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
+        for group in list(design.timeline.timelineGroups):
+            if not group.name.startswith(TIMELINE_GROUP_NAME):
+                continue
+            if all(item.entity is not None and item.entity.entityToken in tokens for item in group):
+                group.deleteMe(False)
+                removed += 1
+    for feature in features:
+        feature.deleteMe()
+    return removed
@@ -1,7 +1,11 @@
 import adsk.core
+import adsk.fusion
 import os
+import threading
+import time
 from ...lib import fusionAddInUtils as futil
 from ... import config
+from . import batch, cache, cutter, fingerprint, pair_model, pair_sets, pair_store, pairing, planner, precheck, report, snapshot, spatial
 app = adsk.core.Application.get()
 ui = app.userInterface
 
@@ -26,8 +30,72 @@ ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resource
 # they are not released and garbage collected.
 local_handlers = []
 
-# Keep track of the number of pairs
-pair_count = 1
+# Auto Pair modes. Name pairs matching wildcard text, overlap pairs every tool with the targets its bounding box touches.
+PAIR_BY_NAME = 'Name'
+PAIR_BY_OVERLAP = 'Bounding Box Overlap'
+
+# Execute actions. Cut runs the selected pairs, update rebuilds earlier cuts whose inputs changed and
+# compact merges the cuts earlier runs made on the same target into one cut.
+ACTION_CUT = 'Cut Selected Pairs'
+ACTION_UPDATE = 'Update Changed Cuts'
+ACTION_COMPACT = 'Compact Earlier Cuts'
+
+# Custom event used to run batches in chunks so the UI stays responsive and the batch can be cancelled.
+BATCH_EVENT_ID = f'{CMD_ID}_batchChunk'
+DEFAULT_CHUNK_SIZE = 25
+
+# Options of a run by the id of the dialog input that sets them, with the values used when the
+# run doesn't come from the dialog. show_report has no input; it shows the report of the run in a
+# message box when the run ends, otherwise the report is only written to disk and logged.
+RUN_DEFAULTS = {
+    'batch_cuts': True,
+    'bulk_mode': False,
+    'precheck': True,
+    'precheck_oriented': False,
+    'chunk_size': DEFAULT_CHUNK_SIZE,
+    'continue_on_error': True,
+    'show_report': True,
+}
+
+# Name of the pair set saved in the design when no other name is given.
+DEFAULT_PAIR_SET = 'default'
+
+# Number of preview cut results kept between preview events besides those of the current preview,
+# keyed by target body and tool set. The cache grows to hold every cut of the current preview.
+PREVIEW_CACHE_SIZE = 64
+
+# Custom event used to recompute the preview once the pairs have stopped changing. Cuts that are
+# not cached yet are only computed when no pair has changed for PREVIEW_DELAY seconds.
+PREVIEW_EVENT_ID = f'{CMD_ID}_previewRefresh'
+PREVIEW_DELAY = 0.3
+
+# Every pair of the dialog. Only the current page has inputs, which are reused when the page changes.
+pair_rows = pair_model.PairModel()
+
+# Preview results of the current command, so changing one pair only recomputes that pair's cut.
+preview_cache = cache.LRUCache(PREVIEW_CACHE_SIZE)
+
+# Cut operations of the last preview with the pair revision and batch option they were planned for,
+# and the bodies and keys resolved for the preview, kept while the dialog is open.
+preview_plan = None
+preview_bodies = {}
+preview_occurrences = {}
+preview_keys = {}
+
+# Pair library, created on first use.
+pair_library = None
+
+# The batch that is currently running, if any, and its progress dialog.
+batch_job = None
+progress_dialog = None
+
+# Report of the last run that ended.
+last_report = None
+
+# The open command dialog, the time its pairs last changed and the timer of a deferred preview.
+active_command = None
+last_pair_change = 0.0
+preview_timer = None
 
 
 # Executed when add-in is run.
@@ -51,9 +119,31 @@ def start():
     # Specify if the command is promoted to the main toolbar. 
     control.isPromoted = IS_PROMOTED
 
+    # Register the custom event that runs each chunk of a batch.
+    batch_event = app.registerCustomEvent(BATCH_EVENT_ID)
+    futil.add_handler(batch_event, batch_chunk)
+
+    # Register the custom event that recomputes a deferred preview.
+    preview_event = app.registerCustomEvent(PREVIEW_EVENT_ID)
+    futil.add_handler(preview_event, preview_refresh)
+
+    # Let the palette query the pairs and cut part of a saved pair set.
+    futil.register_rpc('combineCut.pairStatus', rpc_pair_status)
+    futil.register_rpc('combineCut.runPairs', rpc_run_pairs, slow=True)
+
 
 # Executed when add-in is stopped.
 def stop():
+    # Stop any running batch without reporting it and remove the custom event
+    if batch_job:
+        batch_job.on_finished = None
+        batch_job.cancel()
+    app.unregisterCustomEvent(BATCH_EVENT_ID)
+    cancel_preview_timer()
+    app.unregisterCustomEvent(PREVIEW_EVENT_ID)
+    futil.unregister_rpc('combineCut.pairStatus')
+    futil.unregister_rpc('combineCut.runPairs')
+
     # Get the various UI elements for this command
     workspace = ui.workspaces.itemById(WORKSPACE_ID)
     panel = workspace.toolbarPanels.itemById(PANEL_ID)
@@ -71,27 +161,60 @@ def stop():
 
 # Function that is called when a user clicks the corresponding button in the UI.
 # This defines the contents of the command dialog and connects to the command related events.
+@futil.span('combineCut.created')
 def command_created(args: adsk.core.CommandCreatedEventArgs):
-    global pair_count
+    global active_command
     # General logging for debug.
     futil.log(f'{CMD_NAME} Command Created Event')
+    active_command = args.command
 
     # https://help.autodesk.com/view/fusion360/ENU/?contextId=CommandInputs
     inputs = args.command.commandInputs
-    group = inputs.addGroupCommandInput('pairs_group', 'Target/Tool Pairs')
-    group_inputs = group.children
-    # Add the first pair
-    group_inputs.addSelectionInput(f'plate_0', 'Target Component', 'Select the target component').addSelectionFilter('Occurrences')
-    group_inputs.itemById(f'plate_0').setSelectionLimits(1, 1)
-    group_inputs.addSelectionInput(f'text_0', 'Tool Component', 'Select the tool component').addSelectionFilter('Occurrences')
-    group_inputs.itemById(f'text_0').setSelectionLimits(1, 1)
+    inputs.addGroupCommandInput('pairs_group', 'Target/Tool Pairs')
+    # Add the page buttons and the first pair, more rows are created when a page needs them
+    inputs.addBoolValueInput('prev_page', 'Previous Page', False, '', False)
+    inputs.addBoolValueInput('next_page', 'Next Page', False, '', False)
+    inputs.addTextBoxCommandInput('page_label', '', '', 1, True)
+    pair_rows.reset()
+    show_page(inputs)
     # Add + button
     inputs.addBoolValueInput('add_pair', 'Add Pair', False, '', False)
     # Add Save and Load buttons
+    inputs.addStringValueInput('pair_set_name', 'Pair Set Name', DEFAULT_PAIR_SET)
     inputs.addBoolValueInput('save_pairs', 'Save Pairs', False, '', False)
     inputs.addBoolValueInput('load_pairs', 'Load Pairs', False, '', False)
+    # Add naming rule inputs and the Auto Pair button
+    inputs.addStringValueInput('target_pattern', 'Target Name Rule', 'Plate_*')
+    inputs.addStringValueInput('tool_pattern', 'Tool Name Rule', 'Text_*')
+    pair_by_input = inputs.addDropDownCommandInput('pair_by', 'Pair By', adsk.core.DropDownStyles.TextListDropDownStyle)
+    pair_by_input.listItems.add(PAIR_BY_NAME, True)
+    pair_by_input.listItems.add(PAIR_BY_OVERLAP, False)
+    inputs.addBoolValueInput('auto_pair', 'Auto Pair by Name', False, '', False)
+    # Add the buttons that hand large designs to the offline planner, plan_offline.py
+    inputs.addBoolValueInput('export_snapshot', 'Export Snapshot', False, '', False)
+    inputs.addBoolValueInput('import_plan', 'Import Plan', False, '', False)
     # Add Info button
     inputs.addBoolValueInput('info', 'Why manual selection?', False, '', False)
+    # Cut each target once with all of its tools instead of once per pair
+    inputs.addBoolValueInput('batch_cuts', 'Batch Cuts per Target', True, '', True)
+    # Compute every cut in memory and commit the results in one base feature per component.
+    # The cuts of a bulk run are not recorded, so Update Changed Cuts and Compact Earlier Cuts skip them.
+    bulk_input = inputs.addBoolValueInput('bulk_mode', 'Bulk Mode (Base Feature)', True, '', False)
+    bulk_input.tooltip = 'Faster for many cuts. Update Changed Cuts and Compact Earlier Cuts can\'t change cuts made in bulk mode.'
+    # Drop tool bodies whose bounding boxes do not touch their target before cutting
+    inputs.addBoolValueInput('precheck', 'Skip Non-Touching Tools', True, '', True)
+    inputs.addBoolValueInput('precheck_oriented', 'Use Oriented Boxes', True, '', False)
+    # Choose between cutting the selected pairs and updating the cuts made by earlier runs
+    action_input = inputs.addDropDownCommandInput('action', 'Action', adsk.core.DropDownStyles.TextListDropDownStyle)
+    action_input.listItems.add(ACTION_CUT, True)
+    action_input.listItems.add(ACTION_UPDATE, False)
+    action_input.listItems.add(ACTION_COMPACT, False)
+    # Show the cut results while the dialog is open
+    inputs.addBoolValueInput('show_preview', 'Show Preview', True, '', True)
+    # Number of cuts made between UI updates and cancellation checks
+    inputs.addIntegerSpinnerCommandInput('chunk_size', 'Cuts per Chunk', 1, 1000, 1, DEFAULT_CHUNK_SIZE)
+    # Record a failed cut in the run report and carry on with the next one instead of stopping the run
+    inputs.addBoolValueInput('continue_on_error', 'Keep Going After Failures', True, '', RUN_DEFAULTS['continue_on_error'])
 
     # Connect to the events that are needed by this command.
     futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
@@ -103,152 +226,803 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
 
 # This event handler is called when the user clicks the OK button in the command dialog or 
 # is immediately called after the created event not command inputs were created for the dialog.
+@futil.span('combineCut.execute')
 def command_execute(args: adsk.core.CommandEventArgs):
     futil.log(f'{CMD_NAME} Command Execute Event')
     inputs = args.command.commandInputs
-    group = inputs.itemById('pairs_group')
-    group_inputs = group.children
-    pairs = []
-    for idx in range(pair_count):
-        plate_input = group_inputs.itemById(f'plate_{idx}')
-        text_input = group_inputs.itemById(f'text_{idx}')
-        if not plate_input or not text_input:
-            continue
-        if plate_input.selectionCount == 0 or text_input.selectionCount == 0:
-            continue
-        plate_occurrence = plate_input.selection(0).entity
-        text_occurrence = text_input.selection(0).entity
-        pairs.append((plate_occurrence, text_occurrence))
+    action = selected_action(inputs)
+    if action == ACTION_UPDATE:
+        update_changed_cuts(inputs)
+        return
+    if action == ACTION_COMPACT:
+        compact_cuts(inputs)
+        return
+    run_pairs(run_options(inputs), collect_pairs(inputs), 'Combine/Cut finished')
+
+
+# Returns the (target occurrences, tool occurrences) of every complete pair in the dialog, on any page.
+def collect_pairs(inputs: adsk.core.CommandInputs) -> list:
+    return pair_rows.complete_pairs()
+
+
+# Returns the run options set in the dialog, see RUN_DEFAULTS.
+def run_options(inputs: adsk.core.CommandInputs) -> dict:
+    options = dict(RUN_DEFAULTS)
+    for input_id in options:
+        command_input = inputs.itemById(input_id)
+        if command_input:
+            options[input_id] = command_input.value
+    return options
+
+
+# Plans, prechecks and cuts the (target occurrences, tool occurrences) pairs using the given run options.
+# Parametric cuts run as a chunked batch. Pairs that can't be cut and cuts that fail are recorded in
+# the run report instead of stopping the run to ask the user; the report, titled with the message,
+# is written and shown once the batch is finished. The features the run made are collected in one
+# timeline group. Returns the number of cuts planned.
+def run_pairs(options: dict, pairs: list, message: str, run_report: report.RunReport = None) -> int:
     design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+    run_report = run_report or report.RunReport(message)
+    operations, occurrences, stats = plan_operations(options, pairs, run_report)
+    if stats:
+        run_report.notes.append(f'Precheck: {stats}')
+    if options['bulk_mode']:
+        features = run_bulk(design, operations, occurrences, run_report, options['continue_on_error'])
+        if features is None:
+            run_report.title = 'Combine/Cut stopped by a failure, no cuts were committed'
+        else:
+            cutter.group_timeline(design, features, run_report.count(report.OK))
+        finish_run(run_report, options['show_report'], stopped_by_failure=features is None)
+        return len(operations)
     root = design.rootComponent
-    for plate_occurrence, text_occurrence in pairs:
-        plate_component = plate_occurrence.component
-        plate_body = plate_component.bRepBodies.itemByName(plate_component.name)
-        text_component = text_occurrence.component
-        if not plate_body:
-            ui.messageBox(f'Target body "{plate_component.name}" not found')
+    features = []
+
+    def cut_finished(job: batch.BatchJob):
+        run_report.phases['cut'] = job.elapsed
+        cutter.group_timeline(design, features, len(features))
+        # Without Keep Going After Failures the first failure cancels the batch
+        stopped_by_failure = job.cancelled and not options['continue_on_error'] and run_report.count(report.FAILED) > 0
+        if stopped_by_failure:
+            run_report.title = f'Combine/Cut stopped by a failure after {job.done} of {job.total} cuts'
+        elif job.cancelled:
+            run_report.title = f'Combine/Cut cancelled after {job.done} of {job.total} cuts'
+        finish_run(run_report, options['show_report'], cancelled=job.cancelled, stopped_by_failure=stopped_by_failure)
+
+    def cut_step(operation: planner.CutOperation):
+        feature = cut_operation(root, operation, occurrences, run_report, options['continue_on_error'])
+        if feature:
+            features.append(feature)
+
+    start_batch(batch.BatchJob(operations, cut_step, options['chunk_size'], cut_finished))
+    return len(operations)
+
+
+# Resolves, plans and, if the options ask for it, prechecks the (target occurrences, tool occurrences)
+# pairs. Pairs that can't be cut are recorded in the run report and the time of each phase is added
+# to its phases. Returns the cut operations, the map of planner.occurrence_body_key to occurrence
+# and the precheck stats, or None if the precheck was off.
+def plan_operations(options: dict, pairs: list, run_report: report.RunReport) -> tuple:
+    phase_start = time.perf_counter()
+    resolved, occurrences = resolve_pairs(pairs, run_report)
+    operations = planner.plan_matrix_cuts(resolved, batch=options['batch_cuts'], key=planner.occurrence_body_key)
+    add_phase(run_report, 'plan', time.perf_counter() - phase_start)
+    futil.log(f'{CMD_NAME} planned {len(operations)} cuts for {len(resolved)} pairs')
+    stats = None
+    if options['precheck']:
+        phase_start = time.perf_counter()
+        operations, stats = precheck.precheck_operations(operations, occurrences, options['precheck_oriented'],
+                                                         key=planner.occurrence_body_key)
+        add_phase(run_report, 'precheck', time.perf_counter() - phase_start)
+        futil.log(f'{CMD_NAME} precheck: {stats}')
+    return operations, occurrences, stats
+
+
+# Adds time to a phase of the run report, so runs that plan several times report the total.
+def add_phase(run_report: report.RunReport, phase: str, seconds: float):
+    run_report.phases[phase] = run_report.phases.get(phase, 0.0) + seconds
+
+
+# Writes the report of a run to the reports folder of the per-user data folder, logs its summary
+# and shows it in one message box at the end of the run when show is set.
+def finish_run(run_report: report.RunReport, show: bool, cancelled: bool = False, stopped_by_failure: bool = False):
+    global last_report
+    run_report.finish(cancelled, stopped_by_failure)
+    path = run_report.write(futil.get_data_path('reports'))
+    last_report = run_report
+    summary = run_report.summary()
+    futil.log(f'{CMD_NAME} {run_report.title}\n{summary}\nReport written to {path}')
+    if show:
+        ui.messageBox(f'{run_report.title}\n\n{summary}\n\nFull report: {path}')
+
+
+# Shows the progress dialog and schedules the first chunk of the batch.
+def start_batch(job: batch.BatchJob):
+    global batch_job, progress_dialog
+    if batch_job and not batch_job.is_finished:
+        batch_job.cancel()
+    batch_job = job
+    progress_dialog = ui.createProgressDialog()
+    progress_dialog.isCancelButtonShown = True
+    progress_dialog.show(CMD_NAME, 'Cutting %v of %m', 0, max(job.total, 1))
+    app.fireCustomEvent(BATCH_EVENT_ID)
+
+
+# This event handler runs one chunk of the current batch, updates the progress dialog and schedules
+# the next chunk. Cancelling from the dialog stops the batch between cuts.
+def batch_chunk(args: adsk.core.CustomEventArgs):
+    global batch_job, progress_dialog
+    job = batch_job
+    if job is None:
+        return
+    try:
+        if progress_dialog.wasCancelled:
+            job.cancel()
+        else:
+            job.run_chunk()
+            progress_dialog.progressValue = job.done
+            progress_dialog.message = f'Cutting %v of %m\n{job.status()}'
+    except:
+        job.cancel()
+        raise
+    finally:
+        if job.is_finished:
+            progress_dialog.hide()
+            batch_job = None
+            progress_dialog = None
+    if batch_job is job:
+        app.fireCustomEvent(BATCH_EVENT_ID)
+
+
+# Answers the palette's pair status query with a range of the dialog's pairs and the progress of
+# the running batch. The params may give the first pair, start, and the number of pairs, count.
+def rpc_pair_status(params: dict) -> dict:
+    start = int(params.get('start', 0))
+    count = int(params.get('count', pair_model.PAGE_SIZE))
+    rows = []
+    for idx, row in enumerate(pair_rows.rows[start:start + count], start):
+        rows.append({
+            'index': idx,
+            'target': selection_name(row.plates, row.plate_name),
+            'tool': selection_name(row.texts, row.text_name),
+            'complete': row.is_complete,
+        })
+    job = batch_job
+    return {
+        'dialogOpen': active_command is not None,
+        'pairs': len(pair_rows),
+        'complete': pair_rows.complete_count,
+        'rows': rows,
+        'batch': {'done': job.done, 'total': job.total, 'status': job.status()} if job else None,
+        'lastReport': {'title': last_report.title, 'summary': last_report.summary(), 'path': last_report.path} if last_report else None,
+    }
+
+
+# Cuts a range of a pair set saved in the design for the palette, as a batch with the default run
+# options. The params may give the pair set name, set, the first pair, start, the number of pairs,
+# count, and run options that replace the defaults, options. The run is unattended: its report is
+# not shown unless the options set show_report, the palette finds it through combineCut.pairStatus.
+def rpc_run_pairs(params: dict) -> dict:
+    if batch_job and not batch_job.is_finished:
+        raise RuntimeError('A batch is already running')
+    set_name = params.get('set') or DEFAULT_PAIR_SET
+    design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+    records = pair_sets.load_pair_set(design, set_name)
+    if records is None:
+        raise ValueError(f'No pair set named "{set_name}" in this design')
+    start = int(params.get('start', 0))
+    records = records[start:start + int(params.get('count', len(records)))]
+    resolved, _ = pair_sets.resolve_records(design, records, build_occurrence_index)
+    message = f'Cut pairs {start + 1} to {start + len(records)} of "{set_name}"'
+    run_report = report.RunReport(message)
+    for record, pair in zip(records, resolved):
+        if pair is None:
+            run_report.skip(f'{record["plate"]} - {record["text"]}', 'Components of the saved pair not found')
+    pairs = [pair for pair in resolved if pair]
+    options = dict(RUN_DEFAULTS, show_report=False)
+    options.update((name, value) for name, value in params.get('options', {}).items() if name in RUN_DEFAULTS)
+    cuts = run_pairs(options, pairs, message, run_report)
+    return {'pairs': len(pairs), 'missing': len(records) - len(pairs), 'cuts': cuts}
+
+
+# Finds the target bodies and tool bodies of each pair of target occurrences and tool occurrences.
+# Each occurrence is looked up once however many pairs it is part of, and the same body objects
+# are returned for it every time, so the planner only computes one key per body. The bodies are
+# in the assembly context of their occurrence, so the occurrences of one component are told apart.
+# Returns the (target bodies, tool bodies) of the pairs with at least one target and one tool
+# body and a map of planner.occurrence_body_key to the occurrence the body was found in.
+# Occurrences that can not be resolved are recorded as skipped in the run report, if one is given.
+# The preview passes the bodies_by_occurrence and occurrences maps of earlier calls so the
+# occurrences they hold are not resolved again.
+def resolve_pairs(pairs: list, run_report: report.RunReport = None, bodies_by_occurrence: dict = None,
+                  occurrences: dict = None):
+    resolved = []
+    occurrences = {} if occurrences is None else occurrences
+    bodies_by_occurrence = {} if bodies_by_occurrence is None else bodies_by_occurrence
+
+    def occurrence_bodies(occurrence, is_target: bool) -> list:
+        key = (occurrence.entityToken, is_target)
+        bodies = bodies_by_occurrence.get(key)
+        if bodies is None:
+            component = occurrence.component
+            if is_target:
+                body = component.bRepBodies.itemByName(component.name)
+                bodies = [body.createForAssemblyContext(occurrence)] if body else []
+                if not body and run_report:
+                    run_report.skip(occurrence.name, f'Target body "{component.name}" not found')
+            elif component:
+                bodies = [body.createForAssemblyContext(occurrence) for body in component.bRepBodies]
+            else:
+                bodies = []
+                if run_report:
+                    run_report.skip(occurrence.name, 'Tool component not found')
+            for body in bodies:
+                occurrences[planner.occurrence_body_key(body)] = occurrence
+            bodies_by_occurrence[key] = bodies
+        return bodies
+
+    for plate_occurrences, text_occurrences in pairs:
+        targets = [body for occurrence in plate_occurrences for body in occurrence_bodies(occurrence, True)]
+        tools = [body for occurrence in text_occurrences for body in occurrence_bodies(occurrence, False)]
+        if targets and tools:
+            resolved.append((targets, tools))
+    return resolved, occurrences
+
+
+# Cuts one operation with a CombineFeature and records the fingerprint of its inputs on the feature.
+# The time the cut took, or its error, is added to the run report. An error is raised again, which
+# stops the batch, unless keep_going is set. Returns the feature, or None if the cut failed.
+def cut_operation(root: adsk.fusion.Component, operation: planner.CutOperation, occurrences: dict,
+                  run_report: report.RunReport, keep_going: bool):
+    target_occurrence = occurrences[operation.key]
+    step_start = time.perf_counter()
+    try:
+        with futil.span('combineCut.combine'):
+            feature = cutter.combine_cut(root, operation.target, operation.tools)
+        tool_occurrences = unique_occurrences(occurrences[key] for key in tool_keys(operation))
+        cut_fingerprint = fingerprint.cut_fingerprint(operation.target, [occurrence.component for occurrence in tool_occurrences])
+        fingerprint.record_cut(feature, cut_fingerprint, target_occurrence, tool_occurrences)
+    except Exception as error:
+        run_report.fail(target_occurrence.name, time.perf_counter() - step_start, error,
+                        tools=len(operation.tools), pairs=operation.pair_indices)
+        if not keep_going:
+            raise
+        return None
+    run_report.add(report.OK, target_occurrence.name, time.perf_counter() - step_start,
+                   tools=len(operation.tools), pairs=operation.pair_indices)
+    return feature
+
+
+# Rebuilds the cuts made by earlier runs whose target or tool inputs no longer match their fingerprint.
+# Cuts whose inputs did not change are left alone.
+def update_changed_cuts(inputs: adsk.core.CommandInputs):
+    design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+    unchanged = 0
+    stale = 0
+    changed_pairs = []
+    changed_features = []
+    for feature, record in fingerprint.recorded_cuts(design):
+        target_occurrence = find_entity(design, record['target_occurrence'])
+        tool_occurrences = [find_entity(design, token) for token in record['tool_occurrences']]
+        if target_occurrence is None or None in tool_occurrences:
+            stale += 1
             continue
-        if not text_component:
-            ui.messageBox(f'Tool component "{text_component.name}" not found')
+        plate_component = target_occurrence.component
+        target_body = plate_component.bRepBodies.itemByName(plate_component.name)
+        if target_body:
+            current = fingerprint.cut_fingerprint(target_body, [occurrence.component for occurrence in tool_occurrences])
+            if current == record['fingerprint']:
+                unchanged += 1
+                continue
+        changed_features.append(feature)
+        changed_pairs.append(((target_occurrence,), tuple(tool_occurrences)))
+    cutter.delete_features(design, changed_features)
+    message = f'Rebuilt {len(changed_pairs)} changed cuts, {unchanged} cuts unchanged.'
+    if stale:
+        message += f'\n{stale} cuts refer to components that no longer exist and were skipped.'
+    message += bulk_cuts_note(design)
+    futil.log(f'{CMD_NAME} update: {message}')
+    if changed_pairs:
+        run_pairs(run_options(inputs), changed_pairs, message)
+    else:
+        ui.messageBox(message)
+
+
+# Returns the entity with the given entity token, or None if it no longer exists.
+def find_entity(design: adsk.fusion.Design, token: str):
+    entities = design.findEntityByToken(token)
+    return entities[0] if entities else None
+
+
+# Returns the body of a component that an assembly context body stands for. Temporary cuts are
+# made on these bodies, with the tools moved by tool_transforms.
+def native_body(body):
+    return body.nativeObject or body
+
+
+# Returns the matrix of every tool of an operation that moves it from the space of its occurrence
+# into the space of the target's component, or None for a tool whose occurrences are not known.
+def tool_transforms(operation: planner.CutOperation, occurrences: dict) -> list:
+    target_occurrence = occurrences.get(operation.key)
+    transforms = []
+    for key in tool_keys(operation):
+        tool_occurrence = occurrences.get(key)
+        if target_occurrence and tool_occurrence:
+            transforms.append(cutter.relative_transform(target_occurrence, tool_occurrence))
+        else:
+            transforms.append(None)
+    return transforms
+
+
+# Returns the occurrence_body_key of every tool of an operation, in the order of its tools.
+def tool_keys(operation: planner.CutOperation) -> list:
+    return [planner.occurrence_body_key(tool) for tool in operation.tools]
+
+
+# Returns the occurrences in their first order of appearance with duplicates removed.
+def unique_occurrences(occurrences) -> list:
+    unique = {}
+    for occurrence in occurrences:
+        unique.setdefault(occurrence.entityToken, occurrence)
+    return list(unique.values())
+
+
+# Merges the cuts earlier runs made on the same target occurrence into one cut with the union of their
+# tools, run as a new batch in its own timeline group. Tools cut more than once from a target are only
+# cut once, and the timeline groups of earlier runs that are left empty are removed. Targets with a
+# single cut are left alone, as are cuts whose occurrences no longer exist.
+def compact_cuts(inputs: adsk.core.CommandInputs):
+    design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+    by_target = {}
+    for feature, record in fingerprint.recorded_cuts(design):
+        by_target.setdefault(record['target_occurrence'], []).append((feature, record))
+    stale = 0
+    merged_features = []
+    merged_pairs = []
+    for target_token, cuts in by_target.items():
+        if len(cuts) < 2:
+            continue
+        tool_tokens = list(dict.fromkeys(token for _, record in cuts for token in record['tool_occurrences']))
+        target_occurrence = find_entity(design, target_token)
+        tool_occurrences = [find_entity(design, token) for token in tool_tokens]
+        if target_occurrence is None or None in tool_occurrences:
+            stale += 1
             continue
-        tool_bodies = adsk.core.ObjectCollection.create()
-        for body in text_component.bRepBodies:
-            tool_bodies.add(body)
-        combine_features = root.features.combineFeatures
-        combine_input = combine_features.createInput(plate_body, tool_bodies)
-        combine_input.operation = adsk.fusion.FeatureOperations.CutFeatureOperation
-        combine_input.isKeepToolBodies = True
-        combine_features.add(combine_input)
-    ui.messageBox('Combine/Cut operation completed successfully for all pairs')
+        merged_features.extend(feature for feature, _ in cuts)
+        merged_pairs.append(((target_occurrence,), tuple(tool_occurrences)))
+    if not merged_pairs:
+        ui.messageBox('Nothing to compact, every target has a single Combine Cut.' + bulk_cuts_note(design))
+        return
+    removed_groups = cutter.delete_features(design, merged_features)
+    message = (f'Merged {len(merged_features)} cuts on {len(merged_pairs)} targets, '
+               f'{removed_groups} empty timeline groups removed.')
+    if stale:
+        message += f'\n{stale} targets refer to components that no longer exist and were skipped.'
+    message += bulk_cuts_note(design)
+    futil.log(f'{CMD_NAME} compact: {message}')
+    run_pairs(run_options(inputs), merged_pairs, message)
+
+
+# Returns a line for the update and compact messages that tells how many cuts of the design were
+# made in bulk mode and left alone, or an empty string if there are none.
+def bulk_cuts_note(design: adsk.fusion.Design) -> str:
+    count = fingerprint.bulk_cut_count(design)
+    if not count:
+        return ''
+    return f'\n{count} cuts made in Bulk Mode can\'t be updated or compacted and were left alone.'
+
+
+# Returns the action the dialog is set to, see ACTION_CUT.
+def selected_action(inputs: adsk.core.CommandInputs) -> str:
+    action_input = inputs.itemById('action')
+    return action_input.selectedItem.name if action_input else ACTION_CUT
+
+
+# Applies the planned cuts without a recompute per cut. Every result is computed in memory,
+# committed in one base feature per component and the design is recomputed once at the end.
+# The occurrences of a component share its bodies, so the operations on one body through several
+# occurrences are merged into one cut, with every tool moved into the space of that component.
+# A cut that fails is recorded in the run report and left out; unless keep_going is set nothing
+# is committed after a failure. Returns the features that were added, or None if the run stopped
+# because of a failure.
+def run_bulk(design: adsk.fusion.Design, operations: list, occurrences: dict, run_report: report.RunReport, keep_going: bool):
+    phase_start = time.perf_counter()
+    by_body = {}
+    for operation in operations:
+        by_body.setdefault(native_body(operation.target).entityToken, []).append(operation)
+    results = []
+    for body_operations in by_body.values():
+        target_body = native_body(body_operations[0].target)
+        names = []
+        tools = []
+        transforms = []
+        pair_indices = []
+        for operation in body_operations:
+            target_occurrence = occurrences.get(operation.key)
+            names.append(target_occurrence.name if target_occurrence else operation.target.name)
+            tools.extend(native_body(tool) for tool in operation.tools)
+            transforms.extend(tool_transforms(operation, occurrences))
+            pair_indices.extend(operation.pair_indices)
+        name = ', '.join(dict.fromkeys(names))
+        step_start = time.perf_counter()
+        try:
+            with futil.span('combineCut.temporaryCut'):
+                result = cutter.temporary_cut(target_body, tools, transforms)
+        except Exception as error:
+            run_report.fail(name, time.perf_counter() - step_start, error, tools=len(tools), pairs=pair_indices)
+            if not keep_going:
+                return None
+            continue
+        run_report.add(report.OK, name, time.perf_counter() - step_start, tools=len(tools), pairs=pair_indices)
+        results.append((target_body, result))
+    run_report.phases['boolean'] = time.perf_counter() - phase_start
+
+    phase_start = time.perf_counter()
+    features = cutter.commit_base_features(results)
+    if features:
+        fingerprint.record_bulk_run(features[0], len(results))
+    run_report.phases['commit'] = time.perf_counter() - phase_start
+
+    phase_start = time.perf_counter()
+    design.computeAll()
+    run_report.phases['recompute'] = time.perf_counter() - phase_start
+    return features
 
 
 # This event handler is called when the command needs to compute a new preview in the graphics window.
+@futil.span('combineCut.preview')
 def command_preview(args: adsk.core.CommandEventArgs):
     # General logging for debug.
     futil.log(f'{CMD_NAME} Command Preview Event')
     inputs = args.command.commandInputs
+    preview_input = inputs.itemById('show_preview')
+    if selected_action(inputs) != ACTION_CUT or not (preview_input and preview_input.value):
+        return
+    batch_input = inputs.itemById('batch_cuts')
+    operations = preview_operations(inputs, batch_input.value if batch_input else True)
+    occurrences = preview_occurrences
+    # Every cut of this preview stays cached, along with the most recent cuts of earlier pairs
+    preview_cache.capacity = len(operations) + PREVIEW_CACHE_SIZE
+    design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+    graphics = design.rootComponent.customGraphicsGroups.add()
+    # While the pairs are still changing only the cached cuts are shown
+    wait = PREVIEW_DELAY - (time.perf_counter() - last_pair_change)
+    computed = 0
+    deferred = 0
+    for operation in operations:
+        key = (operation.key, frozenset(operation.tool_keys))
+        body = preview_cache.get(key)
+        if body is None:
+            if wait > 0:
+                deferred += 1
+                continue
+            body = preview_cut(operation, occurrences)
+            preview_cache.put(key, body)
+            computed += 1
+        graphics.addBRepBody(body)
+        operation.target.isLightBulbOn = False
+    if deferred:
+        schedule_preview(wait)
+    futil.log(f'{CMD_NAME} preview: {len(operations) - deferred} cuts shown, {computed} computed, {deferred} deferred')
+
+
+# Returns the cut operations of the dialog's pairs for the preview. They are only planned again
+# when the pairs or the batch option changed, and then only occurrences that no earlier preview
+# resolved are looked up, so preview events that don't change the pairs make no calls per pair.
+def preview_operations(inputs: adsk.core.CommandInputs, batch_cuts: bool) -> list:
+    global preview_plan
+    plan_key = (pair_rows.revision, batch_cuts)
+    if preview_plan is None or preview_plan[0] != plan_key:
+        resolved, _ = resolve_pairs(collect_pairs(inputs), bodies_by_occurrence=preview_bodies,
+                                    occurrences=preview_occurrences)
+        preview_plan = (plan_key, planner.plan_matrix_cuts(resolved, batch=batch_cuts, key=preview_key))
+    return preview_plan[1]
+
+
+# Returns the planner.occurrence_body_key of a body resolved for the preview, computed once per body.
+# The bodies are kept in preview_bodies while the dialog is open, so their ids are not reused.
+def preview_key(body) -> tuple:
+    key = preview_keys.get(id(body))
+    if key is None:
+        key = preview_keys[id(body)] = planner.occurrence_body_key(body)
+    return key
+
+
+# Recomputes the preview of the open dialog after the given delay, replacing any earlier request.
+def schedule_preview(delay: float):
+    global preview_timer
+    cancel_preview_timer()
+    preview_timer = threading.Timer(delay, app.fireCustomEvent, (PREVIEW_EVENT_ID,))
+    preview_timer.daemon = True
+    preview_timer.start()
+
+
+# Stops a deferred preview that has not been recomputed yet.
+def cancel_preview_timer():
+    global preview_timer
+    if preview_timer:
+        preview_timer.cancel()
+        preview_timer = None
+
+
+# Handles the deferred preview custom event by asking the open dialog for a new preview.
+def preview_refresh(args: adsk.core.CustomEventArgs):
+    global preview_timer
+    preview_timer = None
+    if active_command:
+        active_command.doExecutePreview()
+
+
+# Computes the cut result of one operation with temporary bodies and moves it into root space for display.
+@futil.span('combineCut.previewCut')
+def preview_cut(operation: planner.CutOperation, occurrences: dict):
+    target_occurrence = occurrences.get(operation.key)
+    body = cutter.temporary_cut(native_body(operation.target), [native_body(tool) for tool in operation.tools],
+                                tool_transforms(operation, occurrences))
+    if target_occurrence:
+        adsk.fusion.TemporaryBRepManager.get().transform(body, target_occurrence.transform2)
+    return body
 
 
 # This event handler is called when the user changes anything in the command dialog
 # allowing you to modify values of other inputs based on that change.
+@futil.span('combineCut.inputChanged')
 def command_input_changed(args: adsk.core.InputChangedEventArgs):
     import json
-    global pair_count
+    global last_pair_change
     changed_input = args.input
-    inputs = args.inputs
+    # args.inputs only holds the inputs of the changed input's group, the page inputs are found from the command
+    inputs = changed_input.parentCommand.commandInputs
     group = inputs.itemById('pairs_group')
     if not group:
         return
     group_inputs = group.children
     if changed_input.id == 'add_pair':
-        pair_count += 1
-        idx = pair_count - 1
-        plate_input = group_inputs.addSelectionInput(f'plate_{idx}', f'Target Component {idx+1}', 'Select the target component')
-        plate_input.addSelectionFilter('Occurrences')
-        plate_input.setSelectionLimits(1, 1)
-        group_inputs.addTextBoxCommandInput(f'plate_name_{idx}', '', '', 1, True)
-        text_input = group_inputs.addSelectionInput(f'text_{idx}', f'Tool Component {idx+1}', 'Select the tool component')
-        text_input.addSelectionFilter('Occurrences')
-        text_input.setSelectionLimits(1, 1)
-        group_inputs.addTextBoxCommandInput(f'text_name_{idx}', '', '', 1, True)
+        pair_rows.append()
+        last_pair_change = time.perf_counter()
+        show_page(inputs)
+        changed_input.value = False
+    elif changed_input.id in ('prev_page', 'next_page'):
         changed_input.value = False
+        step = -1 if changed_input.id == 'prev_page' else 1
+        if pair_rows.set_page(pair_rows.page + step):
+            show_page(inputs)
     elif changed_input.id == 'save_pairs':
         changed_input.value = False
-        pairs = []
-        for i in range(0, len(group_inputs), 2):
-            plate_input = group_inputs.item(i)
-            text_input = group_inputs.item(i+1)
-            if plate_input.selectionCount == 0 or text_input.selectionCount == 0:
-                continue
-            plate_name = plate_input.selection(0).entity.component.name
-            text_name = text_input.selection(0).entity.component.name
-            pairs.append({"plate": plate_name, "text": text_name})
-        save_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plate_text_pairs.json')
-        with open(save_path, 'w') as f:
-            json.dump(pairs, f)
-        ui.messageBox(f'Saved {len(pairs)} pairs.')
+        records = [pair_sets.make_record(plate_occurrences, text_occurrences) for plate_occurrences, text_occurrences in collect_pairs(inputs)]
+        set_name = inputs.itemById('pair_set_name').value or DEFAULT_PAIR_SET
+        design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+        pair_sets.save_pair_set(design, set_name, records)
+        # The set is also added to the pair library so it can be loaded into other designs
+        get_pair_store().save(set_name, records)
+        ui.messageBox(f'Saved {len(records)} pairs as "{set_name}".')
     elif changed_input.id == 'load_pairs':
         changed_input.value = False
-        save_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plate_text_pairs.json')
-        if not os.path.exists(save_path):
-            ui.messageBox('No saved pairs found.')
+        set_name = inputs.itemById('pair_set_name').value or DEFAULT_PAIR_SET
+        design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+        records = pair_sets.load_pair_set(design, set_name)
+        if records is None:
+            # Fall back to the pair library, for sets saved from another design. Its records are
+            # read from the library as they are loaded.
+            records = get_pair_store().load(set_name)
+        if records is None:
+            # Fall back to pairs saved in the add-in folder by earlier versions
+            save_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plate_text_pairs.json')
+            if not os.path.exists(save_path):
+                ui.messageBox('No saved pairs found.')
+                return
+            with open(save_path, 'r') as f:
+                records = json.load(f)
+        load_records(inputs, design, records)
+    elif changed_input.id == 'export_snapshot':
+        changed_input.value = False
+        file_dialog = ui.createFileDialog()
+        file_dialog.title = 'Export Snapshot'
+        file_dialog.filter = 'Combine Cut Snapshots (*.ccsnap)'
+        if file_dialog.showSave() == adsk.core.DialogResults.DialogOK:
+            design_snapshot = build_snapshot()
+            snapshot.write_snapshot(file_dialog.filename, design_snapshot)
+            ui.messageBox(f'Exported {design_snapshot.occurrence_count} occurrences and {design_snapshot.body_count} bodies.\n\n'
+                          f'Plan them with plan_offline.py in the add-in folder and load the plan with Import Plan.')
+    elif changed_input.id == 'import_plan':
+        changed_input.value = False
+        file_dialog = ui.createFileDialog()
+        file_dialog.title = 'Import Plan'
+        file_dialog.filter = 'Combine Cut Plans (*.json)'
+        if file_dialog.showOpen() == adsk.core.DialogResults.DialogOK:
+            with open(file_dialog.filename, 'r') as f:
+                records = json.load(f)
+            design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+            load_records(inputs, design, records)
+    elif changed_input.id == 'auto_pair':
+        changed_input.value = False
+        target_pattern = inputs.itemById('target_pattern').value
+        tool_pattern = inputs.itemById('tool_pattern').value
+        index = build_occurrence_index()
+        if inputs.itemById('pair_by').selectedItem.name == PAIR_BY_OVERLAP:
+            pairs = pair_by_overlap(index, target_pattern, tool_pattern)
+        else:
+            pairs = pairing.pair_by_rule(index, target_pattern, tool_pattern)
+        if not pairs:
+            ui.messageBox(f'No components match the rule "{target_pattern}" <-> "{tool_pattern}".')
             return
-        with open(save_path, 'r') as f:
-            pairs = json.load(f)
-        # Clear current inputs
-        for i in reversed(range(group_inputs.count)):
-            group_inputs.item(i).deleteMe()
-        # Add loaded pairs with tooltips and default text
-        for idx, pair in enumerate(pairs):
-            plate_input = group_inputs.addSelectionInput(f'plate_{idx}', f'Target Component {idx+1}', f'Select the target component (saved: {pair["plate"]})')
-            plate_input.addSelectionFilter('Occurrences')
-            plate_input.setSelectionLimits(1, 1)
-            plate_input.tooltip = f'Select the target component named: {pair["plate"]}'
-            plate_input.prompt = f'Saved: {pair["plate"]}'
-            group_inputs.addTextBoxCommandInput(f'plate_name_{idx}', '', pair["plate"], 1, True)
-            text_input = group_inputs.addSelectionInput(f'text_{idx}', f'Tool Component {idx+1}', f'Select the tool component (saved: {pair["text"]})')
-            text_input.addSelectionFilter('Occurrences')
-            text_input.setSelectionLimits(1, 1)
-            text_input.tooltip = f'Select the tool component named: {pair["text"]}'
-            text_input.prompt = f'Saved: {pair["text"]}'
-            group_inputs.addTextBoxCommandInput(f'text_name_{idx}', '', pair["text"], 1, True)
-        pair_count = len(pairs) if pairs else 1
-        ui.messageBox(f'Loaded {len(pairs)} pairs. Please reselect the components in the UI.')
+        pair_rows.reset([pair_model.PairRow((plate_occurrence,), (text_occurrence,)) for plate_occurrence, text_occurrence in pairs])
+        last_pair_change = time.perf_counter()
+        show_page(inputs)
+        futil.log(f'{CMD_NAME} auto paired {len(pairs)} pairs with "{target_pattern}" <-> "{tool_pattern}"')
     elif changed_input.id == 'info':
         changed_input.value = False
-        ui.messageBox('It is annoying, I know. Fusion 360 does not allow add-ins to automatically select components in the UI.\n\nYou must manually reselect the components for each pair. The saved names are shown to help you choose the correct ones.')
-    # Update text boxes when a selection changes
+        ui.messageBox('Pair sets saved in this design are restored directly. Pairs saved from another design and the Auto Pair rule select components by name.\n\nWhen a saved component is not found, or a name is used by more than one component, select the component for that pair manually. The saved names are shown to help you choose the correct ones.')
+    # Store the selection in its pair and update the text box when a selection changes
     if changed_input.id.startswith('plate_') or changed_input.id.startswith('text_'):
         # Find the index
-        if '_' in changed_input.id:
-            prefix, idx = changed_input.id.split('_', 1)
-            name_box_id = f'{prefix}_name_{idx}'
-            name_box = group_inputs.itemById(name_box_id)
-            if name_box:
-                if changed_input.selectionCount > 0:
-                    name_box.text = changed_input.selection(0).entity.component.name
-                else:
-                    name_box.text = ''
+        prefix, slot = changed_input.id.split('_', 1)
+        if slot.isdigit():
+            idx = pair_rows.row_index(int(slot))
+            if idx < len(pair_rows):
+                occurrences = [changed_input.selection(index).entity for index in range(changed_input.selectionCount)]
+                if pair_rows.select(idx, prefix, occurrences):
+                    last_pair_change = time.perf_counter()
+                show_pair_row(group_inputs, int(slot), idx, pair_rows.rows[idx])
     futil.log(f'{CMD_NAME} Input Changed Event fired from a change to {changed_input.id}')
 
 
+# Shows pair records, from a saved pair set or a plan, as the pairs of the dialog. The records are
+# read once, so they can be streamed from the pair library.
+def load_records(inputs: adsk.core.CommandInputs, design: adsk.fusion.Design, records):
+    global last_pair_change
+    # Keep the saved names for the tooltips and default text, selecting the occurrences that were found
+    names = []
+
+    def remember_names(records):
+        for record in records:
+            plate_names = pair_sets.record_names(record, 'plate')
+            text_names = pair_sets.record_names(record, 'text')
+            names.append((pair_model.describe(plate_names[0], len(plate_names)), pair_model.describe(text_names[0], len(text_names))))
+            yield record
+
+    resolved, fallbacks = pair_sets.resolve_records(design, remember_names(records), build_occurrence_index)
+    rows = [pair_model.PairRow(*(occurrences or ((), ())), plate_name, text_name)
+            for (plate_name, text_name), occurrences in zip(names, resolved)]
+    selected = sum(1 for row in rows if row.is_complete)
+    pair_rows.reset(rows)
+    last_pair_change = time.perf_counter()
+    show_page(inputs)
+    futil.log(f'{CMD_NAME} loaded {len(rows)} pairs, {fallbacks} resolved by name')
+    if selected == len(rows):
+        ui.messageBox(f'Loaded {len(rows)} pairs.')
+    else:
+        ui.messageBox(f'Loaded {len(rows)} pairs, {len(rows) - selected} could not be found. Please select the remaining components in the UI.')
+
+
+# Collects every occurrence that has bodies, with its bodies, into a snapshot for the offline planner.
+# Boxes are in world space, so one boundingBox call is made per occurrence and per body.
+def build_snapshot() -> snapshot.Snapshot:
+    design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+    builder = snapshot.SnapshotBuilder()
+    for occurrence in design.rootComponent.allOccurrences:
+        bounding_box = occurrence.boundingBox
+        if bounding_box is None or not occurrence.component.bRepBodies.count:
+            continue
+        index = builder.add_occurrence(occurrence.component.name, occurrence.entityToken,
+                                       occurrence.transform2.asArray(), spatial.box_from_bounding_box(bounding_box))
+        for body in occurrence.bRepBodies:
+            builder.add_body(index, body.name, spatial.box_from_bounding_box(body.boundingBox))
+    return builder.snapshot
+
+
+# Returns the pair library kept in the per-user data folder.
+def get_pair_store() -> pair_store.PairStore:
+    global pair_library
+    if pair_library is None:
+        pair_library = pair_store.PairStore(futil.get_data_path('pairs'))
+    return pair_library
+
+
+# Indexes every occurrence in the active design by component name.
+def build_occurrence_index() -> dict:
+    design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+    return pairing.build_name_index(design.rootComponent.allOccurrences)
+
+
+# Pairs every tool matching the tool rule with each target matching the target rule whose
+# bounding box it overlaps. One boundingBox call is made per occurrence and the overlap
+# tests run through the spatial index.
+def pair_by_overlap(index: dict, target_pattern: str, tool_pattern: str) -> list:
+    targets, target_boxes = occurrence_boxes(pairing.select_by_rule(index, target_pattern))
+    tools, tool_boxes = occurrence_boxes(pairing.select_by_rule(index, tool_pattern))
+    matches = spatial.overlapping_pairs(tool_boxes, target_boxes)
+    pairs = []
+    for tool_index, target_index in sorted(matches, key=lambda match: (match[1], match[0])):
+        if tools[tool_index] != targets[target_index]:
+            pairs.append((targets[target_index], tools[tool_index]))
+    return pairs
+
+
+# Returns the occurrences that have geometry along with their world space bounding boxes.
+def occurrence_boxes(occurrences: list):
+    kept = []
+    boxes = []
+    for occurrence in occurrences:
+        bounding_box = occurrence.boundingBox
+        if bounding_box is None or not occurrence.component.bRepBodies.count:
+            continue
+        kept.append(occurrence)
+        boxes.append(spatial.box_from_bounding_box(bounding_box))
+    return kept, boxes
+
+
+# Adds the selection inputs and name boxes for one row of the page. The inputs are kept for
+# the life of the dialog and show a different pair each time the page changes. Each input takes
+# any number of components, every target of a row being cut by every tool of the row.
+def add_pair_row(group_inputs: adsk.core.CommandInputs, slot: int):
+    for prefix, label in (('plate', 'Target'), ('text', 'Tool')):
+        selection_input = group_inputs.addSelectionInput(f'{prefix}_{slot}', f'{label} Components', f'Select the {label.lower()} components')
+        selection_input.addSelectionFilter('Occurrences')
+        selection_input.setSelectionLimits(1, 0)
+        group_inputs.addTextBoxCommandInput(f'{prefix}_name_{slot}', '', '', 1, True)
+
+
+# Copies the pairs of the current page into the row inputs, creating rows the first time the page
+# needs them and hiding the rows past the end of the list.
+def show_page(inputs: adsk.core.CommandInputs):
+    group_inputs = inputs.itemById('pairs_group').children
+    rows = pair_rows.page_rows()
+    slot = 0
+    while group_inputs.itemById(f'plate_{slot}') or slot < len(rows):
+        if slot < len(rows):
+            if not group_inputs.itemById(f'plate_{slot}'):
+                add_pair_row(group_inputs, slot)
+            show_pair_row(group_inputs, slot, pair_rows.row_index(slot), rows[slot], select=True)
+        else:
+            for input_id in (f'plate_{slot}', f'plate_name_{slot}', f'text_{slot}', f'text_name_{slot}'):
+                group_inputs.itemById(input_id).isVisible = False
+        slot += 1
+    update_page_controls(inputs)
+
+
+# Shows one pair in the given row of the page. The selections are only replaced when select is
+# set, otherwise just the name boxes and tooltips are updated.
+def show_pair_row(group_inputs: adsk.core.CommandInputs, slot: int, idx: int, row: pair_model.PairRow, select: bool = False):
+    for prefix, label, occurrences, saved_name in (('plate', 'Target', row.plates, row.plate_name), ('text', 'Tool', row.texts, row.text_name)):
+        selection_input = group_inputs.itemById(f'{prefix}_{slot}')
+        name_box = group_inputs.itemById(f'{prefix}_name_{slot}')
+        if select:
+            selection_input.clearSelection()
+            for occurrence in occurrences:
+                selection_input.addSelection(occurrence)
+        if saved_name:
+            selection_input.tooltip = f'Select the {label.lower()} components named: {saved_name}'
+        else:
+            selection_input.tooltip = f'Select the {label.lower()} components'
+        name_box.text = f'{idx + 1}. {selection_name(occurrences, saved_name)}'
+        selection_input.isVisible = True
+        name_box.isVisible = True
+
+
+# Returns the text shown for the selected occurrences of a pair, or the saved name when nothing is selected.
+def selection_name(occurrences: tuple, saved_name: str) -> str:
+    if not occurrences:
+        return saved_name
+    return pair_model.describe(occurrences[0].component.name, len(occurrences))
+
+
+# Shows the current page and enables the page buttons that lead to another page.
+def update_page_controls(inputs: adsk.core.CommandInputs):
+    inputs.itemById('page_label').text = f'Page {pair_rows.page + 1} of {pair_rows.page_count} ({len(pair_rows)} pairs)'
+    inputs.itemById('prev_page').isEnabled = pair_rows.page > 0
+    inputs.itemById('next_page').isEnabled = pair_rows.page < pair_rows.page_count - 1
+
+
 # This event handler is called when the user interacts with any of the inputs in the dialog
 # which allows you to verify that all of the inputs are valid and enables the OK button.
+@futil.span('combineCut.validate')
 def command_validate_input(args: adsk.core.ValidateInputsEventArgs):
     inputs = args.inputs
-    group = inputs.itemById('pairs_group')
-    group_inputs = group.children
-    valid = True
-    for idx in range(pair_count):
-        plate_input = group_inputs.itemById(f'plate_{idx}')
-        text_input = group_inputs.itemById(f'text_{idx}')
-        if not plate_input or not text_input:
-            valid = False
-            break
-        if plate_input.selectionCount == 0 or text_input.selectionCount == 0:
-            valid = False
-            break
-    args.areInputsValid = valid
+    if selected_action(inputs) != ACTION_CUT:
+        args.areInputsValid = True
+        return
+    # The pair list keeps count of its complete pairs, so this does not depend on the number of pairs
+    args.areInputsValid = pair_rows.is_complete
 
 
 # This event handler is called when the command terminates.
@@ -256,6 +1030,14 @@ def command_destroy(args: adsk.core.CommandEventArgs):
     # General logging for debug.
     futil.log(f'{CMD_NAME} Command Destroy Event')
 
-    global local_handlers, pair_count
-    local_handlers = []
-    pair_count = 1 
\ No newline at end of file
+    global active_command, preview_plan
+    # Disconnect the handlers of the dialog so they are released with it
+    futil.remove_handlers(local_handlers)
+    active_command = None
+    cancel_preview_timer()
+    pair_rows.reset()
+    preview_cache.clear()
+    preview_plan = None
+    preview_bodies.clear()
+    preview_occurrences.clear()
+    preview_keys.clear() 
\ No newline at end of file
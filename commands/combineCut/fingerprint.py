@@ -0,0 +1,73 @@
+# Fingerprints of the inputs that produced each Combine Cut feature.
+# A fingerprint covers the target body name and, for every tool component, its body names,
+# the text of its sketch texts and the expressions and values of its model parameters.
+# The values pick up changes to user parameters that the expressions reference. The
+# fingerprint and the occurrences it was built from are stored as an attribute on the
+# CombineFeature so "Update Changed" can rebuild only the cuts whose inputs changed.
+# Bulk mode commits many cuts in shared base features that can't be rebuilt one cut at a time,
+# so its runs only record how many cuts they made, on the first base feature of the run.
+import hashlib
+import json
+
+ATTRIBUTE_GROUP = 'CombineCut'
+CUT_ATTRIBUTE = 'cut'
+BULK_ATTRIBUTE = 'bulkRun'
+
+
+def component_inputs(component) -> dict:
+    """Collects the inputs of a tool component that affect the shape of its bodies."""
+    texts = []
+    for sketch in component.sketches:
+        for sketch_text in sketch.sketchTexts:
+            texts.append([sketch.name, sketch_text.text])
+    parameters = [[parameter.name, parameter.expression, parameter.value] for parameter in component.modelParameters]
+    return {
+        'name': component.name,
+        'bodies': sorted(body.name for body in component.bRepBodies),
+        'texts': texts,
+        'parameters': parameters,
+    }
+
+
+def cut_fingerprint(target_body, tool_components: list) -> str:
+    """Returns a stable hash of everything that goes into cutting the tool components from the target body."""
+    data = {
+        'target': target_body.name,
+        'tools': sorted((component_inputs(component) for component in tool_components), key=lambda inputs: inputs['name']),
+    }
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def record_cut(feature, fingerprint: str, target_occurrence, tool_occurrences: list):
+    """Stores the fingerprint and the entity tokens of the cut's occurrences on the feature."""
+    record = {
+        'fingerprint': fingerprint,
+        'target_occurrence': target_occurrence.entityToken,
+        'tool_occurrences': [occurrence.entityToken for occurrence in tool_occurrences],
+    }
+    feature.attributes.add(ATTRIBUTE_GROUP, CUT_ATTRIBUTE, json.dumps(record))
+
+
+def recorded_cuts(design) -> list:
+    """Returns (feature, record) for every feature in the design that has a cut record."""
+    cuts = []
+    for attribute in design.findAttributes(ATTRIBUTE_GROUP, CUT_ATTRIBUTE):
+        feature = attribute.parent
+        if feature and feature.isValid:
+            cuts.append((feature, json.loads(attribute.value)))
+    return cuts
+
+
+def record_bulk_run(feature, cut_count: int):
+    """Stores the number of cuts a bulk mode run made on the first feature it added."""
+    feature.attributes.add(ATTRIBUTE_GROUP, BULK_ATTRIBUTE, json.dumps({'cuts': cut_count}))
+
+
+def bulk_cut_count(design) -> int:
+    """Returns the number of cuts made by the bulk mode runs whose features are still in the design."""
+    count = 0
+    for attribute in design.findAttributes(ATTRIBUTE_GROUP, BULK_ATTRIBUTE):
+        feature = attribute.parent
+        if feature and feature.isValid:
+            count += json.loads(attribute.value)['cuts']
+    return count
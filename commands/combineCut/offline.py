@@ -0,0 +1,159 @@
+# Pair planning over design snapshots, outside of Fusion.
+# Targets and tools are paired by name rule or by bounding box overlap, and the pairs whose tool
+# bodies don't touch the target body are dropped, as the precheck does before cutting. The work
+# is split into chunks that run on a multiprocessing pool, so a design with a hundred thousand
+# bodies is planned on every core instead of on Fusion's UI thread. The plan has one pair per
+# target holding all of its tools, in assembly order, and is written as a list of pair set records
+# that the Combine Cut dialog loads with Import Plan. plan_offline.py in the add-in folder runs it
+# from the command line.
+import argparse
+import json
+import multiprocessing
+import time
+
+from . import pair_sets, pairing, spatial
+from .snapshot import Snapshot, read_snapshot
+
+# Number of tools (overlap pairing) or pairs (name pairing) handled by one task of the pool.
+CHUNK_SIZE = 2000
+
+# Planning state of the current process, set by _init_worker.
+_context = None
+
+
+class _PlanContext:
+    # The snapshot with the lookups every task needs, built once per process
+
+    def __init__(self, snapshot: Snapshot, targets: list, tolerance: float):
+        self.snapshot = snapshot
+        self.targets = targets
+        self.tolerance = tolerance
+        self.bodies = snapshot.occurrence_bodies()
+        self.target_bodies = {}
+        self.grid = None
+
+    def target_body(self, occurrence: int):
+        # The body named like the target's component, the one Combine Cut cuts
+        if occurrence not in self.target_bodies:
+            name = self.snapshot.names[occurrence]
+            self.target_bodies[occurrence] = next(
+                (body for body in self.bodies[occurrence] if self.snapshot.body_names[body] == name), None)
+        return self.target_bodies[occurrence]
+
+    def touching(self, target: int, tool: int) -> bool:
+        # True if any tool body touches the target body
+        body = self.target_body(target)
+        if body is None:
+            return False
+        target_box = self.snapshot.body_box(body)
+        return any(spatial.boxes_overlap(target_box, self.snapshot.body_box(tool_body), self.tolerance)
+                   for tool_body in self.bodies[tool])
+
+    def overlapping_targets(self, tools: list) -> list:
+        # (target, tool) for every target whose occurrence box overlaps the box of one of the tools
+        if self.grid is None:
+            self.grid = spatial.UniformGrid([self.snapshot.box(target) for target in self.targets])
+        matches = self.grid.query_all([self.snapshot.box(tool) for tool in tools], self.tolerance)
+        return [(self.targets[target_index], tools[tool_index]) for tool_index, target_index in matches]
+
+
+def _init_worker(snapshot: Snapshot, targets: list, tolerance: float):
+    global _context
+    _context = _PlanContext(snapshot, targets, tolerance)
+
+
+def _pair_overlaps(tools: list) -> list:
+    return [(target, tool) for target, tool in _context.overlapping_targets(tools)
+            if target != tool and _context.touching(target, tool)]
+
+
+def _precheck_pairs(pairs: list) -> list:
+    return [(target, tool) for target, tool in pairs if _context.touching(target, tool)]
+
+
+def _chunks(items: list, size: int) -> list:
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def plan_pairs(snapshot: Snapshot, target_pattern: str, tool_pattern: str, by_overlap: bool = False,
+               processes: int = None, chunk_size: int = CHUNK_SIZE, tolerance: float = 0.0) -> list:
+    """Plans the pairs of a snapshot.
+
+    Arguments:
+    snapshot -- The design snapshot.
+    target_pattern -- Naming rule of the target components, such as 'Plate_*'.
+    tool_pattern -- Naming rule of the tool components, such as 'Text_*'.
+    by_overlap -- Pair every tool with each target its box overlaps instead of by the wildcard
+                  text of the rules, like the Auto Pair modes.
+    processes -- Number of worker processes, by default one per CPU. With 1, or when there is
+                 a single chunk of work, everything runs in the calling process.
+    chunk_size -- Number of tools or pairs in one task.
+    tolerance -- Distance by which boxes are grown before testing them.
+
+    :returns:
+        A list of (target index, sorted tool indices) ordered by target index. The result
+        doesn't depend on the number of processes.
+    """
+    index = pairing.build_name_index(range(snapshot.occurrence_count), name=snapshot.names.__getitem__)
+    targets = []
+    if by_overlap:
+        targets = pairing.select_by_rule(index, target_pattern)
+        task = _pair_overlaps
+        chunks = _chunks(pairing.select_by_rule(index, tool_pattern), chunk_size) if targets else []
+    else:
+        task = _precheck_pairs
+        chunks = _chunks(pairing.pair_by_rule(index, target_pattern, tool_pattern), chunk_size)
+
+    if processes == 1 or len(chunks) <= 1:
+        _init_worker(snapshot, targets, tolerance)
+        results = [task(chunk) for chunk in chunks]
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(snapshot, targets, tolerance)) as pool:
+            results = pool.map(task, chunks)
+
+    plan = {}
+    for chunk_pairs in results:
+        for target, tool in chunk_pairs:
+            plan.setdefault(target, set()).add(tool)
+    return [(target, sorted(tools)) for target, tools in sorted(plan.items())]
+
+
+def plan_records(snapshot: Snapshot, plan: list) -> list:
+    """Returns the pair set records of a plan, as saved by the Combine Cut dialog."""
+    names = snapshot.names
+    tokens = snapshot.tokens
+    return [pair_sets.make_named_record([names[target]], [names[tool] for tool in tools],
+                                        [tokens[target]], [tokens[tool] for tool in tools])
+            for target, tools in plan]
+
+
+def write_plan(path: str, snapshot: Snapshot, plan: list):
+    """Writes the plan as a JSON list of pair set records, one line per record."""
+    with open(path, 'w') as f:
+        f.write('[\n')
+        f.write(',\n'.join(json.dumps(record) for record in plan_records(snapshot, plan)))
+        f.write('\n]\n')
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Plan Combine Cut pairs from a design snapshot exported by the add-in.')
+    parser.add_argument('snapshot', help='Snapshot file written by Export Snapshot.')
+    parser.add_argument('plan', help='Plan file to write, for Import Plan.')
+    parser.add_argument('--targets', default='Plate_*', help='Target name rule.')
+    parser.add_argument('--tools', default='Text_*', help='Tool name rule.')
+    parser.add_argument('--overlap', action='store_true', help='Pair by bounding box overlap instead of by name.')
+    parser.add_argument('--processes', type=int, help='Number of worker processes, by default one per CPU.')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--tolerance', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    snapshot = read_snapshot(args.snapshot)
+    loaded = time.perf_counter()
+    plan = plan_pairs(snapshot, args.targets, args.tools, args.overlap, args.processes, args.chunk_size, args.tolerance)
+    planned = time.perf_counter()
+    write_plan(args.plan, snapshot, plan)
+    tool_count = sum(len(tools) for _, tools in plan)
+    print(f'{len(plan)} targets with {tool_count} tools from {snapshot.occurrence_count} occurrences '
+          f'and {snapshot.body_count} bodies: read {loaded - start:.2f}s, plan {planned - loaded:.2f}s, '
+          f'write {time.perf_counter() - planned:.2f}s')
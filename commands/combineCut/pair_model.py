@@ -0,0 +1,132 @@
+# Pair list shown by the Combine Cut dialog.
+# Each row pairs one or more targets with one or more tools, every target of the row being cut
+# by every tool. The dialog only creates inputs for one page of pairs, so the full list is kept
+# here and each page is copied into the reused inputs when it is shown. The number of complete
+# pairs is kept up to date as rows change so the dialog can be validated without looking at
+# every row.
+
+# Number of pair rows shown on one page of the dialog.
+PAGE_SIZE = 10
+
+
+def describe(first_name: str, count: int) -> str:
+    """Returns the text shown for a selection of count components, such as 'Plate_1 +39 more'."""
+    if count <= 1:
+        return first_name
+    return f'{first_name} +{count - 1} more'
+
+
+class PairRow:
+    """One row of the dialog, pairing target occurrences with tool occurrences.
+
+    Arguments:
+    plates -- The selected target occurrences.
+    texts -- The selected tool occurrences.
+    plate_name -- Saved name of the target components, shown while they are not selected.
+    text_name -- Saved name of the tool components, shown while they are not selected.
+    """
+
+    __slots__ = ('plates', 'texts', 'plate_name', 'text_name')
+
+    def __init__(self, plates=(), texts=(), plate_name: str = '', text_name: str = ''):
+        self.plates = tuple(plates)
+        self.texts = tuple(texts)
+        self.plate_name = plate_name
+        self.text_name = text_name
+
+    @property
+    def is_complete(self) -> bool:
+        return bool(self.plates) and bool(self.texts)
+
+
+class PairModel:
+    """The pairs of the dialog split into pages of page_size rows.
+
+    Arguments:
+    page_size -- Number of rows shown on one page.
+    """
+
+    def __init__(self, page_size: int = PAGE_SIZE):
+        self.page_size = page_size
+        self.rows = [PairRow()]
+        self.page = 0
+        self.complete_count = 0
+        # Number of changes made to the rows, so callers can tell when to recompute what they derive from them
+        self.revision = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def is_complete(self) -> bool:
+        """True when every row has both a target and a tool selected."""
+        return self.complete_count == len(self.rows)
+
+    @property
+    def page_count(self) -> int:
+        return max(1, (len(self.rows) + self.page_size - 1) // self.page_size)
+
+    @property
+    def page_start(self) -> int:
+        return self.page * self.page_size
+
+    def page_rows(self) -> list:
+        """Returns the rows of the current page."""
+        return self.rows[self.page_start:self.page_start + self.page_size]
+
+    def row_index(self, slot: int) -> int:
+        """Returns the index in the list of the row shown in the given slot of the current page."""
+        return self.page_start + slot
+
+    def set_page(self, page: int) -> bool:
+        """Moves to the given page, clamped to the existing pages.
+
+        :returns:
+            True if the current page changed.
+        """
+        page = min(max(page, 0), self.page_count - 1)
+        if page == self.page:
+            return False
+        self.page = page
+        return True
+
+    def append(self, row: PairRow = None) -> int:
+        """Adds a row at the end of the list and moves to its page.
+
+        :returns:
+            The index of the new row.
+        """
+        row = row or PairRow()
+        self.rows.append(row)
+        self.complete_count += row.is_complete
+        self.revision += 1
+        self.page = self.page_count - 1
+        return len(self.rows) - 1
+
+    def reset(self, rows: list = None):
+        """Replaces every row and moves to the first page. An empty list leaves one empty row."""
+        self.rows = list(rows) if rows else [PairRow()]
+        self.page = 0
+        self.complete_count = sum(1 for row in self.rows if row.is_complete)
+        self.revision += 1
+
+    def select(self, index: int, prefix: str, occurrences) -> bool:
+        """Sets the targets ('plate') or tools ('text') of a row, clearing them when occurrences is empty.
+
+        :returns:
+            True if the selection of the row changed.
+        """
+        row = self.rows[index]
+        occurrences = tuple(occurrences)
+        attribute = prefix + 's'
+        if getattr(row, attribute) == occurrences:
+            return False
+        was_complete = row.is_complete
+        setattr(row, attribute, occurrences)
+        self.complete_count += row.is_complete - was_complete
+        self.revision += 1
+        return True
+
+    def complete_pairs(self) -> list:
+        """Returns the (targets, tools) of every complete row."""
+        return [(row.plates, row.texts) for row in self.rows if row.is_complete]
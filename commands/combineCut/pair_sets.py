@@ -0,0 +1,98 @@
+# Pair sets stored in the design.
+# Each named set is kept as one design attribute holding a JSON list of records, one per
+# pair, with the component names and the entity tokens of the target and tool occurrences.
+# Tokens resolve straight back to the occurrences; the names are only used, through the
+# name index, for records whose tokens no longer resolve. A pair of several targets or tools
+# also lists every name and token under 'plates', 'texts', 'plate_tokens' and 'text_tokens',
+# while 'plate' and 'text' keep the first ones so earlier versions can still read the set.
+import json
+
+from .fingerprint import ATTRIBUTE_GROUP
+
+PAIR_SET_PREFIX = 'pairs:'
+
+
+def make_record(plate_occurrences, text_occurrences) -> dict:
+    """Returns the stored form of a pair of target occurrences and tool occurrences."""
+    plate_names = [occurrence.component.name for occurrence in plate_occurrences]
+    text_names = [occurrence.component.name for occurrence in text_occurrences]
+    plate_tokens = [occurrence.entityToken for occurrence in plate_occurrences]
+    text_tokens = [occurrence.entityToken for occurrence in text_occurrences]
+    return make_named_record(plate_names, text_names, plate_tokens, text_tokens)
+
+
+def make_named_record(plate_names: list, text_names: list, plate_tokens: list, text_tokens: list) -> dict:
+    """Returns the stored form of a pair from the names and entity tokens of its occurrences."""
+    record = {
+        'plate': plate_names[0],
+        'text': text_names[0],
+        'plate_token': plate_tokens[0],
+        'text_token': text_tokens[0],
+    }
+    if len(plate_names) > 1 or len(text_names) > 1:
+        record.update(plates=plate_names, texts=text_names, plate_tokens=plate_tokens, text_tokens=text_tokens)
+    return record
+
+
+def record_names(record: dict, prefix: str) -> list:
+    """Returns every target ('plate') or tool ('text') name of a record."""
+    return record.get(prefix + 's') or [record[prefix]]
+
+
+def save_pair_set(design, name: str, records: list):
+    """Stores the records as the pair set with the given name, replacing any earlier set of that name."""
+    design.attributes.add(ATTRIBUTE_GROUP, PAIR_SET_PREFIX + name, json.dumps(records))
+
+
+def load_pair_set(design, name: str):
+    """Returns the records of the named pair set, or None if the design has no set of that name."""
+    attribute = design.attributes.itemByName(ATTRIBUTE_GROUP, PAIR_SET_PREFIX + name)
+    if not attribute:
+        return None
+    return json.loads(attribute.value)
+
+
+def resolve_records(design, records, get_name_index) -> tuple:
+    """Resolves stored records to (target occurrences, tool occurrences) pairs.
+
+    Arguments:
+    design -- The design to look the entity tokens up in.
+    records -- Iterable of records as returned by load_pair_set, read once. Records without
+               tokens are resolved by name.
+    get_name_index -- Function returning the component name index. It is only called if a
+                      token is stale, so the assembly is not walked when every token resolves.
+
+    :returns:
+        A tuple of the list of resolved pairs, with None for records of which any target
+        or tool could not be resolved, and the number of records that fell back to the
+        name index.
+    """
+    resolved = []
+    fallbacks = 0
+    name_index = None
+    for record in records:
+        found = {}
+        for prefix in ('plate', 'text'):
+            names = record_names(record, prefix)
+            tokens = record.get(prefix + '_tokens') or [record.get(prefix + '_token')]
+            found[prefix] = [_find(design, token) for token in tokens] if len(tokens) == len(names) else [None] * len(names)
+        if None in found['plate'] or None in found['text']:
+            fallbacks += 1
+            if name_index is None:
+                name_index = get_name_index()
+            for prefix, occurrences in found.items():
+                for index, name in enumerate(record_names(record, prefix)):
+                    matches = name_index.get(name)
+                    occurrences[index] = occurrences[index] or (matches[0] if matches else None)
+        if None in found['plate'] or None in found['text']:
+            resolved.append(None)
+        else:
+            resolved.append((tuple(found['plate']), tuple(found['text'])))
+    return resolved, fallbacks
+
+
+def _find(design, token):
+    if not token:
+        return None
+    entities = design.findEntityByToken(token)
+    return entities[0] if entities else None
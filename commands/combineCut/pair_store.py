@@ -0,0 +1,184 @@
+# Library of named pair sets kept in the per-user data directory.
+# Pairs are appended to a log file as JSON lines: a header line naming the set, one line per
+# pair and an end line with the number of pairs. A small JSON index maps each set name to the
+# offset of its latest header. Saving appends to the log and then replaces the index atomically,
+# so an interrupted save leaves the previous version of every set readable. Loading seeks to the
+# offset from the index and streams only that set's lines. Once the replaced versions take up
+# most of the log, a save rewrites it with only the current version of each set.
+import json
+import os
+
+LOG_NAME = 'pair_library.log'
+INDEX_NAME = 'pair_library.index.json'
+
+# The log is compacted after a save once its replaced versions take up more than this many
+# bytes and more than the current versions.
+COMPACT_MIN_BYTES = 1 << 20
+
+
+class PairStore:
+    """Append-only store of named pair sets.
+
+    Arguments:
+    directory -- Folder holding the log and index files. It is created if needed.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self._index = None
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = self._read_index()
+        return self._index
+
+    def names(self) -> list:
+        """Returns the names of the stored pair sets."""
+        return sorted(self.index)
+
+    def count(self, name: str) -> int:
+        """Returns the number of pairs in the set, or 0 if there is no set of that name."""
+        entry = self.index.get(name)
+        return entry['count'] if entry else 0
+
+    def save(self, name: str, pairs) -> int:
+        """Appends a new version of the named set and makes it the current one.
+
+        Arguments:
+        name -- Name of the set.
+        pairs -- Iterable of JSON serializable pair records. It is consumed once, so a generator can be used.
+
+        :returns:
+            The number of pairs written.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        count = 0
+        with open(self.log_path, 'ab') as f:
+            # Finish the partial last line of an interrupted save so the header starts a line
+            if f.tell() and not self._ends_with_newline():
+                f.write(b'\n')
+            offset = f.tell()
+            # The pair count is only written after the pairs, so they can be written without knowing their number.
+            f.write(_line({'set': name}))
+            for pair in pairs:
+                f.write(_line(pair))
+                count += 1
+            f.write(_line({'end': name, 'count': count}))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell() - offset
+        index = dict(self.index)
+        index[name] = {'offset': offset, 'count': count, 'size': size}
+        self._write_index(index)
+        self._compact_if_wasteful()
+        return count
+
+    def iter_pairs(self, name: str):
+        """Yields the records of the named set one at a time without reading the rest of the library."""
+        entry = self.index.get(name)
+        if not entry:
+            return
+        with open(self.log_path, 'rb') as f:
+            f.seek(entry['offset'])
+            f.readline()
+            for _ in range(entry['count']):
+                yield json.loads(f.readline())
+
+    def load(self, name: str):
+        """Returns an iterator over the records of the named set, see iter_pairs, or None if there
+        is no set of that name."""
+        if name not in self.index:
+            return None
+        return self.iter_pairs(name)
+
+    def compact(self):
+        """Rewrites the log with only the current version of each set, dropping replaced versions."""
+        if not os.path.exists(self.log_path):
+            return
+        temp_log = self.log_path + '.tmp'
+        index = {}
+        with open(temp_log, 'wb') as out:
+            for name in self.names():
+                offset = out.tell()
+                out.write(_line({'set': name}))
+                for pair in self.iter_pairs(name):
+                    out.write(_line(pair))
+                out.write(_line({'end': name, 'count': self.count(name)}))
+                index[name] = {'offset': offset, 'count': self.count(name), 'size': out.tell() - offset}
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_log, self.log_path)
+        self._write_index(index)
+
+    def _compact_if_wasteful(self):
+        # Sizes are missing from indexes written by earlier versions, which only compacts sooner
+        live = sum(entry.get('size', 0) for entry in self.index.values())
+        replaced = os.path.getsize(self.log_path) - live
+        if replaced > COMPACT_MIN_BYTES and replaced > live:
+            self.compact()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.log_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            return self._rebuild_index()
+
+    def _rebuild_index(self) -> dict:
+        # Recovers the index from the log if it was damaged. A version of a set is only complete
+        # once its end line gives the number of pairs that were read since its header, and the
+        # last complete version of each set wins. A version cut short by an interrupted save,
+        # whether mid line or between lines, has no end line, so the previous version of that
+        # set stays current.
+        index = {}
+        if not os.path.exists(self.log_path):
+            return index
+        name = None
+        entry = None
+        with open(self.log_path, 'rb') as f:
+            offset = f.tell()
+            line = f.readline()
+            while line:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The partial line of a save that was interrupted mid line
+                    record = None
+                    name = None
+                if isinstance(record, dict) and set(record) == {'set'}:
+                    name = record['set']
+                    entry = {'offset': offset, 'count': 0, 'size': len(line)}
+                elif isinstance(record, dict) and set(record) == {'end', 'count'}:
+                    if name is not None and record['end'] == name and record['count'] == entry['count']:
+                        entry['size'] += len(line)
+                        index[name] = entry
+                    name = None
+                elif name is not None:
+                    entry['count'] += 1
+                    entry['size'] += len(line)
+                offset = f.tell()
+                line = f.readline()
+        return index
+
+    def _write_index(self, index: dict):
+        temp_index = self.index_path + '.tmp'
+        with open(temp_index, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_index, self.index_path)
+        self._index = index
+
+
+def _line(record) -> bytes:
+    return (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
@@ -0,0 +1,84 @@
+# Name based auto-pairing of target and tool occurrences.
+# Occurrences are indexed once by component name, after which names and naming rules
+# are resolved with dictionary lookups instead of one scan of the assembly per pair.
+import re
+
+
+def component_name(occurrence):
+    """Returns the name used to index an occurrence, the name of its component."""
+    return occurrence.component.name
+
+
+def build_name_index(occurrences, name=component_name) -> dict:
+    """Indexes occurrences by component name in a single pass.
+
+    Arguments:
+    occurrences -- An iterable of occurrences, typically rootComponent.allOccurrences.
+    name -- Function returning the name to index an occurrence by.
+
+    :returns:
+        A dictionary of name to the list of occurrences with that name, in assembly order.
+    """
+    index = {}
+    for occurrence in occurrences:
+        index.setdefault(name(occurrence), []).append(occurrence)
+    return index
+
+
+def compile_rule(pattern: str):
+    """Compiles a naming rule such as 'Plate_*' into a regular expression.
+
+    '*' matches any run of characters and '?' a single character. Both are captured
+    so a target and a tool that matched with the same wildcard text can be paired.
+    """
+    parts = []
+    for token in re.split(r'([*?])', pattern):
+        if token == '*':
+            parts.append('(.*)')
+        elif token == '?':
+            parts.append('(.)')
+        else:
+            parts.append(re.escape(token))
+    return re.compile(''.join(parts) + r'\Z')
+
+
+def select_by_rule(index: dict, pattern: str) -> list:
+    """Returns every indexed occurrence whose name matches the rule."""
+    rule = compile_rule(pattern)
+    selected = []
+    for name, occurrences in index.items():
+        if rule.match(name):
+            selected.extend(occurrences)
+    return selected
+
+
+def pair_by_rule(index: dict, target_pattern: str, tool_pattern: str) -> list:
+    """Pairs targets and tools whose names match the rule with the same wildcard text.
+
+    With the rule 'Plate_*' <-> 'Text_*', 'Plate_12' is paired with 'Text_12'. Each
+    indexed name is matched once, so the cost is linear in the number of names.
+
+    :returns:
+        A list of (target, tool) occurrence pairs ordered as the targets appear in the index.
+    """
+    target_rule = compile_rule(target_pattern)
+    tool_rule = compile_rule(tool_pattern)
+    targets = {}
+    tools = {}
+    for name, occurrences in index.items():
+        match = target_rule.match(name)
+        if match:
+            targets.setdefault(match.groups(), []).extend(occurrences)
+        match = tool_rule.match(name)
+        if match:
+            tools.setdefault(match.groups(), []).extend(occurrences)
+    pairs = []
+    for stem, target_occurrences in targets.items():
+        tool_occurrences = tools.get(stem)
+        if not tool_occurrences:
+            continue
+        for target in target_occurrences:
+            for tool in tool_occurrences:
+                if tool != target:
+                    pairs.append((target, tool))
+    return pairs
@@ -0,0 +1,108 @@
+# Cut planning for the Combine Cut command.
+# Resolved pairs are turned into one operation per target body. Bodies are identified
+# through a key function, which defaults to the entity token Fusion assigns to every body.
+
+
+def entity_key(entity):
+    """Returns the key used to identify an entity, its entity token."""
+    return entity.entityToken
+
+
+def occurrence_body_key(body):
+    """Returns the key of a body in the context of an occurrence, the entity tokens of the
+    occurrence and of the native body. Every occurrence of a component shares the native
+    bodies of the component, so their entity tokens alone don't tell the instances apart.
+    """
+    occurrence = body.assemblyContext
+    native = body.nativeObject or body
+    return (occurrence.entityToken if occurrence else '', native.entityToken)
+
+
+class CutOperation:
+    """A single combine/cut: one target body and every tool body that cuts it.
+
+    Arguments:
+    target -- The body that is cut.
+    key -- The key of the target body.
+    """
+
+    def __init__(self, target, key):
+        self.target = target
+        self.key = key
+        self.tools = []
+        self.tool_keys = set()
+        self.pair_indices = []
+
+    def add_tool(self, tool, key) -> bool:
+        """Adds a tool body to the operation, ignoring duplicates.
+
+        :returns:
+            True if the tool was added, False if it was already part of the operation.
+        """
+        if key in self.tool_keys:
+            return False
+        self.tool_keys.add(key)
+        self.tools.append(tool)
+        return True
+
+
+def plan_cuts(pairs, batch: bool = True, key=entity_key):
+    """Turns resolved pairs into the list of cut operations to run.
+
+    Arguments:
+    pairs -- An iterable of (target_body, tool_bodies) tuples, one per pair.
+    batch -- If True, pairs that share a target body are merged into one operation
+             so each target is cut once with all of its tools. If False, every
+             pair becomes its own operation, as in the original behavior.
+    key -- Function returning the identity key of a body.
+
+    :returns:
+        A list of CutOperation objects in the order their targets first appear.
+    """
+    return plan_matrix_cuts((((target,), tools) for target, tools in pairs), batch, key)
+
+
+def plan_matrix_cuts(rows, batch: bool = True, key=entity_key):
+    """Turns resolved rows of several targets and tools into the list of cut operations to run.
+
+    Every target body of a row is cut by every tool body of the row. The key of each body
+    object is computed once, however many rows and targets it appears in, so the key calls
+    grow with the number of distinct bodies rather than with the number of target/tool pairs.
+
+    Arguments:
+    rows -- An iterable of (target_bodies, tool_bodies) tuples, one per row.
+    batch -- If True, every row that cuts a target body is merged into one operation so
+             each target is cut once with the union of its tools. If False, every target
+             of every row becomes its own operation.
+    key -- Function returning the identity key of a body.
+
+    :returns:
+        A list of CutOperation objects in the order their targets first appear. The
+        pair_indices of an operation are the indices of the rows it was planned from.
+    """
+    operations = []
+    by_target = {}
+    # Keys by body object id, holding on to the body so the id is not reused
+    keys = {}
+
+    def body_key(body):
+        known = keys.get(id(body))
+        if known is None:
+            known = keys[id(body)] = (body, key(body))
+        return known[1]
+
+    for index, (targets, tools) in enumerate(rows):
+        row_tools = [(tool, body_key(tool)) for tool in tools]
+        for target in targets:
+            target_key = body_key(target)
+            operation = by_target.get(target_key) if batch else None
+            if operation is None:
+                operation = CutOperation(target, target_key)
+                operations.append(operation)
+                if batch:
+                    by_target[target_key] = operation
+            operation.pair_indices.append(index)
+            for tool, tool_key in row_tools:
+                if tool_key != target_key:
+                    operation.add_tool(tool, tool_key)
+    return [operation for operation in operations if operation.tools]
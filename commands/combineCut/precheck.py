@@ -0,0 +1,54 @@
+# Bounding box precheck that runs before any combine feature is created.
+# Tool bodies whose boxes do not touch their target can not change it, so they are
+# dropped from the operation, and operations left without tools are skipped entirely.
+from . import planner, spatial
+
+
+class PrecheckStats:
+    """Counts what the precheck removed from a plan."""
+
+    def __init__(self):
+        self.skipped_cuts = 0
+        self.dropped_tools = 0
+
+    def __str__(self):
+        return f'{self.skipped_cuts} cuts skipped, {self.dropped_tools} tool bodies dropped'
+
+
+# Returns the body in the space of the root component so boxes of different occurrences can be compared.
+def world_body(body, occurrence):
+    if occurrence is None or body.assemblyContext:
+        return body
+    return body.createForAssemblyContext(occurrence)
+
+
+# Filters the tools of every operation down to those whose bounding boxes touch the target.
+# The axis aligned test runs for all tools of an operation at once. With oriented=True the
+# survivors are tested again with their minimum oriented boxes, which removes tools that only
+# touch the corner of a rotated target's axis aligned box. The occurrences are looked up by the
+# key the operations were planned with.
+def precheck_operations(operations: list, occurrences: dict, oriented: bool = False, tolerance: float = 0.0,
+                        key=planner.entity_key):
+    stats = PrecheckStats()
+    kept = []
+    for operation in operations:
+        target = world_body(operation.target, occurrences.get(operation.key))
+        tools = [world_body(tool, occurrences.get(key(tool))) for tool in operation.tools]
+        target_box = spatial.box_from_bounding_box(target.boundingBox)
+        tool_boxes = [spatial.box_from_bounding_box(tool.boundingBox) for tool in tools]
+        touching = [bool(hit) for hit in spatial.overlap_mask(target_box, tool_boxes, tolerance)]
+        if oriented and any(touching):
+            target_oriented = spatial.box_from_oriented_bounding_box(target.orientedMinimumBoundingBox)
+            for index, tool in enumerate(tools):
+                if touching[index]:
+                    tool_oriented = spatial.box_from_oriented_bounding_box(tool.orientedMinimumBoundingBox)
+                    touching[index] = spatial.oriented_boxes_overlap(target_oriented, tool_oriented, tolerance)
+        tool_count = len(operation.tools)
+        operation.tools = [tool for tool, hit in zip(operation.tools, touching) if hit]
+        operation.tool_keys = {key(tool) for tool in operation.tools}
+        stats.dropped_tools += tool_count - len(operation.tools)
+        if operation.tools:
+            kept.append(operation)
+        else:
+            stats.skipped_cuts += 1
+    return kept, stats
@@ -0,0 +1,132 @@
+# Run reports of the Combine Cut command.
+# A report collects what happened during one run: the time each cut took, the pairs that were
+# skipped and why, the cuts that failed and the time of each phase. Nothing in a run waits for
+# the user; the report is written to a JSON file when the run ends and summarised once.
+import json
+import os
+import time
+import traceback
+
+# Number of report files kept in the reports folder, the oldest are removed first.
+REPORT_LIMIT = 50
+
+# Number of problems listed in the summary, the rest are only in the report file.
+SUMMARY_PROBLEMS = 10
+
+OK = 'ok'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+
+class RunReport:
+    """What happened to every cut of a run.
+
+    Arguments:
+    title -- Describes the run, such as the message shown when it ends.
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self.started = time.time()
+        self.finished = None
+        self.cancelled = False
+        self.stopped_by_failure = False
+        self.entries = []
+        self.phases = {}
+        self.notes = []
+        self.path = None
+
+    def add(self, status: str, item: str, seconds: float = 0.0, reason: str = '', **details):
+        """Records the outcome of one cut or pair.
+
+        Arguments:
+        status -- OK, SKIPPED or FAILED.
+        item -- Names what the entry is about, such as the target body of a cut.
+        seconds -- Time taken.
+        reason -- Why the item was skipped or failed.
+        details -- Other values stored with the entry, such as the number of tools.
+        """
+        entry = {'status': status, 'item': item, 'seconds': round(seconds, 6)}
+        if reason:
+            entry['reason'] = reason
+        entry.update(details)
+        self.entries.append(entry)
+
+    def skip(self, item: str, reason: str, **details):
+        """Records an item that was left out of the run."""
+        self.add(SKIPPED, item, reason=reason, **details)
+
+    def fail(self, item: str, seconds: float, error: BaseException, **details):
+        """Records an item whose cut raised an error, with the error's traceback."""
+        details['traceback'] = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+        self.add(FAILED, item, seconds, f'{type(error).__name__}: {error}', **details)
+
+    def count(self, status: str) -> int:
+        return sum(1 for entry in self.entries if entry['status'] == status)
+
+    @property
+    def problems(self) -> list:
+        """Returns the skipped and failed entries."""
+        return [entry for entry in self.entries if entry['status'] != OK]
+
+    def finish(self, cancelled: bool = False, stopped_by_failure: bool = False):
+        """Marks the run as ended.
+
+        Arguments:
+        cancelled -- The run ended before every item was done.
+        stopped_by_failure -- The run ended early because an item failed, not because the user cancelled it.
+        """
+        self.finished = time.time()
+        self.cancelled = cancelled or stopped_by_failure
+        self.stopped_by_failure = stopped_by_failure
+
+    def to_dict(self) -> dict:
+        return {
+            'title': self.title,
+            'started': self.started,
+            'finished': self.finished,
+            'cancelled': self.cancelled,
+            'stopped_by_failure': self.stopped_by_failure,
+            'counts': {status: self.count(status) for status in (OK, SKIPPED, FAILED)},
+            'phases': self.phases,
+            'notes': self.notes,
+            'entries': self.entries,
+        }
+
+    def summary(self) -> str:
+        """Returns the counts, the notes, the phase timings and the first problems of the run as text."""
+        ending = ''
+        if self.stopped_by_failure:
+            ending = ', stopped by the failure'
+        elif self.cancelled:
+            ending = ', cancelled'
+        lines = [f'{self.count(OK)} cuts made, {self.count(SKIPPED)} skipped, {self.count(FAILED)} failed' + ending]
+        lines.extend(self.notes)
+        if self.phases:
+            lines.append(', '.join(f'{phase} {seconds:.2f}s' for phase, seconds in self.phases.items()))
+        problems = self.problems
+        for entry in problems[:SUMMARY_PROBLEMS]:
+            lines.append(f'{entry["status"]}: {entry["item"]} - {entry.get("reason", "")}')
+        if len(problems) > SUMMARY_PROBLEMS:
+            lines.append(f'... and {len(problems) - SUMMARY_PROBLEMS} more')
+        return '\n'.join(lines)
+
+    def write(self, folder: str) -> str:
+        """Writes the report to a new JSON file in the folder and removes the oldest reports
+        past REPORT_LIMIT.
+
+        :returns:
+            The path of the report file.
+        """
+        os.makedirs(folder, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))
+        path = os.path.join(folder, f'run-{stamp}-{int(self.started * 1000) % 1000:03d}.json')
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(temp_path, path)
+        self.path = path
+        reports = sorted(name for name in os.listdir(folder) if name.startswith('run-') and name.endswith('.json'))
+        for name in reports[:-REPORT_LIMIT]:
+            os.remove(os.path.join(folder, name))
+        return path
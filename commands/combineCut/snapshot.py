@@ -0,0 +1,142 @@
+# Design snapshots for planning pairs outside of Fusion.
+# A snapshot holds every occurrence of a design that has bodies, with its component name, entity
+# token, world transform and world space bounding box, and every body of those occurrences with
+# its name and world space bounding box. The Combine Cut command writes it and offline.py plans
+# pairs from it.
+#
+# The file is the 8 byte MAGIC, the length of a UTF-8 JSON header as a little endian uint32, the
+# header, and then four little endian arrays: the occurrence transforms (16 float64 each), the
+# occurrence boxes (6 float64 each), the occurrence index of each body (int32) and the body boxes
+# (6 float64 each). Boxes are (min_x, min_y, min_z, max_x, max_y, max_z) as in spatial.py. The
+# arrays can be read with the array module or mapped into NumPy with np.frombuffer.
+import array
+import json
+import struct
+import sys
+
+MAGIC = b'CCSNAP01'
+VERSION = 1
+
+
+class Snapshot:
+    """The occurrences and bodies of a design.
+
+    Arguments:
+    names -- Component name of each occurrence.
+    tokens -- Entity token of each occurrence.
+    transforms -- The 16 values of each occurrence's world transform, in one flat array('d').
+    boxes -- The 6 values of each occurrence's box, in one flat array('d').
+    body_occurrences -- Occurrence index of each body, an array('i').
+    body_names -- Name of each body.
+    body_boxes -- The 6 values of each body's box, in one flat array('d').
+    """
+
+    def __init__(self, names: list, tokens: list, transforms, boxes, body_occurrences, body_names: list, body_boxes):
+        self.names = names
+        self.tokens = tokens
+        self.transforms = transforms
+        self.boxes = boxes
+        self.body_occurrences = body_occurrences
+        self.body_names = body_names
+        self.body_boxes = body_boxes
+
+    @property
+    def occurrence_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def body_count(self) -> int:
+        return len(self.body_names)
+
+    def box(self, occurrence: int) -> tuple:
+        """Returns the box of an occurrence."""
+        return tuple(self.boxes[occurrence * 6:occurrence * 6 + 6])
+
+    def body_box(self, body: int) -> tuple:
+        """Returns the box of a body."""
+        return tuple(self.body_boxes[body * 6:body * 6 + 6])
+
+    def occurrence_bodies(self) -> list:
+        """Returns the list of body indices of each occurrence."""
+        bodies = [[] for _ in range(self.occurrence_count)]
+        for body, occurrence in enumerate(self.body_occurrences):
+            bodies[occurrence].append(body)
+        return bodies
+
+
+class SnapshotBuilder:
+    """Collects occurrences and bodies one at a time, see Snapshot."""
+
+    def __init__(self):
+        self.snapshot = Snapshot([], [], array.array('d'), array.array('d'), array.array('i'), [], array.array('d'))
+
+    def add_occurrence(self, name: str, token: str, transform, box) -> int:
+        """Adds an occurrence with its 16 transform values and its box.
+
+        :returns:
+            The index of the occurrence.
+        """
+        snapshot = self.snapshot
+        snapshot.names.append(name)
+        snapshot.tokens.append(token)
+        snapshot.transforms.extend(transform)
+        snapshot.boxes.extend(box)
+        return len(snapshot.names) - 1
+
+    def add_body(self, occurrence: int, name: str, box):
+        """Adds a body of the occurrence with the given index."""
+        self.snapshot.body_occurrences.append(occurrence)
+        self.snapshot.body_names.append(name)
+        self.snapshot.body_boxes.extend(box)
+
+
+def write_snapshot(path: str, snapshot: Snapshot):
+    """Writes the snapshot to a file."""
+    header = json.dumps({
+        'version': VERSION,
+        'occurrences': snapshot.occurrence_count,
+        'bodies': snapshot.body_count,
+        'names': snapshot.names,
+        'tokens': snapshot.tokens,
+        'body_names': snapshot.body_names,
+    }).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        for values, typecode in ((snapshot.transforms, 'd'), (snapshot.boxes, 'd'),
+                                 (snapshot.body_occurrences, 'i'), (snapshot.body_boxes, 'd')):
+            f.write(_little_endian(array.array(typecode, values)).tobytes())
+
+
+def read_snapshot(path: str) -> Snapshot:
+    """Reads a snapshot written by write_snapshot.
+
+    Raises ValueError if the file is not a snapshot or was written by a newer version.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a Combine Cut snapshot')
+        header_length, = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+        if header['version'] > VERSION:
+            raise ValueError(f'{path} was written by a newer version of the add-in')
+        occurrences = header['occurrences']
+        bodies = header['bodies']
+        arrays = []
+        for typecode, count in (('d', occurrences * 16), ('d', occurrences * 6), ('i', bodies), ('d', bodies * 6)):
+            values = array.array(typecode)
+            values.frombytes(f.read(count * values.itemsize))
+            if len(values) != count:
+                raise ValueError(f'{path} is truncated')
+            arrays.append(_little_endian(values))
+    transforms, boxes, body_occurrences, body_boxes = arrays
+    return Snapshot(header['names'], header['tokens'], transforms, boxes, body_occurrences, header['body_names'], body_boxes)
+
+
+def _little_endian(values: array.array) -> array.array:
+    # The file is little endian; swapping is its own inverse so this serves reading and writing
+    if sys.byteorder == 'big':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values
@@ -0,0 +1,230 @@
+# Spatial index for geometric pairing of tools to targets.
+# Boxes are axis aligned and given as (min_x, min_y, min_z, max_x, max_y, max_z) in
+# world space. NumPy is used for the bulk math when it is available; Fusion does not
+# ship it, so every function also works on plain Python lists.
+import math
+
+# NumPy takes longer to import than the rest of the add-in, so it is imported by the first
+# function that needs it rather than when Fusion loads the add-in.
+np = None
+_numpy_imported = False
+
+
+def _numpy():
+    # Returns the numpy module, or None if it isn't installed
+    global np, _numpy_imported
+    if not _numpy_imported:
+        _numpy_imported = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+    return np
+
+
+def use_numpy(enabled: bool = True) -> bool:
+    """Turns the NumPy code path on or off, importing NumPy now if it is turned on.
+
+    :returns:
+        True if NumPy is used, False if it is turned off or isn't installed.
+    """
+    global np, _numpy_imported
+    if enabled:
+        _numpy_imported = False
+        return _numpy() is not None
+    np = None
+    _numpy_imported = True
+    return False
+
+
+def box_from_bounding_box(bounding_box) -> tuple:
+    """Converts a Fusion BoundingBox3D into a (min_x, min_y, min_z, max_x, max_y, max_z) tuple."""
+    min_point = bounding_box.minPoint
+    max_point = bounding_box.maxPoint
+    return (min_point.x, min_point.y, min_point.z, max_point.x, max_point.y, max_point.z)
+
+
+def box_from_oriented_bounding_box(oriented_box) -> tuple:
+    """Converts a Fusion OrientedBoundingBox3D into a (center, axes, half_extents) tuple."""
+    center = oriented_box.centerPoint.asArray()
+    axes = []
+    for direction in (oriented_box.lengthDirection, oriented_box.widthDirection, oriented_box.heightDirection):
+        x, y, z = direction.asArray()
+        length = math.sqrt(x * x + y * y + z * z) or 1.0
+        axes.append((x / length, y / length, z / length))
+    return (tuple(center), tuple(axes), (oriented_box.length / 2, oriented_box.width / 2, oriented_box.height / 2))
+
+
+def boxes_overlap(a, b, tolerance: float = 0.0) -> bool:
+    """Returns True if the two boxes touch or overlap, growing both by the tolerance."""
+    return (a[0] - tolerance <= b[3] and b[0] - tolerance <= a[3] and
+            a[1] - tolerance <= b[4] and b[1] - tolerance <= a[4] and
+            a[2] - tolerance <= b[5] and b[2] - tolerance <= a[5])
+
+
+def oriented_boxes_overlap(a, b, tolerance: float = 0.0) -> bool:
+    """Returns True if two oriented boxes overlap, using the separating axis test.
+
+    Boxes are (center, axes, half_extents) tuples as returned by box_from_oriented_bounding_box.
+    The half extents of the first box are grown by the tolerance.
+    """
+    center_a, axes_a, extent_a = a
+    center_b, axes_b, extent_b = b
+    extent_a = [e + tolerance for e in extent_a]
+    rotation = [[_dot(axes_a[i], axes_b[j]) for j in range(3)] for i in range(3)]
+    # A small epsilon keeps the test stable when edges are nearly parallel.
+    abs_rotation = [[abs(rotation[i][j]) + 1e-9 for j in range(3)] for i in range(3)]
+    offset = [center_b[k] - center_a[k] for k in range(3)]
+    offset = [_dot(offset, axes_a[i]) for i in range(3)]
+
+    for i in range(3):
+        radius_b = sum(extent_b[j] * abs_rotation[i][j] for j in range(3))
+        if abs(offset[i]) > extent_a[i] + radius_b:
+            return False
+    for j in range(3):
+        radius_a = sum(extent_a[i] * abs_rotation[i][j] for i in range(3))
+        if abs(sum(offset[i] * rotation[i][j] for i in range(3))) > radius_a + extent_b[j]:
+            return False
+    for i in range(3):
+        i1, i2 = (i + 1) % 3, (i + 2) % 3
+        for j in range(3):
+            j1, j2 = (j + 1) % 3, (j + 2) % 3
+            radius_a = extent_a[i1] * abs_rotation[i2][j] + extent_a[i2] * abs_rotation[i1][j]
+            radius_b = extent_b[j1] * abs_rotation[i][j2] + extent_b[j2] * abs_rotation[i][j1]
+            if abs(offset[i2] * rotation[i1][j] - offset[i1] * rotation[i2][j]) > radius_a + radius_b:
+                return False
+    return True
+
+
+class UniformGrid:
+    """A uniform grid over a set of boxes, answering which boxes overlap a query box.
+
+    Arguments:
+    boxes -- The indexed boxes, a sequence of 6-tuples or an (n, 6) array.
+    cell_size -- Edge length of the grid cells. Defaults to the mean largest box extent,
+                 which keeps each box in a handful of cells.
+
+    Boxes that would cover more than MAX_CELLS cells, such as one large panel among many
+    small plates, are kept in a separate list that every query checks directly.
+    """
+
+    MAX_CELLS = 64
+
+    def __init__(self, boxes, cell_size: float = None):
+        self.boxes = np.asarray(boxes, dtype=float).reshape(-1, 6) if _numpy() is not None else [tuple(box) for box in boxes]
+        if cell_size is None:
+            cell_size = _mean_extent(self.boxes)
+        self.cell_size = cell_size if cell_size > 0 else 1.0
+        self.cells = {}
+        self.oversized = []
+        for index, (low, high) in enumerate(self._cell_ranges(self.boxes)):
+            if _cell_count(low, high) > self.MAX_CELLS:
+                self.oversized.append(index)
+                continue
+            for cell in _cells(low, high):
+                self.cells.setdefault(cell, []).append(index)
+
+    def _cell_ranges(self, boxes):
+        size = self.cell_size
+        if _numpy() is not None:
+            low = np.floor(boxes[:, :3] / size).astype(int).tolist()
+            high = np.floor(boxes[:, 3:] / size).astype(int).tolist()
+            return zip(low, high)
+        return (([math.floor(v / size) for v in box[:3]], [math.floor(v / size) for v in box[3:]]) for box in boxes)
+
+    def query(self, box, tolerance: float = 0.0) -> list:
+        """Returns the sorted indices of the indexed boxes that overlap the box."""
+        return [index for _, index in self.query_all([box], tolerance)]
+
+    def query_all(self, boxes, tolerance: float = 0.0) -> list:
+        """Queries many boxes at once.
+
+        Candidates are gathered from the grid for every query box first and then tested
+        exactly in a single vectorized pass.
+
+        :returns:
+            A list of (query_index, indexed_box_index) tuples ordered by query then indexed box.
+        """
+        if _numpy() is not None:
+            boxes = np.asarray(boxes, dtype=float).reshape(-1, 6)
+            grown = np.hstack((boxes[:, :3] - tolerance, boxes[:, 3:] + tolerance))
+        else:
+            grown = [tuple(v - tolerance for v in box[:3]) + tuple(v + tolerance for v in box[3:]) for box in boxes]
+        query_indices = []
+        candidate_indices = []
+        for query_index, (low, high) in enumerate(self._cell_ranges(grown)):
+            candidates = set(self.oversized)
+            if _cell_count(low, high) > len(self.cells):
+                for cell_indices in self.cells.values():
+                    candidates.update(cell_indices)
+            else:
+                for cell in _cells(low, high):
+                    candidates.update(self.cells.get(cell, ()))
+            candidates = sorted(candidates)
+            query_indices.extend([query_index] * len(candidates))
+            candidate_indices.extend(candidates)
+        if not candidate_indices:
+            return []
+        if _numpy() is not None:
+            queries = grown[query_indices]
+            candidates = self.boxes[candidate_indices]
+            mask = (np.all(candidates[:, :3] <= queries[:, 3:], axis=1) &
+                    np.all(queries[:, :3] <= candidates[:, 3:], axis=1))
+            hits = np.flatnonzero(mask).tolist()
+            return [(query_indices[i], candidate_indices[i]) for i in hits]
+        return [(q, c) for q, c in zip(query_indices, candidate_indices) if boxes_overlap(grown[q], self.boxes[c])]
+
+
+def overlap_mask(box, boxes, tolerance: float = 0.0):
+    """Tests one box against many at once.
+
+    :returns:
+        A sequence of booleans, True where the box overlaps the corresponding box in boxes.
+    """
+    if _numpy() is not None:
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 6)
+        box = np.asarray(box, dtype=float)
+        return (np.all(boxes[:, :3] - tolerance <= box[3:], axis=1) &
+                np.all(box[:3] - tolerance <= boxes[:, 3:], axis=1))
+    return [boxes_overlap(box, other, tolerance) for other in boxes]
+
+
+def overlapping_pairs(tool_boxes, target_boxes, tolerance: float = 0.0) -> list:
+    """Finds every (tool, target) pair whose boxes overlap.
+
+    The targets are put in a UniformGrid and each tool queries only the cells it
+    covers, so the cost grows with the number of boxes and overlaps rather than with
+    the product of the tool and target counts.
+
+    :returns:
+        A list of (tool_index, target_index) tuples ordered by tool then target.
+    """
+    if not len(tool_boxes) or not len(target_boxes):
+        return []
+    return UniformGrid(target_boxes).query_all(tool_boxes, tolerance)
+
+
+def _mean_extent(boxes) -> float:
+    if _numpy() is not None:
+        if not len(boxes):
+            return 1.0
+        return float(np.mean(np.max(boxes[:, 3:] - boxes[:, :3], axis=1)))
+    if not boxes:
+        return 1.0
+    return sum(max(box[3] - box[0], box[4] - box[1], box[5] - box[2]) for box in boxes) / len(boxes)
+
+
+def _dot(a, b) -> float:
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cell_count(low, high) -> int:
+    return (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (high[2] - low[2] + 1)
+
+
+def _cells(low, high):
+    for x in range(low[0], high[0] + 1):
+        for y in range(low[1], high[1] + 1):
+            for z in range(low[2], high[2] + 1):
+                yield (x, y, z)
@@ -1,4 +1,3 @@
-import json
 import adsk.core
 import os
 from ...lib import fusionAddInUtils as futil
@@ -121,12 +120,9 @@ def command_execute(args: adsk.core.CommandEventArgs):
         'myExpression': value_input.expression,
         'myText': text_input.formattedText
     }
-    # JSON strings are a useful way to translate between javascript objects and python dictionaries
-    message_json = json.dumps(message_data)
-
-    # Get a reference to the palette and send the message to the palette javascript
-    palette = ui.palettes.itemById(PALETTE_ID)
-    palette.sendInfoToHTML(message_action, message_json)
+    # Queue the message in the palette channel, which sends the queued messages to the palette
+    # javascript as one JSON batch. Messages sent with the same key replace each other.
+    futil.palette_channel(PALETTE_ID).send(message_action, message_data, key=message_action)
 
 
 # This function will be called when the command needs to compute a new preview in the graphics window
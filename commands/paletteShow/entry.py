@@ -156,11 +156,22 @@ def palette_navigating(args: adsk.core.NavigationEventArgs):
 
 # Use this to handle events sent from javascript in your palette.
 def palette_incoming(html_args: adsk.core.HTMLEventArgs):
+    message_action = html_args.action
+
+    # Calls to the functions registered with futil.register_rpc are answered by the RPC layer, which
+    # parses the message itself, and batches sent through the palette channel are acknowledged.
+    # They are handled before the debug logging below so these frequent messages are parsed once.
+    if message_action == futil.RPC_ACTION:
+        futil.handle_rpc(html_args, PALETTE_ID)
+        return
+    if message_action == futil.ACK_ACTION:
+        futil.palette_channel(PALETTE_ID).acknowledge(json.loads(html_args.data).get('id'))
+        return
+
     # General logging for debug.
     futil.log(f'{CMD_NAME}: Palette incoming event.')
 
     message_data: dict = json.loads(html_args.data)
-    message_action = html_args.action
 
     log_msg = f"Event received from {html_args.firingEvent.sender.name}\n"
     log_msg += f"Action: {message_action}\n"
@@ -178,6 +189,11 @@ def palette_incoming(html_args: adsk.core.HTMLEventArgs):
         msg += f'<b>Action</b>: {message_action}<br/><b>arg1</b>: {arg1}<br/><b>arg2</b>: {arg2}'               
         ui.messageBox(msg)
 
+    # Return the timings recorded by the add-in so the palette can show them.
+    elif message_action == 'getMetrics':
+        html_args.returnData = json.dumps(futil.metrics_snapshot())
+        return
+
     # Return value.
     now = datetime.now()
     currentTime = now.strftime('%H:%M:%S')
@@ -18,10 +18,7 @@ function sendInfoToFusion() {
 
 }
 
-function updateMessage(messageString) {
-    // Message is sent from the add-in as a JSON string.
-    const messageData = JSON.parse(messageString);
-
+function updateMessage(messageData) {
     // Update a paragraph with the data passed in.
     document.getElementById("fusionMessage").innerHTML =
         `<b>Your text</b>: ${messageData.myText} <br/>` +
@@ -29,16 +26,74 @@ function updateMessage(messageString) {
         `<b>Your value</b>: ${messageData.myValue}`;
 }
 
+function showPairStatus() {
+    fusionRpc("combineCut.pairStatus", { start: 0, count: 20 }).then(
+        (status) => document.getElementById("pairStatus").innerText = JSON.stringify(status, null, 2),
+        (error) => document.getElementById("pairStatus").innerText = error.message
+    );
+}
+
+function runSavedPairs() {
+    const start = parseInt(document.getElementById("runStart").value, 10) || 0;
+    const count = parseInt(document.getElementById("runCount").value, 10) || 0;
+    fusionRpc("combineCut.runPairs", { start: start, count: count }).then(
+        (result) => document.getElementById("pairStatus").innerText = `Started ${result.cuts} cuts for ${result.pairs} pairs`,
+        (error) => document.getElementById("pairStatus").innerText = error.message
+    );
+}
+
+function showMetrics() {
+    // The add-in returns the timing histograms as a JSON string, times are in seconds.
+    adsk.fusionSendData("getMetrics", "{}").then((result) => {
+        const spans = JSON.parse(result);
+        const ms = (seconds) => (seconds * 1000).toFixed(2);
+        let rows = "<tr><th>Span</th><th>Count</th><th>p50 ms</th><th>p95 ms</th><th>Max ms</th></tr>";
+        for (const [name, span] of Object.entries(spans)) {
+            rows += `<tr><td>${name}</td><td>${span.count}</td><td>${ms(span.p50)}</td>` +
+                `<td>${ms(span.p95)}</td><td>${ms(span.max)}</td></tr>`;
+        }
+        document.getElementById("metrics").innerHTML = rows;
+    });
+}
+
+// Handles one message from the add-in. The data has already been parsed from JSON.
+function handleMessage(action, messageData) {
+    if (action === "updateMessage") {
+        updateMessage(messageData);
+    } else if (action === "rpcResult") {
+        handleRpcResult(messageData);
+    } else if (action === "debugger") {
+        debugger;
+    } else {
+        return `Unexpected command type: ${action}`;
+    }
+    return "OK";
+}
+
+// Handles a batch of messages sent by the add-in's palette channel, then acknowledges it
+// so the add-in sends the next batch.
+function handleBatch(batch) {
+    for (const message of batch.messages) {
+        try {
+            handleMessage(message.action, message.data);
+        } catch (e) {
+            console.log(e);
+            console.log(`Exception caught with batched command: ${message.action}`);
+        }
+    }
+    // Wait for the page to be drawn before asking for more
+    window.requestAnimationFrame(() => adsk.fusionSendData("ack", JSON.stringify({ id: batch.id })));
+}
+
 window.fusionJavaScriptHandler = {
     handle: function (action, data) {
         try {
-            if (action === "updateMessage") {
-                updateMessage(data);
-            } else if (action === "debugger") {
-                debugger;
-            } else {
-                return `Unexpected command type: ${action}`;
+            // Messages are sent from the add-in as JSON strings.
+            if (action === "batch") {
+                handleBatch(JSON.parse(data));
+                return "OK";
             }
+            return handleMessage(action, data ? JSON.parse(data) : null);
         } catch (e) {
             console.log(e);
             console.log(`Exception caught with command: ${action}, data: ${data}`);
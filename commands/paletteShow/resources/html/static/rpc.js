@@ -0,0 +1,59 @@
+// Calls functions the add-in registered with futil.register_rpc.
+//
+//   fusionRpc("combineCut.pairStatus", { start: 0, count: 20 }).then((status) => ...);
+//   fusionRpcBatch([["combineCut.pairStatus"], ["combineCut.runPairs", { start: 0, count: 50 }]])
+//       .then((results) => ...);
+//
+// Slow functions are answered later through the palette channel with the "rpcResult" action,
+// which palette.js passes to handleRpcResult. Either way the returned promise resolves with the
+// function's result.
+
+let nextRpcId = 1;
+const pendingRpcCalls = new Map();
+const earlyRpcResults = new Map();
+
+// Calls several functions in one message. Resolves with the outcome of each call, in order,
+// in the form returned by Promise.allSettled.
+function fusionRpcBatch(calls) {
+    const requests = calls.map(([method, params]) => ({ id: nextRpcId++, method: method, params: params || {} }));
+    return adsk.fusionSendData("rpc", JSON.stringify(requests)).then((reply) =>
+        Promise.allSettled(JSON.parse(reply).map(settleRpcResponse))
+    );
+}
+
+// Calls one function and resolves with its result.
+function fusionRpc(method, params) {
+    return fusionRpcBatch([[method, params]]).then(([outcome]) => {
+        if (outcome.status === "rejected") {
+            throw outcome.reason;
+        }
+        return outcome.value;
+    });
+}
+
+function settleRpcResponse(response) {
+    if (response.pending) {
+        // The result of a slow call can arrive before the reply to the request is handled
+        const early = earlyRpcResults.get(response.id);
+        if (early) {
+            earlyRpcResults.delete(response.id);
+            return settleRpcResponse(early);
+        }
+        return new Promise((resolve, reject) => pendingRpcCalls.set(response.id, { resolve, reject }));
+    }
+    if ("error" in response) {
+        return Promise.reject(new Error(response.error));
+    }
+    return Promise.resolve(response.result);
+}
+
+// Settles the promise of a slow call with the result sent by the add-in.
+function handleRpcResult(response) {
+    const call = pendingRpcCalls.get(response.id);
+    if (!call) {
+        earlyRpcResults.set(response.id, response);
+        return;
+    }
+    pendingRpcCalls.delete(response.id);
+    settleRpcResponse(response).then(call.resolve, call.reject);
+}
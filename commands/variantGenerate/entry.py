@@ -0,0 +1,391 @@
+import adsk.core
+import adsk.fusion
+import csv
+import json
+import os
+import time
+from ...lib import fusionAddInUtils as futil
+from ... import config
+from ..combineCut import batch, pairing, report
+from ..combineCut import entry as combine_cut
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+
+# Command identity information.
+CMD_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_variantGenerate'
+CMD_NAME = 'Generate Variants'
+CMD_Description = 'Sets parameters and text from each row of a table, cuts the tools from the targets and exports the result'
+
+# Specify that the command will be promoted to the panel.
+IS_PROMOTED = False
+
+# Define the location where the command button will be created.
+WORKSPACE_ID = 'FusionSolidEnvironment'
+PANEL_ID = 'SolidModifyPanel'
+COMMAND_BESIDE_ID = 'ScriptsManagerCommand'
+
+# Resource location for command icons, here we assume a sub folder in this directory named "resources".
+ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', '')
+
+# Local list of event handlers used to maintain a reference so
+# they are not released and garbage collected.
+local_handlers = []
+
+# Columns starting with this prefix set the text of the sketch texts in the sketch named after the prefix.
+# Every other column, except the name column, sets the expression of the user parameter with that name.
+TEXT_COLUMN_PREFIX = 'text:'
+
+# Export formats and the file extension used for each.
+EXPORT_FORMATS = {'None': '', 'STEP': '.step', 'STL': '.stl', 'Fusion Archive': '.f3d'}
+
+# Number of rows between progress messages.
+PROGRESS_INTERVAL = 50
+
+# Custom event used to run the rows of a table in chunks so the UI stays responsive, every chunk is
+# its own transaction and the run can be cancelled.
+BATCH_EVENT_ID = f'{CMD_ID}_batchChunk'
+ROWS_PER_CHUNK = 1
+
+# The rows that are currently being generated, if any, and their progress dialog.
+batch_job = None
+progress_dialog = None
+
+
+# Executed when add-in is run.
+def start():
+    # Create a command Definition.
+    cmd_def = ui.commandDefinitions.addButtonDefinition(CMD_ID, CMD_NAME, CMD_Description, ICON_FOLDER)
+
+    # Define an event handler for the command created event. It will be called when the button is clicked.
+    futil.add_handler(cmd_def.commandCreated, command_created)
+
+    # ******** Add a button into the UI so the user can run the command. ********
+    # Get the target workspace the button will be created in.
+    workspace = ui.workspaces.itemById(WORKSPACE_ID)
+
+    # Get the panel the button will be created in.
+    panel = workspace.toolbarPanels.itemById(PANEL_ID)
+
+    # Create the button command control in the UI after the specified existing command.
+    control = panel.controls.addCommand(cmd_def, COMMAND_BESIDE_ID, False)
+
+    # Specify if the command is promoted to the main toolbar.
+    control.isPromoted = IS_PROMOTED
+
+    # Register the custom event that runs each chunk of rows.
+    batch_event = app.registerCustomEvent(BATCH_EVENT_ID)
+    futil.add_handler(batch_event, batch_chunk)
+
+
+# Executed when add-in is stopped.
+def stop():
+    # Stop any running rows without reporting them and remove the custom event
+    if batch_job:
+        batch_job.on_finished = None
+        batch_job.cancel()
+    app.unregisterCustomEvent(BATCH_EVENT_ID)
+
+    # Get the various UI elements for this command
+    workspace = ui.workspaces.itemById(WORKSPACE_ID)
+    panel = workspace.toolbarPanels.itemById(PANEL_ID)
+    command_control = panel.controls.itemById(CMD_ID)
+    command_definition = ui.commandDefinitions.itemById(CMD_ID)
+
+    # Delete the button command control
+    if command_control:
+        command_control.deleteMe()
+
+    # Delete the command definition
+    if command_definition:
+        command_definition.deleteMe()
+
+
+# Function that is called when a user clicks the corresponding button in the UI.
+# This defines the contents of the command dialog and connects to the command related events.
+@futil.span('variantGenerate.created')
+def command_created(args: adsk.core.CommandCreatedEventArgs):
+    # General logging for debug.
+    futil.log(f'{CMD_NAME} Command Created Event')
+
+    inputs = args.command.commandInputs
+    # Table of values, one variant per row
+    inputs.addTextBoxCommandInput('table_file', 'Variant Table', '', 1, True)
+    inputs.addBoolValueInput('browse_table', 'Browse Table...', False, '', False)
+    inputs.addStringValueInput('name_column', 'Name Column', 'name')
+    # Naming rule used to pair the targets and tools that are cut for every variant
+    inputs.addStringValueInput('target_pattern', 'Target Name Rule', 'Plate_*')
+    inputs.addStringValueInput('tool_pattern', 'Tool Name Rule', 'Text_*')
+    # Export settings
+    format_input = inputs.addDropDownCommandInput('export_format', 'Export Format', adsk.core.DropDownStyles.TextListDropDownStyle)
+    for index, name in enumerate(EXPORT_FORMATS):
+        format_input.listItems.add(name, index == 0)
+    inputs.addTextBoxCommandInput('output_folder', 'Output Folder', '', 1, True)
+    inputs.addBoolValueInput('browse_output', 'Browse Output...', False, '', False)
+    # Record a row that fails in the run report and carry on with the next row instead of stopping
+    inputs.addBoolValueInput('continue_on_error', 'Keep Going After Failures', True, '', True)
+
+    # Connect to the events that are needed by this command.
+    futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
+    futil.add_handler(args.command.inputChanged, command_input_changed, local_handlers=local_handlers)
+    futil.add_handler(args.command.validateInputs, command_validate_input, local_handlers=local_handlers)
+    futil.add_handler(args.command.destroy, command_destroy, local_handlers=local_handlers)
+
+
+# This event handler is called when the user clicks the OK button in the command dialog.
+# Rows are streamed from the table one at a time and generated as a chunked batch, see
+# generate_variant. A row that fails is recorded in the run report, and the batch carries on with
+# the next row if Keep Going After Failures is set. The parameters and texts are restored and the
+# report is shown once the batch ends or is cancelled.
+@futil.span('variantGenerate.execute')
+def command_execute(args: adsk.core.CommandEventArgs):
+    futil.log(f'{CMD_NAME} Command Execute Event')
+    inputs = args.command.commandInputs
+    table_path = inputs.itemById('table_file').text
+    name_column = inputs.itemById('name_column').value
+    extension = EXPORT_FORMATS[inputs.itemById('export_format').selectedItem.name]
+    output_folder = inputs.itemById('output_folder').text
+    keep_going = inputs.itemById('continue_on_error').value
+
+    design = adsk.fusion.FusionDocument.cast(app.activeDocument).design
+    index = pairing.build_name_index(design.rootComponent.allOccurrences)
+    pairs = pairing.pair_by_rule(index, inputs.itemById('target_pattern').value, inputs.itemById('tool_pattern').value)
+    if not pairs:
+        ui.messageBox('No components match the target and tool name rules.')
+        return
+    pairs = [((plate_occurrence,), (text_occurrence,)) for plate_occurrence, text_occurrence in pairs]
+    sketches = sketches_by_name(design)
+    originals = {}
+    run_report = report.RunReport(f'{CMD_NAME} finished')
+    generated = []
+    # The table is read once to count its rows for the progress dialog, then streamed again
+    row_count = sum(1 for _ in iter_rows(table_path))
+    rows = iter_rows(table_path)
+    start_time = time.perf_counter()
+
+    def run_row(number: int):
+        row = next(rows)
+        name = row.pop(name_column, '') or f'variant_{number + 1}'
+        path = os.path.join(output_folder, f'{name}{extension}') if extension else ''
+        failures = run_report.count(report.FAILED)
+        step_start = time.perf_counter()
+        try:
+            generate_variant(design, sketches, pairs, row, originals, path, run_report)
+        except Exception as error:
+            # A cut that failed is already in the report
+            if run_report.count(report.FAILED) == failures:
+                run_report.fail(f'{name} (row {number + 1})', time.perf_counter() - step_start, error)
+            if not keep_going:
+                raise
+            return
+        generated.append(name)
+        if len(generated) % PROGRESS_INTERVAL == 0:
+            futil.log(f'{CMD_NAME}: {len(generated)} variants, {throughput(len(generated), start_time):.1f} variants/min')
+
+    def rows_finished(job: batch.BatchJob):
+        rows.close()
+        restore(design, sketches, originals)
+        run_report.phases['rows'] = job.elapsed
+        # Without Keep Going After Failures the first failed row cancels the batch
+        stopped_by_failure = job.cancelled and not keep_going and run_report.count(report.FAILED) > 0
+        if stopped_by_failure:
+            run_report.title = f'{CMD_NAME} stopped by a failure after {len(generated)} of {job.total} variants'
+        elif job.cancelled:
+            run_report.title = f'{CMD_NAME} cancelled after {len(generated)} of {job.total} variants'
+        else:
+            run_report.title = (f'Generated {len(generated)} of {job.total} variants in {job.elapsed:.1f}s '
+                                f'({throughput(len(generated), start_time):.1f} variants/min)')
+        run_report.finish(job.cancelled, stopped_by_failure)
+        path = run_report.write(futil.get_data_path('reports'))
+        summary = run_report.summary()
+        futil.log(f'{CMD_NAME}: {run_report.title}\n{summary}\nReport written to {path}')
+        ui.messageBox(f'{run_report.title}\n\n{summary}\n\nFull report: {path}')
+
+    start_batch(batch.BatchJob(range(row_count), run_row, ROWS_PER_CHUNK, rows_finished))
+
+
+# Shows the progress dialog and schedules the first chunk of rows.
+def start_batch(job: batch.BatchJob):
+    global batch_job, progress_dialog
+    if batch_job and not batch_job.is_finished:
+        batch_job.cancel()
+    batch_job = job
+    progress_dialog = ui.createProgressDialog()
+    progress_dialog.isCancelButtonShown = True
+    progress_dialog.show(CMD_NAME, 'Generating variant %v of %m', 0, max(job.total, 1))
+    app.fireCustomEvent(BATCH_EVENT_ID)
+
+
+# This event handler runs one chunk of rows, updates the progress dialog and schedules the next
+# chunk. Cancelling from the dialog stops the batch between rows.
+def batch_chunk(args: adsk.core.CustomEventArgs):
+    global batch_job, progress_dialog
+    job = batch_job
+    if job is None:
+        return
+    try:
+        if progress_dialog.wasCancelled:
+            job.cancel()
+        else:
+            job.run_chunk()
+            progress_dialog.progressValue = job.done
+            progress_dialog.message = f'Generating variant %v of %m\n{job.status()}'
+    except:
+        job.cancel()
+        raise
+    finally:
+        if job.is_finished:
+            progress_dialog.hide()
+            batch_job = None
+            progress_dialog = None
+    if batch_job is job:
+        app.fireCustomEvent(BATCH_EVENT_ID)
+
+
+# Generates the variant of one row: sets its parameters and texts, cuts the tools from the targets
+# and exports the design to path, if one is given. The cuts are added to the run report. The cut
+# features are deleted again even when a step fails, so the timeline does not grow with the number of rows.
+def generate_variant(design: adsk.fusion.Design, sketches: dict, pairs: list, row: dict, originals: dict, path: str,
+                     run_report: report.RunReport):
+    apply_row(design, sketches, row, originals)
+    features = []
+    try:
+        cut_pairs(design.rootComponent, pairs, features, run_report)
+        if path:
+            export_design(design, path, os.path.splitext(path)[1])
+    finally:
+        for feature in reversed(features):
+            feature.deleteMe()
+
+
+# Yields the rows of a .csv, .jsonl or .json table as dictionaries of column name to text.
+# CSV and JSON Lines files are read one row at a time. A .json file holds a list of objects
+# and is read whole, so prefer the other formats for very large tables.
+def iter_rows(path: str):
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        if extension == '.csv':
+            for row in csv.DictReader(f):
+                yield {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        elif extension == '.jsonl':
+            for line in f:
+                if line.strip():
+                    yield {key: str(value) for key, value in json.loads(line).items()}
+        else:
+            for row in json.load(f):
+                yield {key: str(value) for key, value in row.items()}
+
+
+# Indexes every sketch in the design by name so text columns resolve without searching the design per row.
+def sketches_by_name(design: adsk.fusion.Design) -> dict:
+    sketches = {}
+    for component in design.allComponents:
+        for sketch in component.sketches:
+            sketches.setdefault(sketch.name, []).append(sketch)
+    return sketches
+
+
+# Sets the user parameters and sketch texts of one row. The first value seen for each
+# parameter and text is kept in originals so the design can be restored afterwards.
+def apply_row(design: adsk.fusion.Design, sketches: dict, row: dict, originals: dict):
+    for column, value in row.items():
+        if column.startswith(TEXT_COLUMN_PREFIX):
+            sketch_name = column[len(TEXT_COLUMN_PREFIX):]
+            if sketch_name not in sketches:
+                raise ValueError(f'Sketch "{sketch_name}" not found for column "{column}"')
+            for sketch in sketches[sketch_name]:
+                for text_index, sketch_text in enumerate(sketch.sketchTexts):
+                    originals.setdefault((sketch.entityToken, text_index), sketch_text.text)
+                    if sketch_text.text != value:
+                        sketch_text.text = value
+        else:
+            parameter = design.userParameters.itemByName(column)
+            if not parameter:
+                raise ValueError(f'User parameter "{column}" not found')
+            originals.setdefault(column, parameter.expression)
+            if parameter.expression != value:
+                parameter.expression = value
+
+
+# Puts back the parameter expressions and sketch texts that apply_row changed.
+def restore(design: adsk.fusion.Design, sketches: dict, originals: dict):
+    texts = {}
+    for sketch_list in sketches.values():
+        for sketch in sketch_list:
+            texts[sketch.entityToken] = sketch
+    for key, value in originals.items():
+        if isinstance(key, tuple):
+            sketch_token, text_index = key
+            texts[sketch_token].sketchTexts.item(text_index).text = value
+        else:
+            design.userParameters.itemByName(key).expression = value
+
+
+# Cuts the tools from the targets of the (target occurrences, tool occurrences) pairs with the
+# resolve, plan, precheck and cut steps of Combine Cut and its default run options. Each feature is
+# added to features as soon as it is created, so they can be deleted if a later cut fails, which
+# raises after the failure is recorded in the run report.
+@futil.span('variantGenerate.cut')
+def cut_pairs(root: adsk.fusion.Component, pairs: list, features: list, run_report: report.RunReport):
+    operations, occurrences, _ = combine_cut.plan_operations(combine_cut.RUN_DEFAULTS, pairs, run_report)
+    for operation in operations:
+        features.append(combine_cut.cut_operation(root, operation, occurrences, run_report, False))
+
+
+# Exports the whole design to the file, in the format given by the extension.
+def export_design(design: adsk.fusion.Design, path: str, extension: str):
+    export_manager = design.exportManager
+    if extension == '.step':
+        options = export_manager.createSTEPExportOptions(path, design.rootComponent)
+    elif extension == '.stl':
+        options = export_manager.createSTLExportOptions(design.rootComponent, path)
+    else:
+        options = export_manager.createFusionArchiveExportOptions(path, design.rootComponent)
+    export_manager.execute(options)
+
+
+# Returns the number of variants generated per minute since the start time.
+def throughput(count: int, start_time: float) -> float:
+    elapsed = time.perf_counter() - start_time
+    return count * 60 / elapsed if elapsed > 0 else 0.0
+
+
+# This event handler is called when the user changes anything in the command dialog.
+@futil.span('variantGenerate.inputChanged')
+def command_input_changed(args: adsk.core.InputChangedEventArgs):
+    changed_input = args.input
+    inputs = args.inputs
+    if changed_input.id == 'browse_table':
+        changed_input.value = False
+        file_dialog = ui.createFileDialog()
+        file_dialog.title = 'Select Variant Table'
+        file_dialog.filter = 'Variant Tables (*.csv;*.jsonl;*.json)'
+        if file_dialog.showOpen() == adsk.core.DialogResults.DialogOK:
+            inputs.itemById('table_file').text = file_dialog.filename
+    elif changed_input.id == 'browse_output':
+        changed_input.value = False
+        folder_dialog = ui.createFolderDialog()
+        folder_dialog.title = 'Select Output Folder'
+        if folder_dialog.showDialog() == adsk.core.DialogResults.DialogOK:
+            inputs.itemById('output_folder').text = folder_dialog.folder
+    futil.log(f'{CMD_NAME} Input Changed Event fired from a change to {changed_input.id}')
+
+
+# This event handler is called when the user interacts with any of the inputs in the dialog
+# which allows you to verify that all of the inputs are valid and enables the OK button.
+@futil.span('variantGenerate.validate')
+def command_validate_input(args: adsk.core.ValidateInputsEventArgs):
+    inputs = args.inputs
+    valid = bool(inputs.itemById('table_file').text)
+    if inputs.itemById('export_format').selectedItem.name != 'None':
+        valid = valid and bool(inputs.itemById('output_folder').text)
+    args.areInputsValid = valid
+
+
+# This event handler is called when the command terminates.
+def command_destroy(args: adsk.core.CommandEventArgs):
+    # General logging for debug.
+    futil.log(f'{CMD_NAME} Command Destroy Event')
+
+    # Disconnect the handlers of the dialog so they are released with it
+    futil.remove_handlers(local_handlers)
@@ -1,10 +1,24 @@
 import os
 import sys
+import json
 import shutil
+import fnmatch
+import hashlib
+import argparse
 import platform
-import subprocess
 from pathlib import Path
 
+# Files that are never installed
+IGNORE_PATTERNS = ['*.pyc', 'temp_*', '__pycache__', '*.zip', 'install.py', 'install.bat',
+                   '.git', '.vscode', 'benchmarks', 'tests']
+
+# Files the add-in writes to its own folder. They are never installed, so the sample in the source
+# folder can't replace the user's copy, and the copy in the install is always kept.
+USER_FILES = ['commands/combineCut/plate_text_pairs.json']
+
+# Written to the installed add-in, lists every installed file with its hash
+MANIFEST_NAME = '.install_manifest.json'
+
 def get_fusion_addins_path():
     system = platform.system().lower()
     if system == "windows":
@@ -16,44 +30,181 @@ def get_fusion_addins_path():
     else:
         raise SystemError(f"Unsupported operating system: {system}")
 
-def install_addin():
+def is_ignored(name):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in IGNORE_PATTERNS) or name == MANIFEST_NAME
+
+def list_files(root):
+    # Relative paths, with forward slashes, of the files under root that are not ignored
+    files = []
+    for folder, dir_names, file_names in os.walk(root):
+        dir_names[:] = [name for name in dir_names if not is_ignored(name)]
+        for name in file_names:
+            if not is_ignored(name):
+                files.append(Path(folder, name).relative_to(root).as_posix())
+    return sorted(files)
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_manifest(install_dir):
     try:
-        # Get the current directory (where the installer is running from)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Get the Fusion 360 AddIns directory
-        fusion_addins_path = get_fusion_addins_path()
-        target_dir = os.path.join(fusion_addins_path, "CombineCut")
-        
-        # Create the AddIns directory if it doesn't exist
-        os.makedirs(fusion_addins_path, exist_ok=True)
-        
-        # Remove existing installation if it exists
+        with open(os.path.join(install_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def build_manifest(source_dir, installed):
+    """Hashes the files of source_dir.
+
+    Files whose size and modification time match the installed manifest keep the installed
+    hash, so only new and edited files are read.
+    """
+    manifest = {}
+    for path in list_files(source_dir):
+        if path in USER_FILES:
+            continue
+        stat = os.stat(os.path.join(source_dir, path))
+        entry = installed.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            digest = entry['sha256']
+        else:
+            digest = hash_file(os.path.join(source_dir, path))
+        manifest[path] = {'sha256': digest, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+    return manifest
+
+def same_hashes(manifest, installed):
+    return {path: entry['sha256'] for path, entry in manifest.items()} == \
+        {path: entry['sha256'] for path, entry in installed.items()}
+
+def link_or_copy(source, target):
+    # Unchanged files are hard linked from the current install instead of copied
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def recover_interrupted_swap(target_dir):
+    # A swap interrupted between its two renames leaves only the previous install behind
+    previous_dir = target_dir + '.previous'
+    if os.path.exists(previous_dir):
         if os.path.exists(target_dir):
-            print("Removing existing installation...")
-            shutil.rmtree(target_dir)
-        
-        # Copy all files to the target directory
-        print(f"Installing to: {target_dir}")
-        shutil.copytree(current_dir, target_dir, 
-                       ignore=shutil.ignore_patterns('*.pyc', 'temp_*', '__pycache__', '*.zip', 'install.py'))
-        
-        print("\nInstallation successful!")
-        print("\nNext steps:")
-        print("1. Restart Fusion 360 if it's running")
-        print("2. Open the Add-Ins dialog (Press Shift+S)")
-        print("3. Enable the CombineCut add-in")
-        
-        # Keep the window open on Windows
-        if platform.system().lower() == "windows":
-            input("\nPress Enter to exit...")
-            
+            shutil.rmtree(previous_dir)
+        else:
+            os.rename(previous_dir, target_dir)
+
+def stage_install(source_dir, target_dir, staging_dir, manifest, installed, full=False):
+    """Builds the new install in staging_dir.
+
+    Changed files are copied from source_dir and unchanged files are linked from target_dir.
+    Files in target_dir that the installer didn't put there and the USER_FILES, such as saved
+    pairs, are kept.
+
+    :returns:
+        The number of files copied from source_dir.
+    """
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    os.makedirs(staging_dir)
+    copied = 0
+    for path, entry in manifest.items():
+        current = installed.get(path)
+        current_path = os.path.join(target_dir, path)
+        if not full and current and current['sha256'] == entry['sha256'] and os.path.exists(current_path):
+            link_or_copy(current_path, os.path.join(staging_dir, path))
+        else:
+            os.makedirs(os.path.dirname(os.path.join(staging_dir, path)), exist_ok=True)
+            shutil.copy2(os.path.join(source_dir, path), os.path.join(staging_dir, path))
+            copied += 1
+    if os.path.exists(target_dir):
+        for path in list_files(target_dir):
+            if path in USER_FILES or (path not in installed and path not in manifest):
+                link_or_copy(os.path.join(target_dir, path), os.path.join(staging_dir, path))
+    with open(os.path.join(staging_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return copied
+
+def swap_install(target_dir, staging_dir):
+    # Both renames are within the AddIns folder, so each one is atomic. If Fusion holds a file of
+    # the current install open the first rename fails and the current install is left as it was.
+    previous_dir = target_dir + '.previous'
+    if os.path.exists(target_dir):
+        os.rename(target_dir, previous_dir)
+    os.rename(staging_dir, target_dir)
+    if os.path.exists(previous_dir):
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+def install_addin(target_dir=None, full=False):
+    """Installs the add-in, copying only the files that changed since the last install.
+
+    Arguments:
+    target_dir -- The folder to install to, by default CombineCut in Fusion's AddIns folder.
+    full -- Copy every file, even if the installed copy has the same hash.
+
+    :returns:
+        The number of files copied, 0 if the install was up to date.
+    """
+    # Get the current directory (where the installer is running from)
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+
+    if target_dir is None:
+        # Get the Fusion 360 AddIns directory
+        target_dir = os.path.join(get_fusion_addins_path(), "CombineCut")
+    target_dir = os.path.abspath(target_dir)
+    staging_dir = target_dir + '.staging'
+
+    # Create the AddIns directory if it doesn't exist
+    os.makedirs(os.path.dirname(target_dir), exist_ok=True)
+    recover_interrupted_swap(target_dir)
+
+    installed = read_manifest(target_dir)
+    manifest = build_manifest(current_dir, installed)
+    if not full and os.path.exists(target_dir) and same_hashes(manifest, installed):
+        print(f"Already up to date: {target_dir}")
+        return 0
+
+    print(f"Installing to: {target_dir}")
+    try:
+        copied = stage_install(current_dir, target_dir, staging_dir, manifest, installed, full)
+        swap_install(target_dir, staging_dir)
+    finally:
+        if os.path.exists(staging_dir):
+            shutil.rmtree(staging_dir, ignore_errors=True)
+    removed = len(set(installed) - set(manifest) - set(USER_FILES))
+    print(f"Copied {copied} changed files, removed {removed}, kept {len(manifest) - copied} unchanged")
+    return copied
+
+def main():
+    parser = argparse.ArgumentParser(description='Install or update the CombineCut add-in.')
+    parser.add_argument('--target', help='Folder to install to, by default CombineCut in the Fusion 360 AddIns folder.')
+    parser.add_argument('--full', action='store_true', help='Copy every file instead of only the changed ones.')
+    parser.add_argument('--quiet', action='store_true', help="Don't show the next steps or wait for Enter on Windows.")
+    args = parser.parse_args()
+    try:
+        install_addin(args.target, args.full)
+
+        if not args.quiet:
+            print("\nInstallation successful!")
+            print("\nNext steps:")
+            print("1. Restart Fusion 360 if it's running")
+            print("2. Open the Add-Ins dialog (Press Shift+S)")
+            print("3. Enable the CombineCut add-in")
+
+            # Keep the window open on Windows
+            if platform.system().lower() == "windows":
+                input("\nPress Enter to exit...")
+
     except Exception as e:
         print(f"\nError during installation: {str(e)}")
+        print("\nThe previous installation, if any, was left unchanged.")
         print("\nPlease try the manual installation method described in the README.md file.")
-        if platform.system().lower() == "windows":
+        if platform.system().lower() == "windows" and not args.quiet:
             input("\nPress Enter to exit...")
         sys.exit(1)
 
 if __name__ == "__main__":
-    install_addin() 
\ No newline at end of file
+    main()
@@ -1,2 +1,5 @@
 from .general_utils import *
 from .event_utils import *
+from .metrics_utils import *
+from .palette_utils import *
+from .rpc_utils import *
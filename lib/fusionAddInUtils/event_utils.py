@@ -10,15 +10,26 @@
 #  UNINTERRUPTED OR ERROR FREE.
 
 import sys
+import time
 from typing import Callable
 
 import adsk.core
 from .general_utils import handle_error
+from .metrics_utils import record_span
 
 
 # Global Variable to hold Event Handlers
 _handlers = []
 
+# Handler classes, one per handler type, and the handler type of each event type. Every
+# handler of a type shares the class so creating a command does not define new classes.
+_handler_classes = {}
+_handler_types = {}
+
+# Number of connected handlers, by handler span name. Every call of a handler is timed in the
+# handler.<span name> span, see metrics_utils.
+_handler_counts = {}
+
 
 def add_handler(
         event: adsk.core.Event,
@@ -46,20 +57,63 @@ def add_handler(
     :returns:
         The event handler that was created.  You don't often need this reference, but it can be useful in some cases.
     """   
-    module = sys.modules[event.__module__]
-    handler_type = module.__dict__[event.add.__annotations__['handler']]
-    handler = _create_handler(handler_type, callback, event, name, local_handlers)
+    handler = _create_handler(_handler_type(event), callback, event, name, local_handlers)
     event.add(handler)
+    _handler_counts[handler.span_name] = _handler_counts.get(handler.span_name, 0) + 1
     return handler
 
 
+def remove_handlers(handlers: list):
+    """Disconnects every handler in the list from its event and empties the list.
+
+    Arguments:
+    handlers -- A list of handlers created by add_handler, such as the local_handlers of a command.
+    """
+    for handler in handlers:
+        if handler.event is not None:
+            handler.event.remove(handler)
+            handler.event = None
+            _uncount(handler)
+    handlers.clear()
+
+
 def clear_handlers():
     """Clears the global list of handlers.
     """
     global _handlers
+    for handler in _handlers:
+        _uncount(handler)
     _handlers = []
 
 
+def handler_counts() -> dict:
+    """Returns the number of handlers connected to events, by the name their calls are timed under.
+
+    :returns:
+        A dictionary of span name to the number of connected handlers. The calls of a handler are
+        timed in the handler.<span name> span.
+    """
+    return dict(_handler_counts)
+
+
+def _uncount(handler):
+    count = _handler_counts.get(handler.span_name, 0) - 1
+    if count > 0:
+        _handler_counts[handler.span_name] = count
+    else:
+        _handler_counts.pop(handler.span_name, None)
+
+
+def _handler_type(event: adsk.core.Event):
+    event_type = type(event)
+    handler_type = _handler_types.get(event_type)
+    if handler_type is None:
+        module = sys.modules[event.__module__]
+        handler_type = module.__dict__[event.add.__annotations__['handler']]
+        _handler_types[event_type] = handler_type
+    return handler_type
+
+
 def _create_handler(
         handler_type,
         callback: Callable,
@@ -67,22 +121,34 @@ def _create_handler(
         name: str = None,
         local_handlers: list = None
 ):
-    handler = _define_handler(handler_type, callback, name)()
+    handler = _define_handler(handler_type)(callback, event, name)
     (local_handlers if local_handlers is not None else _handlers).append(handler)
     return handler
 
 
-def _define_handler(handler_type, callback, name: str = None):
-    name = name or handler_type.__name__
-
-    class Handler(handler_type):
-        def __init__(self):
-            super().__init__()
-
-        def notify(self, args):
-            try:
-                callback(args)
-            except:
-                handle_error(name)
-
-    return Handler
+def _define_handler(handler_type):
+    handler_class = _handler_classes.get(handler_type)
+    if handler_class is None:
+        class Handler(handler_type):
+            def __init__(self, callback: Callable, event: adsk.core.Event, name: str = None):
+                super().__init__()
+                self.callback = callback
+                self.event = event
+                self.name = name or handler_type.__name__
+                self.span_name = name or f'{callback.__module__}.{callback.__qualname__}'
+
+            def notify(self, args):
+                _dispatch(self, args)
+
+        handler_class = _handler_classes[handler_type] = Handler
+    return handler_class
+
+
+def _dispatch(handler, args):
+    start = time.perf_counter()
+    try:
+        handler.callback(args)
+    except:
+        handle_error(handler.name)
+    finally:
+        record_span(f'handler.{handler.span_name}', time.perf_counter() - start)
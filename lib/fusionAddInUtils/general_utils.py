@@ -9,43 +9,131 @@
 #  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
 #  UNINTERRUPTED OR ERROR FREE.
 
+import logging
+import logging.handlers
 import os
+import platform
+import queue
+import sys
 import traceback
 import adsk.core
 
 app = adsk.core.Application.get()
 ui = app.userInterface
 
-# Attempt to read DEBUG flag from parent config.
+# Attempt to read DEBUG flag and add-in name from parent config.
 try:
     from ... import config
     DEBUG = config.DEBUG
+    DATA_FOLDER_NAME = os.path.join(config.COMPANY_NAME, config.ADDIN_NAME)
 except:
     DEBUG = False
+    DATA_FOLDER_NAME = 'FusionAddIn'
 
 
-def log(message: str, level: adsk.core.LogLevels = adsk.core.LogLevels.InfoLogLevel, force_console: bool = False):
+# Log file kept in the per-user data folder. Messages are queued by log and written to the
+# file on a background thread, so logging doesn't slow down the command events.
+LOG_FILE_NAME = 'addin.log'
+LOG_FILE_SIZE = 1024 * 1024
+LOG_FILE_COUNT = 3
+
+# Python logging levels of the Fusion log levels.
+_LEVELS = {
+    adsk.core.LogLevels.InfoLogLevel: logging.INFO,
+    adsk.core.LogLevels.WarningLogLevel: logging.WARNING,
+    adsk.core.LogLevels.ErrorLogLevel: logging.ERROR,
+}
+
+# Loggers are named after the module that logs, under the logger of the add-in package.
+# Information messages and above are written unless set_log_level changes it for a module.
+_ADDIN_LOGGER_NAME = __name__.split('.')[0]
+logging.getLogger(_ADDIN_LOGGER_NAME).setLevel(logging.INFO)
+logging.getLogger(_ADDIN_LOGGER_NAME).propagate = False
+_loggers = {}
+_log_listener = None
+
+
+def log(message, level: adsk.core.LogLevels = adsk.core.LogLevels.InfoLogLevel, force_console: bool = False):
     """Utility function to easily handle logging in your app.
 
+    Messages are written to the add-in log file on a background thread. Messages below the
+    level set for the calling module with set_log_level are dropped before being formatted.
+
     Arguments:
-    message -- The message to log.
+    message -- The message to log, or a function without arguments that returns the message.
+               A function is only called if the message is logged, which avoids the cost of
+               formatting messages that are not.
     level -- The logging severity level.
     force_console -- Forces the message to be written to the Text Command window. 
     """    
-    # Always print to console, only seen through IDE.
-    print(message)  
+    module_name = sys._getframe(1).f_globals.get('__name__', _ADDIN_LOGGER_NAME)
+    logger = _loggers.get(module_name)
+    if logger is None:
+        logger = _loggers[module_name] = logging.getLogger(module_name)
+    to_file = logger.isEnabledFor(_LEVELS.get(level, logging.INFO))
+    to_console = DEBUG or force_console
+    if not (to_file or to_console or level == adsk.core.LogLevels.ErrorLogLevel):
+        return
+    if callable(message):
+        message = message()
+
+    if to_file:
+        _start_log_listener()
+        logger.log(_LEVELS.get(level, logging.INFO), message)
 
     # Log all errors to Fusion log file.
     if level == adsk.core.LogLevels.ErrorLogLevel:
         log_type = adsk.core.LogTypes.FileLogType
         app.log(message, level, log_type)
 
-    # If config.DEBUG is True write all log messages to the console.
-    if DEBUG or force_console:
+    # If config.DEBUG is True print and write all log messages to the console.
+    if to_console:
+        print(message)
         log_type = adsk.core.LogTypes.ConsoleLogType
         app.log(message, level, log_type)
 
 
+def set_log_level(module_name: str, level: adsk.core.LogLevels):
+    """Sets the lowest level of the messages logged to the log file by a module and the modules in it.
+
+    Arguments:
+    module_name -- The name of a module or package of the add-in, such as __name__.
+    level -- The lowest logging severity level written to the log file.
+    """
+    logging.getLogger(module_name).setLevel(_LEVELS.get(level, logging.INFO))
+
+
+def flush_log():
+    """Waits until every queued message has been written to the log file."""
+    if _log_listener:
+        _log_listener.stop()
+        _log_listener.start()
+
+
+def stop_logging():
+    """Writes every queued message to the log file and stops the background thread."""
+    global _log_listener
+    if _log_listener:
+        _log_listener.stop()
+        _log_listener = None
+        addin_logger = logging.getLogger(_ADDIN_LOGGER_NAME)
+        for handler in list(addin_logger.handlers):
+            addin_logger.removeHandler(handler)
+
+
+def _start_log_listener():
+    global _log_listener
+    if _log_listener:
+        return
+    log_queue = queue.SimpleQueue()
+    file_handler = logging.handlers.RotatingFileHandler(
+        get_data_path(LOG_FILE_NAME), maxBytes=LOG_FILE_SIZE, backupCount=LOG_FILE_COUNT, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _log_listener.start()
+    logging.getLogger(_ADDIN_LOGGER_NAME).addHandler(logging.handlers.QueueHandler(log_queue))
+
+
 def handle_error(name: str, show_message_box: bool = False):
     """Utility function to simplify error handling.
 
@@ -58,7 +146,30 @@ def handle_error(name: str, show_message_box: bool = False):
 
     log('===== Error =====', adsk.core.LogLevels.ErrorLogLevel)
     log(f'{name}\n{traceback.format_exc()}', adsk.core.LogLevels.ErrorLogLevel)
+    # Make sure the error is in the log file even if Fusion closes right after.
+    flush_log()
 
     # If desired you could show an error as a message box.
     if show_message_box:
         ui.messageBox(f'{name}\n{traceback.format_exc()}')
+
+
+def get_data_path(*parts: str) -> str:
+    """Utility function to get a path in the per-user data folder of the add-in.
+
+    Data kept here survives reinstalling the add-in, unlike files in the add-in folder.
+    The folder is created if it doesn't exist.
+
+    Arguments:
+    parts -- Path components to join to the data folder.
+    """
+    system = platform.system().lower()
+    if system == 'windows':
+        base = os.environ.get('APPDATA', os.path.expanduser('~'))
+    elif system == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+    folder = os.path.join(base, DATA_FOLDER_NAME)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, *parts)
@@ -0,0 +1,135 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import json
+import os
+import time
+from collections import deque
+from contextlib import ContextDecorator
+
+from .general_utils import get_data_path
+
+
+# Number of recent durations each histogram keeps to compute its percentiles.
+SAMPLE_LIMIT = 2048
+
+# Histograms of the recorded spans, by span name.
+_histograms = {}
+
+
+class Histogram:
+    """Durations recorded for one span name.
+
+    The count, total and max cover every duration recorded, the percentiles
+    are computed from the most recent SAMPLE_LIMIT durations.
+    """
+
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_LIMIT)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def summary(self) -> dict:
+        """Returns the count, and the total, mean, p50, p95 and max durations in seconds."""
+        ordered = sorted(self.samples)
+
+        def percentile(fraction):
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'max': self.max,
+        }
+
+
+class span(ContextDecorator):
+    """Times a block of code, or every call of a function when used as a decorator,
+    and records the duration in the histogram of the given name.
+
+    Arguments:
+    name -- The name of the histogram the durations are recorded in.
+
+    Example:
+        with futil.span('combineCut.combine'):
+            ...
+
+        @futil.span('combineCut.execute')
+        def command_execute(args):
+            ...
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._starts = []
+
+    def __enter__(self):
+        self._starts.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc):
+        record_span(self.name, time.perf_counter() - self._starts.pop())
+        return False
+
+
+def record_span(name: str, seconds: float):
+    """Records a duration in the histogram of the given name.
+
+    Arguments:
+    name -- The name of the histogram.
+    seconds -- The duration to record.
+    """
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms[name] = Histogram()
+    histogram.add(seconds)
+
+
+def metrics_snapshot() -> dict:
+    """Returns the summary of every histogram by span name, see Histogram.summary."""
+    return {name: histogram.summary() for name, histogram in sorted(_histograms.items())}
+
+
+def reset_metrics():
+    """Removes every recorded duration."""
+    _histograms.clear()
+
+
+def export_metrics(path: str = None) -> str:
+    """Writes the summary of every histogram to a JSON file.
+
+    Arguments:
+    path -- The file to write. By default metrics.json in the per-user data folder.
+
+    :returns:
+        The path of the file written.
+    """
+    path = path or get_data_path('metrics.json')
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump({'time': time.time(), 'spans': metrics_snapshot()}, f, indent=2)
+    os.replace(temp_path, path)
+    return path
@@ -0,0 +1,183 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import adsk.core
+from .event_utils import add_handler
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+# Action of the batches sent to the palette and of the acknowledgement the palette sends back.
+BATCH_ACTION = 'batch'
+ACK_ACTION = 'ack'
+
+# Channels by palette id.
+_channels = {}
+
+
+class PaletteChannel:
+    """Sends messages to a palette in batches.
+
+    Messages are queued by send and sent together as one batch at most once every
+    frame_budget seconds. The palette acknowledges each batch once it has handled it
+    and no more than max_in_flight batches are sent without an acknowledgement, so a
+    fast producer can't send messages faster than the palette handles them. While the
+    palette is behind, messages sent with the same key replace each other and the
+    oldest messages are dropped once max_pending are queued.
+
+    Batches are sent with sendInfoToHTML using the 'batch' action and data of the form
+    {"id": 1, "messages": [{"action": "...", "data": ...}, ...]}. The palette replies
+    with fusionSendData('ack', '{"id": 1}'), which must be passed to acknowledge.
+
+    Arguments:
+    palette_id -- The id of the palette the messages are sent to.
+    frame_budget -- Shortest time in seconds between two batches.
+    max_batch -- Largest number of messages sent in one batch.
+    max_in_flight -- Number of batches that can be waiting for an acknowledgement.
+    max_pending -- Largest number of messages queued.
+    ack_timeout -- Time in seconds after which a batch that was not acknowledged is
+                   considered lost, for instance because the palette was reloaded.
+    """
+
+    def __init__(self, palette_id: str, frame_budget: float = 0.05, max_batch: int = 500,
+                 max_in_flight: int = 1, max_pending: int = 10000, ack_timeout: float = 2.0):
+        self.palette_id = palette_id
+        self.frame_budget = frame_budget
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending
+        self.ack_timeout = ack_timeout
+        self.dropped = 0
+        self.batches_sent = 0
+        self.messages_sent = 0
+        self._pending = OrderedDict()
+        self._sequence = 0
+        self._next_batch_id = 1
+        self._in_flight = {}
+        self._last_flush = 0.0
+        self._timer = None
+        self._handlers = []
+        self._event_id = f'{palette_id}_channelFlush'
+        flush_event = app.registerCustomEvent(self._event_id)
+        add_handler(flush_event, self._flush_event, local_handlers=self._handlers)
+
+    def send(self, action: str, data=None, key: str = None):
+        """Queues a message for the palette.
+
+        Arguments:
+        action -- The action the palette's handler is called with.
+        data -- Any value that can be converted to JSON.
+        key -- Messages with the same key replace the queued one, such as the progress of a
+               batch, so only the latest is sent.
+        """
+        if key is None:
+            self._sequence += 1
+            key = self._sequence
+        else:
+            self._pending.pop(key, None)
+        self._pending[key] = (action, data)
+        while len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._schedule()
+
+    def acknowledge(self, batch_id: int):
+        """Marks a batch as handled by the palette, allowing the next batch to be sent."""
+        self._in_flight.pop(batch_id, None)
+        self._cancel_timer()
+        self._schedule()
+
+    def flush(self) -> int:
+        """Sends the next batch unless the palette has too many batches to acknowledge.
+
+        :returns:
+            The number of messages sent.
+        """
+        now = time.perf_counter()
+        for batch_id, sent_time in list(self._in_flight.items()):
+            if now - sent_time > self.ack_timeout:
+                del self._in_flight[batch_id]
+        if not self._pending or len(self._in_flight) >= self.max_in_flight:
+            return 0
+        palette = ui.palettes.itemById(self.palette_id)
+        if palette is None:
+            # Nobody to send to, the messages would only be stale when the palette is shown
+            self.dropped += len(self._pending)
+            self._pending.clear()
+            return 0
+
+        messages = []
+        while self._pending and len(messages) < self.max_batch:
+            action, data = self._pending.popitem(last=False)[1]
+            messages.append({'action': action, 'data': data})
+        batch_id = self._next_batch_id
+        self._next_batch_id += 1
+        self._in_flight[batch_id] = now
+        self._last_flush = now
+        palette.sendInfoToHTML(BATCH_ACTION, json.dumps({'id': batch_id, 'messages': messages}))
+        self.batches_sent += 1
+        self.messages_sent += len(messages)
+        return len(messages)
+
+    def close(self):
+        """Stops sending, dropping the queued messages."""
+        self._cancel_timer()
+        self._pending.clear()
+        self._handlers.clear()
+        app.unregisterCustomEvent(self._event_id)
+
+    def _schedule(self):
+        # Flush from a custom event so the messages sent during one event or batch chunk are
+        # sent together, waiting for the rest of the frame budget since the last batch.
+        if self._timer or not self._pending:
+            return
+        now = time.perf_counter()
+        delay = max(0.0, self.frame_budget - (now - self._last_flush))
+        if len(self._in_flight) >= self.max_in_flight:
+            # Wait for an acknowledgement, or for the oldest batch to time out if none comes
+            delay = max(delay, min(self._in_flight.values()) + self.ack_timeout - now)
+        self._timer = threading.Timer(delay, app.fireCustomEvent, (self._event_id,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_event(self, args: adsk.core.CustomEventArgs):
+        self._timer = None
+        self.flush()
+        self._schedule()
+
+
+def palette_channel(palette_id: str) -> PaletteChannel:
+    """Returns the channel of a palette, creating it with the default settings on first use.
+
+    Arguments:
+    palette_id -- The id of the palette.
+    """
+    channel = _channels.get(palette_id)
+    if channel is None:
+        channel = _channels[palette_id] = PaletteChannel(palette_id)
+    return channel
+
+
+def close_palette_channels():
+    """Closes every channel created by palette_channel."""
+    for channel in _channels.values():
+        channel.close()
+    _channels.clear()
@@ -0,0 +1,127 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import json
+import traceback
+from collections import deque
+from typing import Callable
+
+import adsk.core
+from .event_utils import add_handler
+from .general_utils import log
+from .palette_utils import palette_channel
+
+app = adsk.core.Application.get()
+
+# Action the palette sends requests with, and the action slow results are sent back with.
+RPC_ACTION = 'rpc'
+RPC_RESULT_ACTION = 'rpcResult'
+
+# Custom event that runs the queued slow requests, one request per event.
+RPC_EVENT_ID = f'{__name__.split(".")[0]}_rpcSlowRequest'
+
+# Registered methods by name, as (handler, slow).
+_methods = {}
+
+# Slow requests waiting to run, as (palette id, request), and the handlers of the custom event.
+_slow_requests = deque()
+_slow_handlers = []
+
+
+def register_rpc(method: str, handler: Callable, *, slow: bool = False):
+    """Registers a function the palette can call through rpc.js.
+
+    Arguments:
+    method -- The name the palette calls the function by, such as 'combineCut.pairStatus'.
+    handler -- A function taking the params of the request, a dictionary, and returning a
+               value that can be converted to JSON.
+    slow -- Slow functions don't run while the palette waits for the reply. The request is
+            answered with {"pending": true} and the function runs from a custom event
+            afterwards; its result is sent to the palette through the palette channel with
+            the 'rpcResult' action. This argument must be specified by its keyword.
+    """
+    _methods[method] = (handler, slow)
+
+
+def unregister_rpc(method: str):
+    """Removes a function registered with register_rpc."""
+    _methods.pop(method, None)
+
+
+def handle_rpc(html_args: adsk.core.HTMLEventArgs, palette_id: str):
+    """Answers an 'rpc' message from a palette.
+
+    The data of the message is one request or a list of requests of the form
+    {"id": 1, "method": "name", "params": {...}}. The reply, set as the return data of the
+    message, is a list with one response for each request of the form {"id": 1, "result": ...}
+    or {"id": 1, "error": "message"}.
+
+    Arguments:
+    html_args -- The arguments of the palette's incomingFromHTML event.
+    palette_id -- The id of the palette, which the results of slow requests are sent to.
+    """
+    try:
+        requests = json.loads(html_args.data)
+    except ValueError:
+        html_args.returnData = json.dumps([{'id': None, 'error': 'Invalid JSON'}])
+        return
+    if not isinstance(requests, list):
+        requests = [requests]
+    html_args.returnData = json.dumps([_answer(request, palette_id) for request in requests])
+
+
+def _answer(request: dict, palette_id: str) -> dict:
+    request_id = request.get('id')
+    method = _methods.get(request.get('method'))
+    if method is None:
+        return {'id': request_id, 'error': f'Unknown method: {request.get("method")}'}
+    handler, slow = method
+    if slow:
+        _queue_slow_request(palette_id, request)
+        return {'id': request_id, 'pending': True}
+    return _call(handler, request)
+
+
+def _call(handler: Callable, request: dict) -> dict:
+    try:
+        return {'id': request.get('id'), 'result': handler(request.get('params') or {})}
+    except Exception as error:
+        log(f'RPC {request.get("method")} failed\n{traceback.format_exc()}', adsk.core.LogLevels.ErrorLogLevel)
+        return {'id': request.get('id'), 'error': f'{type(error).__name__}: {error}'}
+
+
+def _queue_slow_request(palette_id: str, request: dict):
+    if not _slow_handlers:
+        slow_event = app.registerCustomEvent(RPC_EVENT_ID)
+        add_handler(slow_event, _run_slow_request, local_handlers=_slow_handlers)
+    _slow_requests.append((palette_id, request))
+    if len(_slow_requests) == 1:
+        app.fireCustomEvent(RPC_EVENT_ID)
+
+
+def _run_slow_request(args: adsk.core.CustomEventArgs):
+    if not _slow_requests:
+        return
+    palette_id, request = _slow_requests.popleft()
+    method = _methods.get(request.get('method'))
+    if method:
+        palette_channel(palette_id).send(RPC_RESULT_ACTION, _call(method[0], request))
+    # Run the next request from its own event so other events are handled in between
+    if _slow_requests:
+        app.fireCustomEvent(RPC_EVENT_ID)
+
+
+def stop_rpc():
+    """Drops the queued slow requests and unregisters their custom event."""
+    _slow_requests.clear()
+    if _slow_handlers:
+        _slow_handlers.clear()
+        app.unregisterCustomEvent(RPC_EVENT_ID)
@@ -22,6 +22,7 @@ def create_release_package():
         "config.py",
         "README.md",
         "install.py",
+        "plan_offline.py",
         "install.bat"  # Include the batch installer
     ]
 
@@ -0,0 +1,15 @@
+# Plans Combine Cut pairs from a design snapshot without Fusion, using every CPU:
+#
+#   python plan_offline.py design.ccsnap plan.json --targets "Plate_*" --tools "Text_*"
+#   python plan_offline.py design.ccsnap plan.json --overlap --processes 8
+#
+# Export the snapshot with Export Snapshot in the Combine Cut dialog and load the plan with Import Plan.
+import os
+import sys
+
+# The planner only uses the modules of the command that don't need Fusion
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'commands'))
+from combineCut import offline  # noqa: E402
+
+if __name__ == "__main__":
+    offline.main()
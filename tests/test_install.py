@@ -0,0 +1,59 @@
+# Checks of install.py, run with python -m pytest from the add-in folder.
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import install  # noqa: E402
+
+PAIRS_PATH = 'commands/combineCut/plate_text_pairs.json'
+USER_PAIRS = [{'plate': 'MyPlate', 'text': 'MyText'}]
+
+
+def write(root, path, text):
+    full_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'w') as f:
+        f.write(text)
+
+
+def read(root, path):
+    with open(os.path.join(root, path)) as f:
+        return f.read()
+
+
+def make_source(tmp_path):
+    source = str(tmp_path / 'source')
+    write(source, 'CombineCut.py', 'version = 2\n')
+    write(source, PAIRS_PATH, json.dumps([{'plate': 'TopPlate', 'text': 'MidText'}]))
+    return source
+
+
+def test_update_without_manifest_keeps_saved_pairs(tmp_path):
+    source = make_source(tmp_path)
+    target = str(tmp_path / 'CombineCut')
+    # An install made before the installer wrote a manifest
+    write(target, 'CombineCut.py', 'version = 1\n')
+    write(target, PAIRS_PATH, json.dumps(USER_PAIRS))
+    manifest = install.build_manifest(source, {})
+    staging = target + '.staging'
+    install.stage_install(source, target, staging, manifest, {})
+    install.swap_install(target, staging)
+    assert json.loads(read(target, PAIRS_PATH)) == USER_PAIRS
+    assert read(target, 'CombineCut.py') == 'version = 2\n'
+
+
+def test_update_keeps_saved_pairs_listed_in_old_manifest(tmp_path):
+    source = make_source(tmp_path)
+    target = str(tmp_path / 'CombineCut')
+    write(target, PAIRS_PATH, json.dumps(USER_PAIRS))
+    installed = {PAIRS_PATH: {'sha256': '', 'size': 0, 'mtime': 0}}
+    staging = target + '.staging'
+    install.stage_install(source, target, staging, install.build_manifest(source, installed), installed)
+    install.swap_install(target, staging)
+    assert json.loads(read(target, PAIRS_PATH)) == USER_PAIRS
+
+
+def test_sample_pairs_are_not_installed(tmp_path):
+    source = make_source(tmp_path)
+    assert PAIRS_PATH not in install.build_manifest(source, {})
@@ -0,0 +1,107 @@
+# Checks of the pair library in commands/combineCut/pair_store.py, run with python -m pytest from
+# the add-in folder. The module doesn't use the Fusion API, so it is loaded on its own.
+import importlib.util
+import json
+import os
+
+import pytest
+
+ADDIN_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_spec = importlib.util.spec_from_file_location(
+    'pair_store', os.path.join(ADDIN_FOLDER, 'commands', 'combineCut', 'pair_store.py'))
+pair_store = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pair_store)
+
+
+def pairs(prefix: str, count: int) -> list:
+    return [{'plate': f'{prefix}Plate_{index}', 'text': f'{prefix}Text_{index}'} for index in range(count)]
+
+
+def append(store, data: bytes):
+    with open(store.log_path, 'ab') as f:
+        f.write(data)
+
+
+def line(record) -> bytes:
+    return (json.dumps(record) + '\n').encode('utf-8')
+
+
+def damage_index(store):
+    with open(store.index_path, 'w') as f:
+        f.write('{"a": {"offs')
+
+
+def reopened(store):
+    return pair_store.PairStore(store.directory)
+
+
+@pytest.fixture
+def store(tmp_path):
+    library = pair_store.PairStore(str(tmp_path / 'pairs'))
+    library.save('a', pairs('a', 2))
+    library.save('b', pairs('b', 3))
+    return library
+
+
+def test_save_and_load(store):
+    assert store.names() == ['a', 'b']
+    assert list(store.load('b')) == pairs('b', 3)
+    assert store.load('missing') is None
+
+
+def test_new_version_replaces_the_set(store):
+    store.save('a', pairs('new', 1))
+    assert list(reopened(store).load('a')) == pairs('new', 1)
+    assert list(reopened(store).load('b')) == pairs('b', 3)
+
+
+def test_save_interrupted_mid_line_keeps_previous_version(store):
+    # The header and the start of a pair were written, the index was not replaced
+    append(store, line({'set': 'b'}) + b'{"plate": "half')
+    library = reopened(store)
+    assert list(library.load('b')) == pairs('b', 3)
+    # The next save starts on a new line and is readable after a rebuild
+    library.save('c', pairs('c', 2))
+    damage_index(library)
+    library = reopened(library)
+    assert library.names() == ['a', 'b', 'c']
+    assert list(library.load('b')) == pairs('b', 3)
+    assert list(library.load('c')) == pairs('c', 2)
+
+
+def test_save_interrupted_between_lines_keeps_previous_version(store):
+    # A new version of b stopped after its first whole pair line
+    append(store, line({'set': 'b'}) + line(pairs('new', 1)[0]))
+    damage_index(store)
+    library = reopened(store)
+    assert list(library.load('b')) == pairs('b', 3)
+    assert list(library.load('a')) == pairs('a', 2)
+
+
+def test_damaged_index_is_rebuilt_with_latest_versions(store):
+    store.save('a', pairs('new', 4))
+    damage_index(store)
+    library = reopened(store)
+    assert library.names() == ['a', 'b']
+    assert library.count('a') == 4
+    assert list(library.load('a')) == pairs('new', 4)
+    assert list(library.load('b')) == pairs('b', 3)
+
+
+def test_end_line_with_wrong_count_is_not_accepted(store):
+    append(store, line({'set': 'b'}) + line(pairs('new', 1)[0]) + line({'end': 'b', 'count': 2}))
+    damage_index(store)
+    assert list(reopened(store).load('b')) == pairs('b', 3)
+
+
+def test_compaction_keeps_current_versions(store, monkeypatch):
+    monkeypatch.setattr(pair_store, 'COMPACT_MIN_BYTES', 0)
+    for version in range(5):
+        store.save('a', pairs(f'v{version}', 20))
+    size = os.path.getsize(store.log_path)
+    store.compact()
+    assert os.path.getsize(store.log_path) <= size
+    damage_index(store)
+    library = reopened(store)
+    assert list(library.load('a')) == pairs('v4', 20)
+    assert list(library.load('b')) == pairs('b', 3)